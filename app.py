@@ -1,14 +1,36 @@
+import io
 import os
 import json
 import pandas as pd
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
 import logging
 from dotenv import load_dotenv
-from mistralai.client import MistralClient
-from mistralai.models.chat_completion import ChatMessage
-import io
+import queue
+import threading
+import contextvars
 from version import VERSION_STRING
+from llm_cache import LLMCache, make_cache_key
+from jobs import JobManager
+from ingestion import open_csv_batches
+from tag_index import reassign_tags
+from cpu_pool import CPUPool
+from tag_clustering import cluster_tags, count_tags, prenormalize_tags, expand_tag_mapping, canonical_tag_key
+from incremental import AnalysisStateStore, hash_response, hash_members
+from result_store import ResultStore
+from incidence import EXPORT_TABLES, export_tables
+from dedup import ResponseDeduplicator
+from llm_providers import load_llm_config, create_provider
+from llm_output import parse_json_output, PARSE_JSON
+from tag_embeddings import (
+    HashingEmbedder, SentenceTransformerEmbedder, ProviderEmbedder, EmbeddingCache, embed_tags, cluster_embeddings
+)
+from metrics import REGISTRY as metrics_registry
+from llm_scheduler import LLMScheduler, ContextThreadPoolExecutor, llm_priority, PRIORITY_INTERACTIVE
+from prompt_budget import (
+    estimate_tokens, truncate_to_tokens, deduplicate_responses, sample_within_budget, split_within_budget,
+    ITEM_OVERHEAD_TOKENS
+)
 
 # Chargement des variables d'environnement depuis .env
 load_dotenv()
@@ -20,16 +42,155 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Configuration Mistral
-MISTRAL_API_KEY = os.environ.get("MISTRAL_API_KEY", "")
-mistral_client = MistralClient(api_key=MISTRAL_API_KEY)
-MISTRAL_MODEL = "mistral-large-latest"  # Options: mistral-small-latest, mistral-medium-latest, mistral-large-latest
+# Configuration du LLM (fournisseur, endpoint, modèles), lue depuis config.json
+llm_config = load_llm_config(os.environ.get("LLM_CONFIG_PATH", "config.json"))
+if os.environ.get("MISTRAL_TIMEOUT"):
+    llm_config['timeout'] = int(os.environ["MISTRAL_TIMEOUT"])  # Délai maximum par requête, en secondes
+llm_provider = create_provider(llm_config)
+MISTRAL_MODEL = llm_config['model']  # Options: mistral-small-latest, mistral-medium-latest, mistral-large-latest
+# Modèle par étape ('extraction', 'normalization', 'summary'), MISTRAL_MODEL par défaut
+LLM_STAGE_MODELS = llm_config.get('models', {})
+
+# Ordonnanceur partagé des appels au LLM, toutes étapes confondues
+MISTRAL_MAX_IN_FLIGHT = int(os.environ.get("MISTRAL_MAX_IN_FLIGHT", "8"))  # Nombre maximum d'appels simultanés
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0"))  # 0 : pas de limite
+LLM_TOKENS_PER_MINUTE = float(os.environ.get("LLM_TOKENS_PER_MINUTE", "0"))  # 0 : pas de limite
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "5"))
+LLM_RETRY_BASE_DELAY = float(os.environ.get("LLM_RETRY_BASE_DELAY", "1"))  # Délai de la première nouvelle tentative, en secondes
+llm_scheduler = LLMScheduler(
+    max_in_flight=MISTRAL_MAX_IN_FLIGHT,
+    requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+    max_retries=LLM_MAX_RETRIES,
+    base_delay=LLM_RETRY_BASE_DELAY
+)
+
+# Cache persistant des réponses du LLM (désactivable avec LLM_CACHE_ENABLED=0)
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1") == "1"
+llm_cache = LLMCache(
+    os.environ.get("LLM_CACHE_PATH", os.path.join("data", "llm_cache.sqlite3")),
+    max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "100000")),
+    ttl_seconds=int(os.environ.get("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+) if LLM_CACHE_ENABLED else None
+
+# Configuration du découpage des réponses pour l'extraction des tags
+EXTRACTION_CHUNK_TOKENS = int(os.environ.get("EXTRACTION_CHUNK_TOKENS", "3000"))  # Budget de tokens des réponses par lot
+EXTRACTION_CHUNK_MAX_RESPONSES = int(os.environ.get("EXTRACTION_CHUNK_MAX_RESPONSES", "40"))  # Borne la taille du JSON en sortie
+EXTRACTION_MAX_WORKERS = int(os.environ.get("EXTRACTION_MAX_WORKERS", "4"))  # Nombre de lots traités en parallèle
+EXTRACTION_OUTPUT_TOKENS_PER_RESPONSE = 48
+EXTRACTION_MAX_OUTPUT_TOKENS = 4096
+# Regroupement des réponses identiques ou presque avant l'extraction (une réponse représentative par groupe)
+RESPONSE_DEDUP_ENABLED = os.environ.get("RESPONSE_DEDUP_ENABLED", "1") == "1"
+RESPONSE_DEDUP_THRESHOLD = float(os.environ.get("RESPONSE_DEDUP_THRESHOLD", "0.9"))  # 1 : réponses identiques (repliées) seulement
+EXTRACTION_MAX_REQUEUE = int(os.environ.get("EXTRACTION_MAX_REQUEUE", "2"))  # Relances des réponses absentes de la sortie de l'extraction
+
+# Normalisation hiérarchique : taille des lots de tags et nombre de lots normalisés en parallèle
+NORMALIZATION_BATCH_SIZE = int(os.environ.get("NORMALIZATION_BATCH_SIZE", "120"))
+NORMALIZATION_MAX_WORKERS = int(os.environ.get("NORMALIZATION_MAX_WORKERS", "4"))
+NORMALIZATION_OUTPUT_TOKENS_PER_TAG = 16
+NORMALIZATION_MAX_OUTPUT_TOKENS = 4096
+
+# Mode de normalisation des tags : 'llm' (prompt de normalisation) ou 'embeddings'
+# (regroupement des tags par similarité de leurs embeddings, le LLM ne fait que nommer les groupes)
+NORMALIZATION_MODE = os.environ.get("NORMALIZATION_MODE", llm_config['normalization_mode'])
+# Source des embeddings ('provider', 'local' ou 'hashing'), modèle et taille des lots, lus depuis config.json
+EMBEDDINGS_CONFIG = llm_config['embeddings']
+EMBEDDING_SIMILARITY_THRESHOLD = float(os.environ.get(
+    "EMBEDDING_SIMILARITY_THRESHOLD", str(EMBEDDINGS_CONFIG.get('similarity_threshold', 0.85))
+))  # Similarité cosinus minimale entre deux groupes fusionnés
+EMBEDDING_NAMING_BATCH_SIZE = int(os.environ.get("EMBEDDING_NAMING_BATCH_SIZE", "40"))  # Groupes nommés par appel au LLM
+EMBEDDING_NAMING_MAX_MEMBERS = 12  # Tags de chaque groupe montrés au LLM pour le nommer
+embedding_cache = EmbeddingCache(
+    os.environ.get("EMBEDDING_CACHE_PATH", os.path.join("data", "embeddings.sqlite3"))
+) if NORMALIZATION_MODE == 'embeddings' else None
+
+# Nombre de synthèses de tags générées en parallèle
+SUMMARY_MAX_WORKERS = int(os.environ.get("SUMMARY_MAX_WORKERS", "8"))
+
+# Budget de tokens des synthèses : les réponses d'un tag sont dédoublonnées et
+# échantillonnées pour tenir dans SUMMARY_PROMPT_TOKENS ; au-delà de
+# SUMMARY_HIERARCHICAL_MIN_TOKENS, le tag est synthétisé par parties puis fusionné
+SUMMARY_PROMPT_TOKENS = int(os.environ.get("SUMMARY_PROMPT_TOKENS", "6000"))
+SUMMARY_RESPONSE_MAX_TOKENS = int(os.environ.get("SUMMARY_RESPONSE_MAX_TOKENS", "250"))  # Les réponses plus longues sont tronquées
+SUMMARY_HIERARCHICAL_MIN_TOKENS = int(os.environ.get("SUMMARY_HIERARCHICAL_MIN_TOKENS", str(4 * SUMMARY_PROMPT_TOKENS)))
+SUMMARY_MAX_PARTS = int(os.environ.get("SUMMARY_MAX_PARTS", "6"))  # Nombre maximum de synthèses partielles par tag
+SUMMARY_MERGE_VERBATIMS_PER_PART = 3
+
+# Nombre de lignes par événement de la route d'analyse en flux (/import_and_test/stream)
+STREAM_ROWS_PER_EVENT = int(os.environ.get("STREAM_ROWS_PER_EVENT", "500"))
+
+# Étapes du pipeline d'analyse, dans l'ordre d'exécution
+PIPELINE_STAGES = ['extraction', 'collecte', 'normalisation', 'reattribution', 'syntheses']
+
+# File de tâches pour les analyses exécutées en arrière-plan
+JOBS_DIR = os.environ.get("JOBS_DIR", os.path.join("data", "jobs"))
+JOB_MAX_WORKERS = int(os.environ.get("JOB_MAX_WORKERS", "2"))  # Nombre d'analyses exécutées simultanément
+
+# État des analyses incrémentales (lignes déjà traitées, vocabulaire, synthèses)
+analysis_state = AnalysisStateStore(os.environ.get("ANALYSIS_STATE_PATH", os.path.join("data", "analysis_state.sqlite3")))
+
+# Pool de processus des étapes limitées par le CPU (réattribution des tags, encodage des
+# résultats enregistrés) ; 0 ou 1 : calcul dans le processus qui traite la requête
+CPU_POOL_WORKERS = int(os.environ.get("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+CPU_POOL_MIN_ITEMS = int(os.environ.get("CPU_POOL_MIN_ITEMS", "20000"))  # En dessous, les réponses sont traitées sur place
+cpu_pool = CPUPool(CPU_POOL_WORKERS, min_items=CPU_POOL_MIN_ITEMS)
+
+# Résultats des analyses, consultables par page sur les routes /analyses/<id>/...
+result_store = ResultStore(
+    os.environ.get("RESULT_STORE_PATH", os.path.join("data", "results.sqlite3")),
+    max_analyses=int(os.environ.get("RESULT_STORE_MAX_ANALYSES", "20")),
+    map_batches=cpu_pool.map_batches
+)
+COOCCURRENCE_MAX_TAGS = int(os.environ.get("COOCCURRENCE_MAX_TAGS", "200"))  # Taille maximale de la matrice de cooccurrences
+
+# Métriques exposées sur /metrics (désactivables avec METRICS_ENABLED=0)
+PIPELINE_STAGE_SECONDS = metrics_registry.histogram('pipeline_stage_seconds', "Durée des étapes du pipeline d'analyse", ['stage'])
+PIPELINE_RESPONSES = metrics_registry.counter('pipeline_responses_total', "Réponses analysées par le pipeline")
+PIPELINE_DUPLICATES = metrics_registry.counter(
+    'pipeline_duplicate_responses_total', "Réponses non envoyées à l'extraction car identiques ou presque à une autre réponse"
+)
+LLM_REQUEST_SECONDS = metrics_registry.histogram('llm_request_seconds', "Durée des appels au LLM", ['stage', 'model'])
+LLM_TOKENS = metrics_registry.counter('llm_tokens_total', "Tokens envoyés (prompt) et générés (completion) par le LLM", ['stage', 'kind'])
+LLM_RETRIES = metrics_registry.counter('llm_retries_total', "Nouvelles tentatives des appels au LLM", ['stage'])
+LLM_ERRORS = metrics_registry.counter('llm_errors_total', "Appels au LLM en échec", ['stage'])
+LLM_COALESCED = metrics_registry.counter('llm_coalesced_total', "Appels au LLM servis par une requête identique déjà en cours", ['stage'])
+LLM_CACHE_REQUESTS = metrics_registry.counter('llm_cache_requests_total', "Consultations du cache du LLM", ['stage', 'result'])
+LLM_IN_FLIGHT = metrics_registry.gauge('llm_requests_in_flight', "Appels au LLM en cours")
+LLM_PARSE_FALLBACKS = metrics_registry.counter(
+    'llm_parse_fallbacks_total',
+    "Réponses du LLM qui ne sont pas du JSON valide (result: extrait si le JSON est entouré de texte, "
+    "partiel si seuls les éléments complets d'une réponse coupée sont conservés, echec sinon)",
+    ['stage', 'result']
+)
+
+# Points de reprise de l'analyse en cours (voir run_analysis_pipeline)
+_pipeline_checkpoint = contextvars.ContextVar('pipeline_checkpoint', default=None)
+
+class AnalysisCancelled(Exception):
+    """Analyse annulée (client déconnecté) : aucun nouvel appel au LLM n'est envoyé."""
+
+# Annulation de l'analyse en cours (threading.Event, voir stream_analysis_events)
+_pipeline_cancelled = contextvars.ContextVar('pipeline_cancelled', default=None)
 
 # Routes principales
 @app.route('/')
 def index():
     return render_template('index.html', version=VERSION_STRING)
 
+# /cache/stats décrit le processus qui traite la requête (champ pid) ; sous serve.py,
+# /metrics additionne les valeurs de tous les workers (voir metrics.py)
+@app.route('/cache/stats')
+def cache_stats():
+    if llm_cache is None:
+        return jsonify({'enabled': False, 'pid': os.getpid(), 'llm': llm_provider.stats(), 'scheduler': llm_scheduler.stats()})
+    return jsonify({'enabled': True, 'pid': os.getpid(), **llm_cache.stats(), 'llm': llm_provider.stats(), 'scheduler': llm_scheduler.stats()})
+
+@app.route('/metrics')
+def metrics():
+    if not metrics_registry.enabled:
+        return jsonify({'error': 'Métriques désactivées (METRICS_ENABLED=0)'}), 404
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/test_workflow', methods=['POST'])
 def test_workflow():
     logger.info("Route /test_workflow appelée")
@@ -50,77 +211,13 @@ def test_workflow():
         df = df.head(3)
         # logger.info(f"Limitation à 3 lignes pour le test")
         
-        # Extraire les réponses pour l'extraction des tags
-        responses = df['response'].tolist()
-        
-        # Étape 1: Extraction des tags
-        logger.info("Extraction des tags à partir des réponses")
-        response_tags = extract_tags_with_mistral(responses)
-        logger.info(f"Tags extraits: {response_tags}")
-        
-        # Étape 2: Collecter tous les tags uniques de toutes les réponses
-        all_unique_tags = set()
-        for item in response_tags:
-            all_unique_tags.update(item.get('tags', []))
-        all_unique_tags = list(all_unique_tags)
-        logger.info(f"Tags uniques collectés: {all_unique_tags}")
-        
-        # Étape 3: Normalisation des tags avec Mistral
-        logger.info("Normalisation des tags extraits")
-        normalized_tags = normalize_tags_with_mistral(all_unique_tags)
-        logger.info(f"Tags normalisés: {normalized_tags}")
-        
-        # Étape 4: Réattribution des tags normalisés aux réponses
-        logger.info("Réattribution des tags normalisés aux réponses")
-        normalized_response_tags = reassign_normalized_tags(response_tags, normalized_tags)
-        logger.info(f"Tags normalisés réattribués: {normalized_response_tags}")
-        
-        # Étape 5: Génération des synthèses par tag normalisé
-        logger.info("Génération des synthèses par tag normalisé")
-        tag_summaries = generate_tag_summaries_with_mistral(normalized_response_tags, responses)
-        logger.info(f"Synthèses générées: {tag_summaries}")
-        
-        # Préparer les résultats
-        results = []
-        for index, row in df.iterrows():
-            logger.info(f"Préparation de la réponse {index+1}/{len(df)}: {row['response'][:50]}...")
-            
-            # Trouver les tags originaux correspondant à cette réponse
-            original_tags = []
-            for tag_item in response_tags:
-                if tag_item.get('response_id') == index + 1:
-                    original_tags = tag_item.get('tags', [])
-                    break
-            
-            # Trouver les tags normalisés correspondant à cette réponse
-            normalized_tags_for_response = []
-            for tag_item in normalized_response_tags:
-                if tag_item.get('response_id') == index + 1:
-                    normalized_tags_for_response = tag_item.get('normalized_tags', [])
-                    break
-            
-            # Récupérer les synthèses pour les tags normalisés de cette réponse
-            response_summaries = {}
-            for tag in normalized_tags_for_response:
-                if tag in tag_summaries:
-                    response_summaries[tag] = tag_summaries[tag]
-            
-            # Ajouter la réponse aux résultats
-            results.append({
-                'id': int(row['id']),
-                'response': row['response'],
-                'original_tags': original_tags,
-                'normalized_tags': normalized_tags_for_response,
-                'tag_summaries': response_summaries
-            })
+        # Les appels au LLM d'une analyse interactive passent devant ceux des tâches en arrière-plan
+        with llm_priority(PRIORITY_INTERACTIVE):
+            analysis = run_analysis_pipeline(df)
         
-        logger.info(f"Préparation terminée pour {len(results)} réponses")
-
         return jsonify({
             'success': True,
-            'results': results,
-            'tag_mapping': normalized_tags,
-            'tag_summaries': tag_summaries
+            **analysis
         })
 
     except Exception as e:
@@ -128,115 +225,70 @@ def test_workflow():
         logger.exception("Détail de l'erreur:")
         return jsonify({'error': str(e)}), 500
 
+def _get_uploaded_csv():
+    """
+    Récupère le fichier CSV envoyé dans la requête.
+    
+    Returns:
+        tuple: (fichier, None) si le fichier est valide, sinon (None, réponse d'erreur)
+    """
+    # Vérifier si un fichier a été envoyé
+    if 'file' not in request.files:
+        logger.error("Aucun fichier n'a été envoyé")
+        return None, (jsonify({'error': 'Aucun fichier n\'a été envoyé'}), 400)
+    
+    file = request.files['file']
+    
+    # Vérifier si le fichier a un nom
+    if file.filename == '':
+        logger.error("Aucun fichier sélectionné")
+        return None, (jsonify({'error': 'Aucun fichier sélectionné'}), 400)
+    
+    # Vérifier si le fichier est un CSV
+    if not file.filename.endswith('.csv'):
+        logger.error("Le fichier doit être au format CSV")
+        return None, (jsonify({'error': 'Le fichier doit être au format CSV'}), 400)
+    
+    return file, None
+
+def _get_incremental_dataset(file):
+    """
+    Retourne le nom du jeu de données si l'analyse incrémentale est demandée.
+    
+    L'analyse incrémentale est activée par le champ de formulaire 'incremental' ;
+    le jeu de données est nommé par le champ 'dataset' ou, à défaut, par le nom du fichier.
+    
+    Returns:
+        str: Nom du jeu de données, ou None pour une analyse complète
+    """
+    if request.form.get('incremental', '').lower() not in ('1', 'true', 'on'):
+        return None
+    return request.form.get('dataset') or file.filename
+
 @app.route('/import_and_test', methods=['POST'])
 def import_and_test():
     logger.info("Route /import_and_test appelée")
     try:
-        # Vérifier si un fichier a été envoyé
-        if 'file' not in request.files:
-            logger.error("Aucun fichier n'a été envoyé")
-            return jsonify({'error': 'Aucun fichier n\'a été envoyé'}), 400
-        
-        file = request.files['file']
-        
-        # Vérifier si le fichier a un nom
-        if file.filename == '':
-            logger.error("Aucun fichier sélectionné")
-            return jsonify({'error': 'Aucun fichier sélectionné'}), 400
-        
-        # Vérifier si le fichier est un CSV
-        if not file.filename.endswith('.csv'):
-            logger.error("Le fichier doit être au format CSV")
-            return jsonify({'error': 'Le fichier doit être au format CSV'}), 400
+        file, error_response = _get_uploaded_csv()
+        if error_response:
+            return error_response
         
         # Lire le fichier CSV
         logger.info("Lecture du fichier CSV importé")
         try:
-            # Lire le contenu du fichier en mémoire
-            file_content = file.read().decode('utf-8')
-            df = pd.read_csv(io.StringIO(file_content))
-            logger.info(f"Fichier CSV lu avec succès, {len(df)} lignes trouvées")
-            
-            # Vérifier si la colonne 'response' existe
-            if 'response' not in df.columns:
-                logger.error("Le fichier CSV doit contenir une colonne 'response'")
-                return jsonify({'error': 'Le fichier CSV doit contenir une colonne \'response\''}), 400
-            
-            # Limiter à 3 lignes pour les tests
-            # df = df.head(3)
-            # logger.info(f"Limitation à 3 lignes pour le test")
-            
-            # Extraire les réponses pour l'extraction des tags
-            responses = df['response'].tolist()
-            
-            # Étape 1: Extraction des tags
-            logger.info("Extraction des tags à partir des réponses")
-            response_tags = extract_tags_with_mistral(responses)
-            logger.info(f"Tags extraits: {response_tags}")
-            
-            # Étape 2: Collecter tous les tags uniques de toutes les réponses
-            all_unique_tags = set()
-            for item in response_tags:
-                all_unique_tags.update(item.get('tags', []))
-            all_unique_tags = list(all_unique_tags)
-            logger.info(f"Tags uniques collectés: {all_unique_tags}")
-            
-            # Étape 3: Normalisation des tags avec Mistral
-            logger.info("Normalisation des tags extraits")
-            normalized_tags = normalize_tags_with_mistral(all_unique_tags)
-            logger.info(f"Tags normalisés: {normalized_tags}")
-            
-            # Étape 4: Réattribution des tags normalisés aux réponses
-            logger.info("Réattribution des tags normalisés aux réponses")
-            normalized_response_tags = reassign_normalized_tags(response_tags, normalized_tags)
-            logger.info(f"Tags normalisés réattribués: {normalized_response_tags}")
-            
-            # Étape 5: Génération des synthèses par tag normalisé
-            logger.info("Génération des synthèses par tag normalisé")
-            tag_summaries = generate_tag_summaries_with_mistral(normalized_response_tags, responses)
-            logger.info(f"Synthèses générées: {tag_summaries}")
+            # Lire le fichier par lots directement depuis le flux téléversé
+            try:
+                batches = open_csv_batches(file.stream)
+            except ValueError as e:
+                logger.error(str(e))
+                return jsonify({'error': str(e)}), 400
             
-            # Préparer les résultats
-            results = []
-            for index, row in df.iterrows():
-                logger.info(f"Préparation de la réponse {index+1}/{len(df)}: {row['response'][:50]}...")
-                
-                # Trouver les tags originaux correspondant à cette réponse
-                original_tags = []
-                for tag_item in response_tags:
-                    if tag_item.get('response_id') == index + 1:
-                        original_tags = tag_item.get('tags', [])
-                        break
-                
-                # Trouver les tags normalisés correspondant à cette réponse
-                normalized_tags_for_response = []
-                for tag_item in normalized_response_tags:
-                    if tag_item.get('response_id') == index + 1:
-                        normalized_tags_for_response = tag_item.get('normalized_tags', [])
-                        break
-                
-                # Récupérer les synthèses pour les tags normalisés de cette réponse
-                response_summaries = {}
-                for tag in normalized_tags_for_response:
-                    if tag in tag_summaries:
-                        response_summaries[tag] = tag_summaries[tag]
-                
-                # Ajouter la réponse aux résultats
-                results.append({
-                    'id': int(row.get('id', index + 1)),
-                    'response': row['response'],
-                    'original_tags': original_tags,
-                    'normalized_tags': normalized_tags_for_response,
-                    'tag_summaries': response_summaries
-                })
+            with llm_priority(PRIORITY_INTERACTIVE):
+                analysis = run_analysis_pipeline(batches, dataset=_get_incremental_dataset(file))
             
-            logger.info(f"Préparation terminée pour {len(results)} réponses")
-
             return jsonify({
                 'success': True,
-                'results': results,
-                'tag_mapping': normalized_tags,
-                'tag_summaries': tag_summaries
+                **analysis
             })
             
         except Exception as e:
@@ -248,318 +300,1693 @@ def import_and_test():
         logger.exception("Détail de l'erreur:")
         return jsonify({'error': str(e)}), 500
 
-def extract_tags_with_mistral(responses):
+def stream_analysis_events(run):
     """
-    Extrait les tags des réponses en utilisant Mistral AI.
+    Exécute une analyse dans un thread et retourne ses événements au format NDJSON.
+    
+    Chaque ligne est un objet JSON dont le champ 'type' vaut :
+    - 'progress' : étape en cours (stage, done, total)
+    - 'rows' : lignes dont les tags viennent d'être extraits (row, id, response, original_tags)
+    - 'tag_mapping' : mapping des tags normalisés
+    - 'normalized' : tags normalisés des lignes (row, normalized_tags)
+    - 'summary' : synthèse d'un tag (tag, summary), envoyée une seule fois par tag
+    - 'done' : fin de l'analyse (identifiant des résultats enregistrés, nombre de
+      réponses, de tags et de synthèses)
+    - 'error' : erreur ayant interrompu l'analyse
+    
+    Si le client se déconnecte, l'analyse est annulée : les appels au LLM
+    suivants ne sont pas envoyés et le pipeline s'arrête au prochain événement.
     
     Args:
-        responses (list): Liste des réponses à analyser
+        run (callable): Fonction run(progress, on_event) qui exécute le pipeline
+            et retourne son résultat
     
     Returns:
-        list: Liste des tags extraits pour chaque réponse
+        generator: Lignes NDJSON, produites au fil de l'analyse (démarrée immédiatement)
     """
-    # Construire le prompt
-    prompt = """
-    Analyse les réponses suivantes et extrait les concepts clés (tags) présents dans chacune. 
+    events = queue.Queue()
+    cancelled = threading.Event()
     
-    Réponses à analyser:
-    """
+    def put(event):
+        if cancelled.is_set():
+            raise AnalysisCancelled("Client déconnecté")
+        events.put(event)
     
-    for i, response in enumerate(responses):
-        prompt += f"\n{i+1}. {response}"
+    def worker():
+        _pipeline_cancelled.set(cancelled)
+        try:
+            analysis = run(
+                lambda stage, done=0, total=0: put({'type': 'progress', 'stage': stage, 'done': done, 'total': total}),
+                put
+            )
+            events.put({
+                'type': 'done',
+                'analysis_id': analysis['analysis_id'],
+                'responses': len(analysis['results']),
+                'tags': len(analysis['tag_mapping']),
+                'summaries': len(analysis['tag_summaries'])
+            })
+        except AnalysisCancelled:
+            logger.info("Analyse en flux annulée après la déconnexion du client")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'analyse en flux: {str(e)}")
+            logger.exception("Détail de l'erreur:")
+            events.put({'type': 'error', 'error': str(e)})
+        finally:
+            events.put(None)
     
-    prompt += """
+    # Le contexte (priorité des appels au LLM) est transmis au thread d'analyse
+    threading.Thread(target=contextvars.copy_context().run, args=(worker,), daemon=True).start()
     
-    Pour chaque réponse, retourne les tags identifiés dans un format JSON structuré comme ceci:
-    [
-        {
-            "response_id": 1,
-            "tags": ["tag1", "tag2", "tag3"]
-        },
-        {
-            "response_id": 2,
-            "tags": ["tag4", "tag5"]
-        }
-    ]
+    def lines():
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    return
+                yield json.dumps(event, ensure_ascii=False) + '\n'
+        finally:
+            # Générateur fermé avant la fin de l'analyse : le client s'est déconnecté
+            cancelled.set()
     
-    Retourne uniquement le tableau JSON, sans autre texte explicatif.
+    return lines()
+
+@app.route('/import_and_test/stream', methods=['POST'])
+def import_and_test_stream():
+    logger.info("Route /import_and_test/stream appelée")
+    file, error_response = _get_uploaded_csv()
+    if error_response:
+        return error_response
+    
+    try:
+        batches = open_csv_batches(file.stream)
+    except ValueError as e:
+        logger.error(str(e))
+        return jsonify({'error': str(e)}), 400
+    dataset = _get_incremental_dataset(file)
+    
+    def run(progress, on_event):
+        return run_analysis_pipeline(batches, progress=progress, dataset=dataset, on_event=on_event)
+    
+    with llm_priority(PRIORITY_INTERACTIVE):
+        events = stream_analysis_events(run)
+    # Le flux téléversé reste ouvert tant que la réponse est en cours d'envoi
+    return Response(stream_with_context(events), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _get_stored_analysis(analysis_id):
     """
+    Retourne les informations d'une analyse enregistrée.
     
-    # Structure pour l'API Mistral
-    messages = [
-        ChatMessage(role="system", content="Vous êtes un analyste expert qui extrait des tags pertinents à partir de réponses utilisateur."),
-        ChatMessage(role="user", content=prompt)
-    ]
+    Returns:
+        tuple: (analyse, None) si elle existe, sinon (None, réponse d'erreur)
+    """
+    analysis = result_store.get(analysis_id)
+    if analysis is None:
+        return None, (jsonify({'error': 'Analyse introuvable'}), 404)
+    return analysis, None
+
+@app.route('/analyses/<analysis_id>')
+def get_analysis(analysis_id):
+    analysis, error_response = _get_stored_analysis(analysis_id)
+    if error_response:
+        return error_response
+    return jsonify(analysis)
+
+@app.route('/analyses/<analysis_id>/tags')
+def get_analysis_tags(analysis_id):
+    analysis, error_response = _get_stored_analysis(analysis_id)
+    if error_response:
+        return error_response
+    return jsonify({'tags': result_store.tag_counts(analysis_id)})
+
+@app.route('/analyses/<analysis_id>/summaries')
+def get_analysis_summaries(analysis_id):
+    analysis, error_response = _get_stored_analysis(analysis_id)
+    if error_response:
+        return error_response
+    return jsonify({'tag_summaries': result_store.summaries(analysis_id, request.args.getlist('tag'))})
+
+@app.route('/analyses/<analysis_id>/responses')
+def get_analysis_responses(analysis_id):
+    """
+    Page de réponses d'une analyse enregistrée.
     
+    Paramètres : tag (tag normalisé), q (recherche plein texte), offset et limit.
+    """
+    analysis, error_response = _get_stored_analysis(analysis_id)
+    if error_response:
+        return error_response
+    return jsonify(result_store.responses(
+        analysis_id,
+        tag=request.args.get('tag'),
+        search=request.args.get('q'),
+        offset=request.args.get('offset', 0, type=int),
+        limit=request.args.get('limit', 50, type=int)
+    ))
+
+@app.route('/analyses/<analysis_id>/cooccurrence')
+def get_analysis_cooccurrence(analysis_id):
+    """
+    Cooccurrences des tags d'une analyse enregistrée.
+
+    Avec le paramètre tag : tags les plus souvent associés à ce tag. Sans : matrice
+    des cooccurrences des limit tags les plus fréquents.
+    """
+    analysis, error_response = _get_stored_analysis(analysis_id)
+    if error_response:
+        return error_response
+    incidence = result_store.incidence(analysis_id)
+    limit = max(1, min(request.args.get('limit', 20, type=int), COOCCURRENCE_MAX_TAGS))
+    tag = request.args.get('tag')
+    if tag is not None:
+        if tag not in incidence.tags:
+            return jsonify({'error': 'Tag introuvable'}), 404
+        return jsonify({
+            'tag': tag,
+            'count': len(incidence.rows_with(tag)),
+            'related': [{'tag': other, 'count': count} for other, count in incidence.related_tags(tag, limit)]
+        })
+    tags = incidence.tags[:limit]
+    return jsonify({'tags': tags, 'matrix': incidence.cooccurrence(tags).values.tolist()})
+
+@app.route('/analyses/<analysis_id>/export/<table>.parquet')
+def export_analysis(analysis_id, table):
+    """
+    Export d'une table d'une analyse enregistrée au format Parquet (responses, incidence ou tags).
+    """
+    analysis, error_response = _get_stored_analysis(analysis_id)
+    if error_response:
+        return error_response
+    if table not in EXPORT_TABLES:
+        return jsonify({'error': f"Table inconnue, tables disponibles : {', '.join(EXPORT_TABLES)}"}), 404
+    columns = result_store.columns(analysis_id)
     try:
-        chat_response = mistral_client.chat(
-            model=MISTRAL_MODEL,
-            messages=messages,
-            temperature=0.3,
-            max_tokens=1024
+        tables = export_tables(
+            result_store.incidence(analysis_id), columns['id'], columns['response'], columns['original_tags'],
+            result_store.tag_mapping(analysis_id), result_store.summaries(analysis_id)
         )
-        
-        content = chat_response.choices[0].message.content
-        
-        # Essayer de parser le contenu comme JSON
-        try:
-            result = json.loads(content)
-            return result
-        except json.JSONDecodeError:
-            # Si ce n'est pas un JSON valide, essayer d'extraire avec regex
-            import re
-            match = re.search(r'\[(.*)\]', content, re.DOTALL)
-            if match:
-                try:
-                    result = json.loads(f"[{match.group(1)}]")
-                    return result
-                except:
-                    logger.warning(f"Impossible d'extraire les tags: {content}")
-                    return []
-            else:
-                logger.warning(f"Format de réponse incorrect pour les tags: {content}")
-                return []
-    except Exception as e:
-        logger.error(f"Erreur lors de l'extraction des tags: {str(e)}")
-        return []
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 501
+    buffer = io.BytesIO()
+    pq.write_table(tables[table], buffer)
+    return Response(
+        buffer.getvalue(), mimetype='application/vnd.apache.parquet',
+        headers={'Content-Disposition': f'attachment; filename="{analysis_id}-{table}.parquet"'}
+    )
 
-def normalize_tags_with_mistral(tags):
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    logger.info("Route /jobs appelée")
+    file, error_response = _get_uploaded_csv()
+    if error_response:
+        return error_response
+    
+    # Le fichier est écrit sur disque pour que la tâche puisse reprendre après un redémarrage
+    job_id = job_manager.new_job_id()
+    input_path = job_manager.input_path_for(job_id)
+    file.save(input_path)
+    params = {'filename': file.filename, 'dataset': _get_incremental_dataset(file)}
+    job_manager.submit(input_path=input_path, params=params, job_id=job_id)
+    logger.info(f"Tâche {job_id} créée pour le fichier {file.filename}")
+    
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Tâche introuvable'}), 404
+    return jsonify(job)
+
+def _run_import_job(job, progress):
     """
-    Nettoie et normalise les tags en utilisant Mistral AI.
+    Exécute l'analyse d'un fichier CSV importé, pour la file de tâches.
     
     Args:
-        tags (list): Liste des tags à normaliser
+        job (dict): Tâche à exécuter (id, input_path, params)
+        progress (callable): Fonction de suivi de progression par étape
     
     Returns:
-        dict: Dictionnaire des tags normalisés avec leurs tags originaux associés
+        dict: Résultats de l'analyse
     """
-    # Construire le prompt
-    prompt = """
-    Voici une liste de tags extraits de réponses à une question ouverte concernant l'expérience utilisateur d'une application. 
-    Ta mission est de normaliser ces tags en:
-    1. Regroupant les synonymes et concepts similaires sous un même tag normalisé
-    2. Supprimant les doublons et variations mineures
-    3. Uniformisant les formulations pour plus de cohérence
-    4. Créant des catégories claires et distinctes
+    batches = open_csv_batches(job['input_path'])
+    return run_analysis_pipeline(batches, progress=progress, dataset=job['params'].get('dataset'))
 
-    Règles importantes:
-    - Utilise des termes simples et clairs pour les tags normalisés
-    - Assure-toi que chaque tag original est associé à exactement un tag normalisé
-    - Préfère des noms plutôt que des adjectifs pour les tags normalisés
-    - Ne regroupe pas des concepts différents juste pour réduire le nombre de catégories
-    
-    Tags à normaliser:
+job_manager = JobManager(
+    os.path.join(JOBS_DIR, "jobs.sqlite3"),
+    JOBS_DIR,
+    runner=_run_import_job,
+    stages=PIPELINE_STAGES,
+    max_workers=JOB_MAX_WORKERS
+)
+
+def run_analysis_pipeline(data, progress=None, dataset=None, on_event=None, checkpoint=None, store=result_store):
     """
+    Exécute les cinq étapes de l'analyse sur des réponses.
     
-    for tag in tags:
-        prompt += f"\n- {tag}"
+    Les données peuvent être fournies par lots (voir ingestion.open_csv_batches) :
+    l'extraction des tags démarre alors dès la lecture du premier lot.
     
-    prompt += """
+    En mode incrémental (dataset renseigné), seules les lignes nouvelles ou
+    modifiées depuis la dernière analyse du jeu de données sont envoyées à
+    l'extraction, les nouveaux tags sont rattachés au vocabulaire existant et
+    seules les synthèses des tags dont les réponses ont changé sont régénérées.
     
-    Retourne un objet JSON structuré comme suit, sans autre texte explicatif:
-    {
-        "tag normalisé 1": ["tag original 1", "tag original 2", ...],
-        "tag normalisé 2": ["tag original 3", "tag original 4", ...],
-        ...
-    }
+    Args:
+        data (DataFrame | iterable): Données ou lots de données contenant une
+            colonne 'response' (et 'id' optionnelle)
+        progress (callable): Fonction progress(étape, fait, total) appelée au fil de l'analyse
+        dataset (str): Nom du jeu de données pour l'analyse incrémentale
+        on_event (callable): Fonction on_event(événement) recevant les résultats partiels
+            au fil de l'analyse (voir stream_analysis_events)
+        checkpoint (PipelineCheckpoint): Points de reprise : les étapes déjà terminées
+            ne sont pas recalculées et les appels au LLM déjà effectués ne sont pas refaits
+        store (ResultStore): Stockage des résultats, consultables depuis l'interface
+            (par défaut celui de l'application) ; None pour ne pas les enregistrer
     
-    Assure-toi que chaque tag original est associé à exactement un tag normalisé.
+    Returns:
+        dict: Identifiant des résultats enregistrés (None sans stockage), résultats par
+            réponse, mapping des tags et synthèses par tag
     """
+    token = _pipeline_checkpoint.set(checkpoint)
+    try:
+        return _run_analysis_pipeline(data, progress, dataset, on_event, checkpoint, store)
+    finally:
+        _pipeline_checkpoint.reset(token)
+
+def _run_analysis_pipeline(data, progress, dataset, on_event, checkpoint, store):
+    if progress is None:
+        progress = lambda stage, done=0, total=0: None
+    if on_event is None:
+        on_event = lambda event: None
     
-    # Structure pour l'API Mistral
-    messages = [
-        ChatMessage(role="system", content="Vous êtes un expert en analyse de données qui normalise et regroupe des tags similaires en catégories cohérentes."),
-        ChatMessage(role="user", content=prompt)
-    ]
+    if isinstance(data, pd.DataFrame):
+        data = [data]
     
-    try:
-        chat_response = mistral_client.chat(
-            model=MISTRAL_MODEL,
-            messages=messages,
-            temperature=0.2,
-            max_tokens=1024
-        )
+    state = analysis_state.load(dataset) if dataset else None
+    known_rows = state['rows'] if state else {}
+    
+    # Seules les colonnes utiles sont conservées, au fil de la lecture des lots
+    ids = []
+    responses = []
+    response_hashes = []
+    reused_tags = {}  # position de la réponse -> tags issus de l'analyse précédente
+    pending = []  # positions des réponses envoyées à l'extraction, dans l'ordre d'envoi
+    representative_of = {}  # position d'une réponse en double -> position de sa réponse représentative
+    # Extraction terminée lors d'une exécution précédente : les réponses sont seulement relues
+    saved_extraction = checkpoint.load('extraction') if checkpoint else None
+    deduplicator = None
+    if RESPONSE_DEDUP_ENABLED and saved_extraction is None:
+        deduplicator = ResponseDeduplicator(RESPONSE_DEDUP_THRESHOLD)
+    deduplicated = []  # positions des réponses passées au regroupement, dans l'ordre d'ajout
+    
+    def collect_batches():
+        for batch in data:
+            start = len(responses)
+            batch_responses = batch['response'].tolist()
+            if 'id' in batch.columns:
+                ids.extend(batch['id'].tolist())
+            else:
+                ids.extend(range(start + 1, start + len(batch_responses) + 1))
+            responses.extend(batch_responses)
+            
+            if not dataset:
+                candidates = list(range(start, len(responses)))
+            else:
+                candidates = []
+                for position in range(start, len(responses)):
+                    response_hash = hash_response(responses[position])
+                    response_hashes.append(response_hash)
+                    known = known_rows.get(str(ids[position]))
+                    if known and known[0] == response_hash:
+                        reused_tags[position] = known[1]
+                    else:
+                        candidates.append(position)
+            
+            if deduplicator:
+                # Seule la réponse représentative de chaque groupe est envoyée à l'extraction
+                deduplicated.extend(candidates)
+                groups = deduplicator.add([responses[position] for position in candidates])
+                for position, group in zip(candidates, groups):
+                    if deduplicated[group] != position:
+                        representative_of[position] = deduplicated[group]
+                candidates = [position for position in candidates if position not in representative_of]
+            
+            pending.extend(candidates)
+            yield [responses[position] for position in candidates]
+    
+    def emit_rows(positions, tags_for):
+        # Lignes (numéro de ligne, id, réponse, tags originaux), par paquets de STREAM_ROWS_PER_EVENT
+        for start in range(0, len(positions), STREAM_ROWS_PER_EVENT):
+            on_event({'type': 'rows', 'rows': [
+                {'row': position + 1, 'id': int(ids[position]), 'response': responses[position],
+                 'original_tags': tags_for(position)}
+                for position in positions[start:start + STREAM_ROWS_PER_EVENT]
+            ]})
+    
+    def on_chunk(offset, count, items):
+        # Les response_id de l'extraction sont relatifs aux réponses envoyées
+        chunk_tags = {item['response_id']: item.get('tags', []) for item in items}
+        tags_for = {pending[offset + k]: chunk_tags.get(offset + k + 1, []) for k in range(count)}
+        emit_rows(list(tags_for), tags_for.get)
+    
+    # Étape 1: Extraction des tags
+    logger.info("Extraction des tags à partir des réponses")
+    progress('extraction')
+    with PIPELINE_STAGE_SECONDS.time(stage='extraction'):
+        if saved_extraction is not None:
+            for _ in collect_batches():
+                pass
+        else:
+            extracted = extract_tags_from_batches(
+                collect_batches(), progress=lambda done, total: progress('extraction', done, total), on_chunk=on_chunk
+            )
+    PIPELINE_RESPONSES.inc(len(responses))
+    PIPELINE_DUPLICATES.inc(len(representative_of))
+    
+    if saved_extraction is not None:
+        logger.info("Tags extraits repris du point de reprise")
+        tags_by_position = {position: tags for position, tags in saved_extraction['tags']}
+        representative_of = {position: representative for position, representative in saved_extraction['duplicates']}
+        emit_rows(sorted(tags_by_position), tags_by_position.get)
+    else:
+        emit_rows(sorted(reused_tags), reused_tags.get)
         
-        content = chat_response.choices[0].message.content
+        # Les response_id de l'extraction sont relatifs aux réponses envoyées
+        tags_by_position = dict(reused_tags)
+        for item in extracted:
+            if 1 <= item['response_id'] <= len(pending):
+                tags_by_position.setdefault(pending[item['response_id'] - 1], item.get('tags', []))
         
-        # Essayer de parser le contenu comme JSON
-        try:
-            result = json.loads(content)
-            return result
-        except json.JSONDecodeError:
-            # Si ce n'est pas un JSON valide, essayer d'extraire avec regex
-            import re
-            match = re.search(r'\{(.*)\}', content, re.DOTALL)
-            if match:
-                try:
-                    result = json.loads(f"{{{match.group(1)}}}")
-                    return result
-                except:
-                    logger.warning(f"Impossible d'extraire les tags normalisés: {content}")
-                    return {}
-            else:
-                logger.warning(f"Format de réponse incorrect pour les tags normalisés: {content}")
-                return {}
-    except Exception as e:
-        logger.error(f"Erreur lors de la normalisation des tags: {str(e)}")
-        return {}
+        # Les tags de chaque réponse représentative sont attribués aux membres de son groupe
+        for position, representative in representative_of.items():
+            if representative in tags_by_position:
+                tags_by_position[position] = tags_by_position[representative]
+        emit_rows(sorted(representative_of), lambda position: tags_by_position.get(position, []))
+        
+        if checkpoint:
+            checkpoint.save('extraction', {
+                'tags': sorted(tags_by_position.items()),
+                'duplicates': sorted(representative_of.items())
+            })
+    
+    response_tags = [
+        {'response_id': position + 1, 'tags': tags_by_position[position]}
+        for position in sorted(tags_by_position)
+    ]
+    logger.info(
+        f"{len(responses)} réponses lues, {len(pending)} envoyées à l'extraction "
+        f"({len(representative_of)} doublons regroupés), {len(response_tags)} réponses taguées"
+    )
+    
+    # Étape 2: Collecter tous les tags uniques de toutes les réponses
+    progress('collecte')
+    with PIPELINE_STAGE_SECONDS.time(stage='collecte'):
+        all_unique_tags = set()
+        for item in response_tags:
+            all_unique_tags.update(item.get('tags', []))
+        # Un ordre stable rend les prompts de normalisation identiques d'une exécution à l'autre
+        all_unique_tags = sorted(all_unique_tags)
+    logger.info(f"{len(all_unique_tags)} tags uniques collectés")
+    
+    # Étape 3: Normalisation des tags avec Mistral
+    logger.info("Normalisation des tags extraits")
+    progress('normalisation')
+    with PIPELINE_STAGE_SECONDS.time(stage='normalisation'):
+        saved = checkpoint.load('normalisation') if checkpoint else None
+        if saved is not None:
+            logger.info("Tags normalisés repris du point de reprise")
+            normalized_tags, vocabulary = saved['tag_mapping'], saved['vocabulary']
+        elif state and state['vocabulary']:
+            # Seuls les tags absents du vocabulaire existant sont rattachés par le modèle
+            vocabulary = extend_tag_vocabulary(all_unique_tags, state['vocabulary'])
+            current = set(all_unique_tags)
+            normalized_tags = {}
+            for normalized, originals in vocabulary.items():
+                present = [original for original in originals if original in current]
+                if present:
+                    normalized_tags[normalized] = present
+        else:
+            # Les variantes évidentes (casse, accents, pluriels...) sont fusionnées localement
+            # et seul un représentant par variante est envoyé au modèle
+            representatives, tag_variants = prenormalize_tags(all_unique_tags, count_tags(response_tags))
+            logger.info(f"Pré-normalisation locale: {len(all_unique_tags)} tags, {len(representatives)} envoyés au modèle")
+            normalized_tags = expand_tag_mapping(normalize_tags(representatives), tag_variants)
+            vocabulary = normalized_tags
+        if checkpoint and saved is None:
+            checkpoint.save('normalisation', {'tag_mapping': normalized_tags, 'vocabulary': vocabulary})
+    logger.info(f"{len(normalized_tags)} tags normalisés")
+    on_event({'type': 'tag_mapping', 'tag_mapping': normalized_tags})
+    
+    # Étape 4: Réattribution des tags normalisés aux réponses
+    logger.info("Réattribution des tags normalisés aux réponses")
+    progress('reattribution')
+    with PIPELINE_STAGE_SECONDS.time(stage='reattribution'):
+        normalized_response_tags = reassign_normalized_tags(response_tags, normalized_tags)
+    for start in range(0, len(normalized_response_tags), STREAM_ROWS_PER_EVENT):
+        on_event({'type': 'normalized', 'rows': [
+            {'row': item['response_id'], 'normalized_tags': item.get('normalized_tags', [])}
+            for item in normalized_response_tags[start:start + STREAM_ROWS_PER_EVENT]
+        ]})
+    
+    # Étape 5: Génération des synthèses par tag normalisé
+    logger.info("Génération des synthèses par tag normalisé")
+    progress('syntheses')
+    with PIPELINE_STAGE_SECONDS.time(stage='syntheses'):
+        members_hashes = {}
+        reusable_summaries = {}
+        if dataset:
+            # Une synthèse est réutilisée si l'ensemble des réponses du tag n'a pas changé
+            for tag, tag_responses_list in group_responses_by_tag(normalized_response_tags, responses).items():
+                members_hashes[tag] = hash_members(tag_responses_list)
+                previous = state['summaries'].get(tag)
+                if previous and previous[0] == members_hashes[tag]:
+                    reusable_summaries[tag] = previous[1]
+            logger.info(f"{len(reusable_summaries)}/{len(members_hashes)} synthèses réutilisées")
+        
+        # Les réponses en double sont remplacées par leur représentante : les synthèses
+        # les comptent comme des occurrences d'une même réponse
+        summary_responses = responses
+        if representative_of:
+            summary_responses = [responses[representative_of.get(position, position)] for position in range(len(responses))]
+        if checkpoint:
+            # Synthèses d'une exécution précédente (les appels déjà faits sont repris un à un)
+            reusable_summaries.update(checkpoint.load('syntheses') or {})
+        tag_summaries = generate_tag_summaries_with_mistral(
+            normalized_response_tags, summary_responses,
+            progress=lambda done, total: progress('syntheses', done, total),
+            cached_summaries=reusable_summaries,
+            on_summary=lambda tag, summary: on_event({'type': 'summary', 'tag': tag, 'summary': summary})
+        )
+    logger.info(f"{len(tag_summaries)} synthèses générées")
+    if checkpoint:
+        checkpoint.save('syntheses', tag_summaries)
+    
+    if dataset:
+        with PIPELINE_STAGE_SECONDS.time(stage='enregistrement'):
+            analysis_state.save(
+                dataset,
+                rows=[(ids[position], response_hashes[position], tags) for position, tags in tags_by_position.items()],
+                vocabulary=vocabulary,
+                summaries={tag: (members_hashes[tag], summary) for tag, summary in tag_summaries.items() if tag in members_hashes}
+            )
+    
+    # Préparer les résultats
+    with PIPELINE_STAGE_SECONDS.time(stage='assemblage'):
+        results = assemble_results(ids, responses, response_tags, normalized_response_tags, tag_summaries)
+    
+    analysis_id = None
+    if store is not None:
+        with PIPELINE_STAGE_SECONDS.time(stage='stockage'):
+            analysis_id = store.save(
+                ids, responses, response_tags, normalized_response_tags, normalized_tags, tag_summaries, dataset=dataset
+            )
+    
+    logger.info(f"Préparation terminée pour {len(results)} réponses")
+    
+    return {
+        'analysis_id': analysis_id,
+        'results': results,
+        'tag_mapping': normalized_tags,
+        'tag_summaries': tag_summaries
+    }
 
-def reassign_normalized_tags(response_tags, normalized_tags):
+def assemble_results(ids, responses, response_tags, normalized_response_tags, tag_summaries):
     """
-    Réattribue les tags normalisés à chaque réponse.
+    Assemble les résultats par réponse à partir des sorties du pipeline.
+    
+    Les tags sont indexés par response_id pour un assemblage en temps linéaire.
     
     Args:
-        response_tags (list): Liste des tags par réponse
-        normalized_tags (dict): Dictionnaire de mapping des tags originaux vers les tags normalisés
+        ids (list): Identifiants des réponses
+        responses (list): Textes des réponses
+        response_tags (list): Tags extraits par réponse
+        normalized_response_tags (list): Tags normalisés par réponse
+        tag_summaries (dict): Synthèses par tag normalisé
     
     Returns:
-        list: Liste des tags normalisés par réponse
+        list: Résultats par réponse (id, réponse, tags originaux et normalisés, synthèses)
     """
-    # Créer un mapping inverse pour faciliter la recherche
-    tag_mapping = {}
-    for normalized, originals in normalized_tags.items():
-        for original in originals:
-            tag_mapping[original.lower()] = normalized
+    # En cas de doublon, la première entrée l'emporte, comme pour une recherche séquentielle
+    original_by_id = {}
+    for tag_item in response_tags:
+        original_by_id.setdefault(tag_item.get('response_id'), tag_item.get('tags', []))
     
-    # Réattribuer les tags normalisés à chaque réponse
-    normalized_response_tags = []
+    normalized_by_id = {}
+    for tag_item in normalized_response_tags:
+        normalized_by_id.setdefault(tag_item.get('response_id'), tag_item.get('normalized_tags', []))
     
-    for response_item in response_tags:
-        response_id = response_item.get('response_id')
-        original_tags = response_item.get('tags', [])
-        
-        # Convertir les tags originaux en tags normalisés
-        normalized_tags_for_response = []
-        for tag in original_tags:
-            normalized_tag = tag_mapping.get(tag.lower())
-            if normalized_tag and normalized_tag not in normalized_tags_for_response:
-                normalized_tags_for_response.append(normalized_tag)
-            elif not normalized_tag:
-                # Si aucune correspondance exacte n'est trouvée, chercher une correspondance partielle
-                for original, normalized in tag_mapping.items():
-                    if tag.lower() in original or original in tag.lower():
-                        if normalized not in normalized_tags_for_response:
-                            normalized_tags_for_response.append(normalized)
-                            break
-        
-        normalized_response_tags.append({
-            'response_id': response_id,
-            'original_tags': original_tags,
-            'normalized_tags': normalized_tags_for_response
+    results = []
+    for response_id, (row_id, response) in enumerate(zip(ids, responses), start=1):
+        normalized_tags_for_response = normalized_by_id.get(response_id, [])
+        results.append({
+            'id': int(row_id),
+            'response': response,
+            'original_tags': original_by_id.get(response_id, []),
+            'normalized_tags': normalized_tags_for_response,
+            'tag_summaries': {tag: tag_summaries[tag] for tag in normalized_tags_for_response if tag in tag_summaries}
         })
     
-    return normalized_response_tags
+    return results
 
-def generate_tag_summaries_with_mistral(response_tags, responses):
+def call_mistral(messages, temperature, max_tokens, stage=None, cacheable=None):
     """
-    Génère une synthèse pour chaque tag normalisé en utilisant Mistral AI.
+    Envoie une requête de chat au fournisseur de LLM configuré et retourne le texte généré.
+    
+    Le modèle utilisé est celui de l'étape dans LLM_STAGE_MODELS, à défaut MISTRAL_MODEL.
+    Les appels passent par l'ordonnanceur partagé (llm_scheduler) : au plus
+    MISTRAL_MAX_IN_FLIGHT appels simultanés, débit limité, priorité aux analyses
+    interactives, nouvelles tentatives sur les erreurs transitoires et fusion
+    des requêtes identiques en cours.
+    Les réponses sont mises en cache sur disque : une requête identique
+    (modèle, paramètres et messages) ne refait pas d'appel à l'API. Pendant une
+    analyse avec points de reprise, elles y sont aussi enregistrées. Seules les
+    réponses acceptées par cacheable sont enregistrées (ou relues) dans le cache
+    et les points de reprise, pour qu'une réponse mal formée ou coupée ne soit
+    pas rejouée indéfiniment.
     
     Args:
-        response_tags (list): Liste des tags normalisés par réponse
-        responses (list): Liste des réponses originales
+        messages (list): Messages de la conversation
+        temperature (float): Température d'échantillonnage
+        max_tokens (int): Nombre maximum de tokens générés
+        stage (str): Étape du pipeline ('extraction', 'normalization', 'summary')
+        cacheable (callable): Fonction cacheable(contenu) indiquant si la réponse
+            peut être mise en cache (par défaut, toute réponse)
     
     Returns:
-        dict: Dictionnaire des synthèses par tag normalisé
+        str: Contenu de la réponse du modèle
     """
-    # Créer un dictionnaire pour regrouper les réponses par tag normalisé
-    tag_responses = {}
+    cancelled = _pipeline_cancelled.get()
+    if cancelled is not None and cancelled.is_set():
+        raise AnalysisCancelled("Analyse annulée")
     
-    # Pour chaque réponse, ajouter à tous les tags normalisés associés
-    for item in response_tags:
-        response_id = item.get('response_id')
-        if response_id <= len(responses):  # Vérifier que l'ID est valide
-            response_index = response_id - 1  # Convertir en index 0-based
-            response_text = responses[response_index]
-            
-            for tag in item.get('normalized_tags', []):
-                if tag not in tag_responses:
-                    tag_responses[tag] = []
-                tag_responses[tag].append(response_text)
+    model = LLM_STAGE_MODELS.get(stage, MISTRAL_MODEL)
+    cache_key = make_cache_key(model, temperature, max_tokens, messages, provider=llm_provider.name)
+    accepted = lambda content: content is not None and (cacheable is None or cacheable(content))
+    if llm_cache is not None:
+        cached = llm_cache.get(cache_key)
+        if cached is not None and not accepted(cached):
+            # Réponse mise en cache avant la vérification de son format
+            cached = None
+        LLM_CACHE_REQUESTS.inc(stage=stage, result='hit' if cached is not None else 'miss')
+        if cached is not None:
+            return cached
+    checkpoint = _pipeline_checkpoint.get()
+    if checkpoint is not None:
+        cached = checkpoint.get_call(cache_key)
+        if accepted(cached):
+            return cached
     
-    # Générer une synthèse pour chaque tag normalisé
-    summaries = {}
+    attempts = [0]
     
-    for tag, tag_responses_list in tag_responses.items():
-        # Construire le prompt
-        prompt = f"""
-        Analyse les {len(tag_responses_list)} réponses suivantes qui ont été associées au tag "{tag}".
-        
-        Réponses:
-        """
-        
-        for i, response in enumerate(tag_responses_list):
-            prompt += f"\n{i+1}. {response}"
-        
-        prompt += f"""
-        
-        Génère une synthèse concise qui:
-        1. Résume les idées principales exprimées dans ces réponses
-        2. Mentionne que {len(tag_responses_list)} utilisateurs ont exprimé des idées liées à ce tag
-        3. Inclut tous les verbatims représentatifs en extrayant UNIQUEMENT les parties des réponses qui concernent spécifiquement le tag "{tag}" (ne pas inclure les parties de réponses non pertinentes pour ce tag)
-        
-        
-        Format de la réponse:
-        {{
-            "synthèse": "Résumé des idées principales en 2-3 phrases",
-            "nombre_utilisateurs": {len(tag_responses_list)},
-            "verbatims": ["Extrait pertinent 1", "Extrait pertinent 2", "..."]
-        }}
-        
-        Retourne uniquement l'objet JSON, sans autre texte explicatif.
-        """
-        
-        # Structure pour l'API Mistral
-        messages = [
-            ChatMessage(role="system", content="Vous êtes un analyste expert qui synthétise des retours utilisateurs de manière concise et pertinente."),
-            ChatMessage(role="user", content=prompt)
-        ]
-        
+    def request():
+        attempts[0] += 1
+        if attempts[0] > 1:
+            LLM_RETRIES.inc(stage=stage)
+        LLM_IN_FLIGHT.inc()
         try:
-            logger.info(f"Génération de la synthèse pour le tag '{tag}'")
-            chat_response = mistral_client.chat(
-                model=MISTRAL_MODEL,
-                messages=messages,
-                temperature=0.3,
-                max_tokens=1024
-            )
-            
-            content = chat_response.choices[0].message.content
-            
-            # Essayer de parser le contenu comme JSON
-            try:
-                result = json.loads(content)
-                summaries[tag] = result
-            except json.JSONDecodeError:
-                # Si ce n'est pas un JSON valide, essayer d'extraire avec regex
-                import re
-                match = re.search(r'\{(.*)\}', content, re.DOTALL)
-                if match:
-                    try:
-                        result = json.loads(f"{{{match.group(1)}}}")
-                        summaries[tag] = result
-                    except:
-                        logger.warning(f"Impossible d'extraire la synthèse pour le tag '{tag}': {content}")
-                        summaries[tag] = {
-                            "synthèse": "Erreur lors de la génération de la synthèse",
-                            "nombre_utilisateurs": len(tag_responses_list),
-                            "verbatims": []
-                        }
-                else:
-                    logger.warning(f"Format de réponse incorrect pour la synthèse du tag '{tag}': {content}")
-                    summaries[tag] = {
-                        "synthèse": content,
-                        "nombre_utilisateurs": len(tag_responses_list),
-                        "verbatims": []
-                    }
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération de la synthèse pour le tag '{tag}': {str(e)}")
-            summaries[tag] = {
-                "synthèse": f"Erreur: {str(e)}",
-                "nombre_utilisateurs": len(tag_responses_list),
+            with LLM_REQUEST_SECONDS.time(stage=stage, model=model):
+                result = llm_provider.chat(model, messages, temperature, max_tokens)
+        except Exception:
+            LLM_ERRORS.inc(stage=stage)
+            raise
+        finally:
+            LLM_IN_FLIGHT.dec()
+        
+        LLM_TOKENS.inc(result.prompt_tokens, stage=stage, kind='prompt')
+        LLM_TOKENS.inc(result.completion_tokens, stage=stage, kind='completion')
+        if llm_cache is not None and accepted(result.content):
+            llm_cache.set(cache_key, result.content)
+        return result.content
+    
+    tokens = sum(estimate_tokens(message['content']) for message in messages) + max_tokens
+    content = llm_scheduler.run(cache_key, request, tokens=tokens)
+    if not attempts[0]:
+        LLM_COALESCED.inc(stage=stage)
+    if checkpoint is not None and accepted(content):
+        checkpoint.set_call(cache_key, content)
+    return content
+
+def _complete_json(kind, element=None):
+    """
+    Retourne une fonction cacheable pour call_mistral : vraie si la réponse est un
+    JSON complet (valide, ou complet dans du texte) du type attendu.
+    """
+    return lambda content: parse_json_output(content, kind, element).complete
+
+def _parse_llm_json(content, kind, stage, element=None):
+    """
+    Interprète la réponse JSON du LLM (voir llm_output.parse_json_output) et
+    compte les réponses qui n'étaient pas du JSON valide.
+    
+    Args:
+        content (str): Texte retourné par le LLM
+        kind (type): list ou dict
+        stage (str): Étape du pipeline, pour les métriques
+        element (type): Type attendu des éléments d'un tableau
+    
+    Returns:
+        ParsedOutput: Valeur obtenue (None en cas d'échec) et statut
+    """
+    parsed = parse_json_output(content, kind, element)
+    if parsed.status != PARSE_JSON:
+        LLM_PARSE_FALLBACKS.inc(stage=stage, result=parsed.status)
+    return parsed
+
+def chunk_responses(responses, max_tokens=EXTRACTION_CHUNK_TOKENS, max_responses=EXTRACTION_CHUNK_MAX_RESPONSES):
+    """
+    Découpe les réponses en lots respectant un budget de tokens.
+    
+    Args:
+        responses (list): Liste des réponses à découper
+        max_tokens (int): Budget de tokens estimé par lot
+        max_responses (int): Nombre maximum de réponses par lot
+    
+    Returns:
+        list: Liste de tuples (index de la première réponse, réponses du lot)
+    """
+    chunks = []
+    current = []
+    current_start = 0
+    current_tokens = 0
+    
+    for i, response in enumerate(responses):
+        tokens = estimate_tokens(response)
+        # Une réponse plus longue que le budget forme son propre lot
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_responses):
+            chunks.append((current_start, current))
+            current = []
+            current_tokens = 0
+        if not current:
+            current_start = i
+        current.append(response)
+        current_tokens += tokens
+    
+    if current:
+        chunks.append((current_start, current))
+    
+    return chunks
+
+def _extract_tags_chunk(responses, offset=0):
+    """
+    Extrait les tags d'un lot de réponses en un seul appel à Mistral AI.
+    
+    Si la sortie du modèle omet des réponses (sortie coupée, réponse mal
+    formée), les tags des réponses obtenues sont conservés et seules les
+    réponses manquantes sont renvoyées à l'extraction (au plus
+    EXTRACTION_MAX_REQUEUE fois).
+    
+    Args:
+        responses (list): Réponses du lot
+        offset (int): Index global de la première réponse du lot
+    
+    Returns:
+        list: Tags extraits, numérotés avec les response_id globaux
+    """
+    numbered = [(offset + i + 1, response) for i, response in enumerate(responses)]
+    extracted = {}
+    
+    for attempt in range(EXTRACTION_MAX_REQUEUE + 1):
+        if attempt:
+            logger.info(f"Réponses absentes de la sortie de l'extraction, {len(numbered)} réponses renvoyées à l'extraction")
+        items = _extract_numbered_responses(numbered)
+        if items is None:
+            # Échec de l'appel (nouvelles tentatives déjà faites par call_mistral)
+            break
+        for item in items:
+            extracted.setdefault(item['response_id'], item)
+        numbered = [(response_id, response) for response_id, response in numbered if response_id not in extracted]
+        if not numbered:
+            break
+    
+    return [extracted[response_id] for response_id in sorted(extracted)]
+
+def _extract_numbered_responses(numbered):
+    """
+    Extrait les tags de réponses numérotées en un seul appel à Mistral AI.
+    
+    Les réponses sont numérotées à partir de 1 dans le prompt : un lot dont les
+    réponses n'ont pas changé produit le même prompt, donc la même clé de cache,
+    quelle que soit sa position dans le fichier.
+    
+    Args:
+        numbered (list): Couples (response_id global, réponse)
+    
+    Returns:
+        list: Tags extraits des réponses demandées (None si l'appel a échoué)
+    """
+    # Construire le prompt
+    prompt = """
+    Analyse les réponses suivantes et extrait les concepts clés (tags) présents dans chacune. 
+    
+    Réponses à analyser:
+    """
+    
+    for number, (_, response) in enumerate(numbered, start=1):
+        prompt += f"\n{number}. {response}"
+    
+    prompt += """
+    
+    Pour chaque réponse, retourne les tags identifiés dans un format JSON structuré comme ceci:
+    [
+        {
+            "response_id": 1,
+            "tags": ["tag1", "tag2", "tag3"]
+        },
+        {
+            "response_id": 2,
+            "tags": ["tag4", "tag5"]
+        }
+    ]
+    
+    Utilise le numéro de chaque réponse comme response_id.
+    Retourne uniquement le tableau JSON, sans autre texte explicatif.
+    """
+    
+    # Structure pour l'API Mistral
+    messages = [
+        {"role": "system", "content": "Vous êtes un analyste expert qui extrait des tags pertinents à partir de réponses utilisateur."},
+        {"role": "user", "content": prompt}
+    ]
+    
+    max_tokens = min(EXTRACTION_MAX_OUTPUT_TOKENS, 128 + EXTRACTION_OUTPUT_TOKENS_PER_RESPONSE * len(numbered))
+    
+    try:
+        content = call_mistral(
+            messages, temperature=0.3, max_tokens=max_tokens, stage='extraction',
+            cacheable=_complete_json(list, element=dict)
+        )
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de l'extraction des tags: {str(e)}")
+        return None
+    
+    parsed = _parse_llm_json(content, list, stage='extraction', element=dict)
+    if parsed.value is None:
+        logger.warning(f"Format de réponse incorrect pour les tags: {content}")
+        return []
+    
+    # Numéros du prompt -> response_id globaux
+    items = []
+    for item in parsed.value:
+        try:
+            number = int(item.get('response_id'))
+        except (TypeError, ValueError):
+            continue
+        if 1 <= number <= len(numbered):
+            item['response_id'] = numbered[number - 1][0]
+            items.append(item)
+    return items
+
+def extract_tags_with_mistral(responses, max_workers=None, progress=None):
+    """
+    Extrait les tags des réponses en utilisant Mistral AI.
+    
+    Les réponses sont découpées en lots selon un budget de tokens, puis les
+    lots sont traités en parallèle. Les response_id restent globaux (1-based).
+    
+    Args:
+        responses (list): Liste des réponses à analyser
+        max_workers (int): Nombre de lots traités simultanément
+        progress (callable): Fonction progress(lots traités, total) appelée après chaque lot
+    
+    Returns:
+        list: Liste des tags extraits pour chaque réponse
+    """
+    return extract_tags_from_batches([responses], max_workers=max_workers, progress=progress)
+
+def extract_tags_from_batches(batches, max_workers=None, progress=None, on_chunk=None):
+    """
+    Extrait les tags de réponses fournies par lots successifs.
+    
+    Chaque lot est découpé et envoyé au pool d'extraction dès sa lecture,
+    sans attendre la fin de la lecture du fichier. Les response_id sont
+    globaux à l'ensemble des lots (1-based).
+    
+    Args:
+        batches (iterable): Lots de réponses (listes de str)
+        max_workers (int): Nombre de lots traités simultanément
+        progress (callable): Fonction progress(lots traités, lots soumis) appelée après chaque lot
+        on_chunk (callable): Fonction on_chunk(offset, nombre de réponses, tags extraits)
+            appelée dès qu'un lot est extrait, depuis le thread qui l'a traité
+    
+    Returns:
+        list: Liste des tags extraits pour chaque réponse
+    """
+    completed = [0]
+    submitted = [0]
+    completed_lock = threading.Lock()
+    
+    def run_chunk(chunk):
+        offset, chunk_responses_list = chunk
+        result = _extract_tags_chunk(chunk_responses_list, offset)
+        if on_chunk:
+            on_chunk(offset, len(chunk_responses_list), result)
+        if progress:
+            with completed_lock:
+                completed[0] += 1
+                progress(completed[0], submitted[0])
+        return result
+    
+    max_workers = max_workers or EXTRACTION_MAX_WORKERS
+    futures = []
+    offset = 0
+    
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in batches:
+            for chunk_offset, chunk in chunk_responses(batch):
+                with completed_lock:
+                    submitted[0] += 1
+                futures.append(executor.submit(run_chunk, (offset + chunk_offset, chunk)))
+            offset += len(batch)
+        
+        if len(futures) > 1:
+            logger.info(f"Extraction des tags en {len(futures)} lots ({max_workers} en parallèle)")
+        chunk_results = [future.result() for future in futures]
+    
+    # Fusionner les résultats des lots dans l'ordre des réponses
+    merged = {}
+    for chunk_result in chunk_results:
+        for item in chunk_result:
+            merged.setdefault(item['response_id'], item)
+    
+    return [merged[response_id] for response_id in sorted(merged)]
+
+def normalize_tags(tags, max_workers=None):
+    """
+    Normalise les tags selon le mode configuré (NORMALIZATION_MODE).
+    
+    Args:
+        tags (list): Liste des tags à normaliser
+        max_workers (int): Nombre d'appels au LLM simultanés
+    
+    Returns:
+        dict: Dictionnaire des tags normalisés avec leurs tags originaux associés
+    """
+    if NORMALIZATION_MODE == 'embeddings':
+        return normalize_tags_with_embeddings(tags, max_workers=max_workers)
+    return normalize_tags_with_mistral(tags, max_workers=max_workers)
+
+def normalize_tags_with_mistral(tags, max_workers=None):
+    """
+    Nettoie et normalise les tags en utilisant Mistral AI.
+    
+    Au-delà de NORMALIZATION_BATCH_SIZE tags, la normalisation est hiérarchique :
+    les tags sont répartis en lots de tags lexicalement proches, chaque lot est
+    normalisé en parallèle, puis les catégories obtenues sont elles-mêmes
+    normalisées pour fusionner les synonymes issus de lots différents.
+    
+    Args:
+        tags (list): Liste des tags à normaliser
+        max_workers (int): Nombre de lots normalisés simultanément
+    
+    Returns:
+        dict: Dictionnaire des tags normalisés avec leurs tags originaux associés
+    """
+    if not tags:
+        return {}
+    
+    if len(tags) <= NORMALIZATION_BATCH_SIZE:
+        return _complete_tag_mapping(_normalize_tags_batch(tags), tags)
+    
+    # Map : normalisation de chaque lot de tags proches
+    batches = cluster_tags(tags, NORMALIZATION_BATCH_SIZE)
+    max_workers = min(max_workers or NORMALIZATION_MAX_WORKERS, len(batches))
+    logger.info(f"Normalisation de {len(tags)} tags en {len(batches)} lots ({max_workers} en parallèle)")
+    
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        batch_mappings = list(executor.map(
+            lambda batch: _complete_tag_mapping(_normalize_tags_batch(batch), batch), batches
+        ))
+    
+    # Les catégories de même nom (à la casse près) issues de lots différents sont regroupées
+    categories = {}
+    category_index = {}
+    for mapping in batch_mappings:
+        for normalized, originals in mapping.items():
+            category = category_index.setdefault(normalized.casefold(), normalized)
+            categories.setdefault(category, []).extend(originals)
+    
+    # Reduce : fusion des catégories synonymes entre lots
+    if len(categories) >= len(tags):
+        # Aucune réduction obtenue, inutile de relancer une passe de fusion
+        return categories
+    
+    merged = normalize_tags_with_mistral(list(categories), max_workers=max_workers)
+    
+    # Les noms de catégories retournés par le modèle peuvent différer par la casse
+    result = {}
+    for normalized, category_names in merged.items():
+        originals = result.setdefault(normalized, [])
+        for category in category_names:
+            for original in categories.get(category_index.get(category.casefold()), []):
+                if original not in originals:
+                    originals.append(original)
+    return result
+
+def _complete_tag_mapping(mapping, tags):
+    """
+    Vérifie le mapping retourné par le modèle et y ajoute les tags oubliés.
+    
+    Les tags originaux retournés par le modèle sont ramenés à l'orthographe des
+    tags soumis (le modèle en change parfois la casse) ; ceux qui ne correspondent
+    à aucun tag soumis sont ignorés. Un tag absent du mapping devient sa propre
+    catégorie, afin que les réponses concernées restent taguées même si le modèle
+    l'a omis ou si l'appel a échoué.
+    
+    Args:
+        mapping (dict): Mapping tag normalisé -> tags originaux retourné par le modèle
+        tags (list): Tags soumis au modèle
+    
+    Returns:
+        dict: Mapping couvrant tous les tags soumis
+    """
+    submitted = {}
+    for tag in tags:
+        spellings = submitted.setdefault(tag.casefold(), [])
+        if tag not in spellings:
+            spellings.append(tag)
+    
+    completed = {}
+    covered = set()
+    if isinstance(mapping, dict):
+        for normalized, originals in mapping.items():
+            if not isinstance(originals, list):
+                continue
+            resolved = []
+            for original in originals:
+                key = str(original).casefold()
+                if key in submitted and key not in covered:
+                    resolved.extend(submitted[key])
+                    covered.add(key)
+            if resolved:
+                completed.setdefault(str(normalized), []).extend(resolved)
+    
+    for tag in tags:
+        if tag.casefold() not in covered:
+            completed.setdefault(tag, []).append(tag)
+            covered.add(tag.casefold())
+    
+    return completed
+
+def _normalize_tags_batch(tags):
+    """
+    Normalise un lot de tags en un seul appel à Mistral AI.
+    
+    Args:
+        tags (list): Liste des tags à normaliser
+    
+    Returns:
+        dict: Dictionnaire des tags normalisés avec leurs tags originaux associés
+    """
+    # Construire le prompt
+    prompt = """
+    Voici une liste de tags extraits de réponses à une question ouverte concernant l'expérience utilisateur d'une application. 
+    Ta mission est de normaliser ces tags en:
+    1. Regroupant les synonymes et concepts similaires sous un même tag normalisé
+    2. Supprimant les doublons et variations mineures
+    3. Uniformisant les formulations pour plus de cohérence
+    4. Créant des catégories claires et distinctes
+
+    Règles importantes:
+    - Utilise des termes simples et clairs pour les tags normalisés
+    - Assure-toi que chaque tag original est associé à exactement un tag normalisé
+    - Préfère des noms plutôt que des adjectifs pour les tags normalisés
+    - Ne regroupe pas des concepts différents juste pour réduire le nombre de catégories
+    
+    Tags à normaliser:
+    """
+    
+    for tag in tags:
+        prompt += f"\n- {tag}"
+    
+    prompt += """
+    
+    Retourne un objet JSON structuré comme suit, sans autre texte explicatif:
+    {
+        "tag normalisé 1": ["tag original 1", "tag original 2", ...],
+        "tag normalisé 2": ["tag original 3", "tag original 4", ...],
+        ...
+    }
+    
+    Assure-toi que chaque tag original est associé à exactement un tag normalisé.
+    """
+    
+    # Structure pour l'API Mistral
+    messages = [
+        {"role": "system", "content": "Vous êtes un expert en analyse de données qui normalise et regroupe des tags similaires en catégories cohérentes."},
+        {"role": "user", "content": prompt}
+    ]
+    
+    try:
+        max_tokens = min(NORMALIZATION_MAX_OUTPUT_TOKENS, 256 + NORMALIZATION_OUTPUT_TOKENS_PER_TAG * len(tags))
+        content = call_mistral(
+            messages, temperature=0.2, max_tokens=max_tokens, stage='normalization', cacheable=_complete_json(dict)
+        )
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de la normalisation des tags: {str(e)}")
+        return {}
+    
+    # Une sortie coupée garde ses catégories complètes ; les tags omis sont complétés par l'appelant
+    parsed = _parse_llm_json(content, dict, stage='normalization')
+    if parsed.value is None:
+        logger.warning(f"Format de réponse incorrect pour les tags normalisés: {content}")
+        return {}
+    return parsed.value
+
+_tag_embedder = None
+_tag_embedder_lock = threading.Lock()
+
+def _get_tag_embedder():
+    """
+    Crée, au premier appel, l'embedder des tags configuré dans EMBEDDINGS_CONFIG.
+    
+    Returns:
+        Objet exposant embed(textes) et model
+    """
+    global _tag_embedder
+    with _tag_embedder_lock:
+        if _tag_embedder is None:
+            source = EMBEDDINGS_CONFIG.get('source', 'provider')
+            batch_size = EMBEDDINGS_CONFIG.get('batch_size', 64)
+            if source == 'local':
+                _tag_embedder = SentenceTransformerEmbedder(
+                    EMBEDDINGS_CONFIG.get('local_model', 'paraphrase-multilingual-MiniLM-L12-v2'), batch_size=batch_size
+                )
+            elif source == 'hashing':
+                _tag_embedder = HashingEmbedder()
+            else:
+                _tag_embedder = ProviderEmbedder(embed_texts, EMBEDDINGS_CONFIG.get('model', 'mistral-embed'),
+                                                 batch_size=batch_size, max_workers=NORMALIZATION_MAX_WORKERS)
+                # Les vecteurs mis en cache dépendent du fournisseur (le fournisseur simulé n'a pas de vrai modèle)
+                _tag_embedder.model = f"{llm_provider.name}/{_tag_embedder.model}"
+            logger.info(f"Embeddings des tags: source {source}, modèle {_tag_embedder.model}")
+        return _tag_embedder
+
+def embed_texts(texts):
+    """
+    Calcule les embeddings d'un lot de textes avec le fournisseur de LLM configuré.
+    
+    L'appel passe par l'ordonnanceur partagé, comme les appels de chat.
+    
+    Args:
+        texts (list): Textes à représenter
+    
+    Returns:
+        list: Un vecteur par texte
+    """
+    model = EMBEDDINGS_CONFIG.get('model', 'mistral-embed')
+    tokens = sum(estimate_tokens(text) for text in texts)
+    attempts = [0]
+    
+    def request():
+        attempts[0] += 1
+        if attempts[0] > 1:
+            LLM_RETRIES.inc(stage='embeddings')
+        LLM_IN_FLIGHT.inc()
+        try:
+            with LLM_REQUEST_SECONDS.time(stage='embeddings', model=model):
+                return llm_provider.embed(model, texts)
+        except Exception:
+            LLM_ERRORS.inc(stage='embeddings')
+            raise
+        finally:
+            LLM_IN_FLIGHT.dec()
+    
+    vectors = llm_scheduler.run(None, request, tokens=tokens)
+    LLM_TOKENS.inc(tokens, stage='embeddings', kind='prompt')
+    return vectors
+
+def normalize_tags_with_embeddings(tags, max_workers=None):
+    """
+    Normalise les tags en regroupant leurs embeddings.
+    
+    Les embeddings des tags (mis en cache par texte de tag) sont rassemblés dans
+    une matrice, regroupés par similarité cosinus (cluster_embeddings), puis
+    chaque groupe de plusieurs tags est nommé par le LLM. Un tag isolé garde
+    son propre nom. Le regroupement est déterministe.
+    
+    Args:
+        tags (list): Liste des tags à normaliser
+        max_workers (int): Nombre de lots de groupes nommés simultanément
+    
+    Returns:
+        dict: Dictionnaire des tags normalisés avec leurs tags originaux associés
+    """
+    if not tags:
+        return {}
+    
+    matrix = embed_tags(tags, _get_tag_embedder(), embedding_cache)
+    groups = [[tags[index] for index in group] for group in cluster_embeddings(matrix, EMBEDDING_SIMILARITY_THRESHOLD)]
+    clusters = [group for group in groups if len(group) > 1]
+    logger.info(f"Regroupement par embeddings: {len(tags)} tags, {len(groups)} groupes dont {len(clusters)} à nommer")
+    
+    names = iter(_name_tag_clusters(clusters, max_workers=max_workers))
+    result = {}
+    for group in groups:
+        name = next(names) if len(group) > 1 else group[0]
+        members = result.setdefault(name, [])
+        members.extend(tag for tag in group if tag not in members)
+    return result
+
+def _name_tag_clusters(clusters, max_workers=None):
+    """
+    Fait nommer les groupes de tags par le LLM, par lots.
+    
+    Args:
+        clusters (list): Groupes de tags (listes de tags)
+        max_workers (int): Nombre de lots nommés simultanément
+    
+    Returns:
+        list: Nom de chaque groupe, dans l'ordre des groupes
+    """
+    if not clusters:
+        return []
+    
+    batches = [clusters[i:i + EMBEDDING_NAMING_BATCH_SIZE] for i in range(0, len(clusters), EMBEDDING_NAMING_BATCH_SIZE)]
+    max_workers = min(max_workers or NORMALIZATION_MAX_WORKERS, len(batches))
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        batch_names = list(executor.map(_name_tag_clusters_batch, batches))
+    
+    names = []
+    for batch, batch_result in zip(batches, batch_names):
+        for number, group in enumerate(batch, start=1):
+            name = batch_result.get(str(number))
+            if not isinstance(name, str) or not name.strip():
+                # Groupe non nommé par le modèle : le tag le plus court sert de nom
+                name = min(group, key=len)
+            names.append(name.strip())
+    return names
+
+def _name_tag_clusters_batch(clusters):
+    """
+    Nomme un lot de groupes de tags en un seul appel au LLM.
+    
+    Args:
+        clusters (list): Groupes de tags (listes de tags)
+    
+    Returns:
+        dict: Nom de chaque groupe, indexé par son numéro dans le lot (chaîne)
+    """
+    prompt = """
+    Voici des groupes de tags similaires extraits de réponses à une question ouverte concernant l'expérience utilisateur d'une application.
+    Pour chaque groupe, propose un tag normalisé qui résume les tags du groupe.
+
+    Règles importantes:
+    - Utilise des termes simples et clairs
+    - Préfère des noms plutôt que des adjectifs
+    - Donne des noms distincts à des groupes différents
+    
+    Groupes:
+    """
+    
+    for number, group in enumerate(clusters, start=1):
+        prompt += f"\n{number}. " + " | ".join(group[:EMBEDDING_NAMING_MAX_MEMBERS])
+    
+    prompt += """
+    
+    Retourne un objet JSON associant le numéro de chaque groupe à son tag normalisé, sans autre texte explicatif:
+    {"1": "tag normalisé du groupe 1", "2": "tag normalisé du groupe 2", ...}
+    """
+    
+    messages = [
+        {"role": "system", "content": "Vous êtes un expert en analyse de données qui donne un nom clair à des groupes de tags similaires."},
+        {"role": "user", "content": prompt}
+    ]
+    
+    try:
+        max_tokens = min(NORMALIZATION_MAX_OUTPUT_TOKENS, 64 + NORMALIZATION_OUTPUT_TOKENS_PER_TAG * len(clusters))
+        content = call_mistral(
+            messages, temperature=0.2, max_tokens=max_tokens, stage='normalization', cacheable=_complete_json(dict)
+        )
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors du nommage des groupes de tags: {str(e)}")
+        return {}
+    
+    parsed = _parse_llm_json(content, dict, stage='normalization')
+    if parsed.value is None:
+        logger.warning(f"Impossible d'extraire les noms des groupes de tags: {content}")
+        return {}
+    return parsed.value
+
+def extend_tag_vocabulary(tags, vocabulary, max_workers=None):
+    """
+    Rattache de nouveaux tags à un vocabulaire de normalisation existant.
+    
+    Les tags déjà présents dans le vocabulaire (ou variantes évidentes d'un tag
+    présent) sont rattachés localement ; les autres sont soumis au modèle, qui
+    les associe à une catégorie existante ou en crée une nouvelle.
+    
+    Args:
+        tags (list): Tags extraits à rattacher
+        vocabulary (dict): Vocabulaire existant (tag normalisé -> tags originaux)
+        max_workers (int): Nombre de lots soumis simultanément au modèle
+    
+    Returns:
+        dict: Vocabulaire étendu (tag normalisé -> tags originaux)
+    """
+    extended = {normalized: list(originals) for normalized, originals in vocabulary.items()}
+    known = {original.lower() for originals in extended.values() for original in originals}
+    by_key = {}
+    for normalized, originals in extended.items():
+        for original in originals:
+            by_key.setdefault(canonical_tag_key(original), normalized)
+    
+    new_tags = []
+    for tag in tags:
+        if tag.lower() in known:
+            continue
+        normalized = by_key.get(canonical_tag_key(tag))
+        if normalized is not None:
+            extended[normalized].append(tag)
+        else:
+            new_tags.append(tag)
+    
+    if not new_tags:
+        return extended
+    
+    representatives, tag_variants = prenormalize_tags(new_tags)
+    batches = [representatives[i:i + NORMALIZATION_BATCH_SIZE] for i in range(0, len(representatives), NORMALIZATION_BATCH_SIZE)]
+    categories = list(extended)
+    logger.info(f"Rattachement de {len(new_tags)} nouveaux tags à {len(categories)} catégories existantes")
+    
+    max_workers = min(max_workers or NORMALIZATION_MAX_WORKERS, len(batches))
+    with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+        batch_mappings = list(executor.map(
+            lambda batch: _complete_tag_mapping(_map_tags_to_categories(batch, categories), batch), batches
+        ))
+    
+    for mapping in batch_mappings:
+        for normalized, originals in expand_tag_mapping(mapping, tag_variants).items():
+            members = extended.setdefault(normalized, [])
+            members.extend(original for original in originals if original not in members)
+    
+    return extended
+
+def _map_tags_to_categories(tags, categories):
+    """
+    Associe des tags à des catégories existantes en un appel à Mistral AI.
+    
+    Args:
+        tags (list): Tags à rattacher
+        categories (list): Tags normalisés existants
+    
+    Returns:
+        dict: Dictionnaire catégorie -> tags rattachés (catégories existantes ou nouvelles)
+    """
+    # Construire le prompt
+    prompt = """
+    Voici les catégories (tags normalisés) déjà utilisées pour analyser des réponses à une question ouverte concernant l'expérience utilisateur d'une application.
+    
+    Catégories existantes:
+    """
+    
+    for category in categories:
+        prompt += f"\n- {category}"
+    
+    prompt += """
+    
+    Associe chacun des nouveaux tags suivants à la catégorie existante qui exprime le même concept.
+    Si aucune catégorie existante ne convient, crée une nouvelle catégorie en suivant les mêmes conventions
+    (termes simples et clairs, noms plutôt qu'adjectifs).
+    
+    Nouveaux tags:
+    """
+    
+    for tag in tags:
+        prompt += f"\n- {tag}"
+    
+    prompt += """
+    
+    Retourne un objet JSON structuré comme suit, sans autre texte explicatif:
+    {
+        "catégorie 1": ["nouveau tag 1", "nouveau tag 2", ...],
+        "catégorie 2": ["nouveau tag 3", ...],
+        ...
+    }
+    
+    Assure-toi que chaque nouveau tag est associé à exactement une catégorie.
+    """
+    
+    # Structure pour l'API Mistral
+    messages = [
+        {"role": "system", "content": "Vous êtes un expert en analyse de données qui normalise et regroupe des tags similaires en catégories cohérentes."},
+        {"role": "user", "content": prompt}
+    ]
+    
+    try:
+        max_tokens = min(NORMALIZATION_MAX_OUTPUT_TOKENS, 256 + NORMALIZATION_OUTPUT_TOKENS_PER_TAG * len(tags))
+        content = call_mistral(
+            messages, temperature=0.2, max_tokens=max_tokens, stage='normalization', cacheable=_complete_json(dict)
+        )
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors du rattachement des tags: {str(e)}")
+        return {}
+    
+    parsed = _parse_llm_json(content, dict, stage='normalization')
+    if parsed.value is None:
+        logger.warning(f"Format de réponse incorrect pour le rattachement des tags: {content}")
+        return {}
+    return parsed.value
+
+def reassign_normalized_tags(response_tags, normalized_tags):
+    """
+    Réattribue les tags normalisés à chaque réponse.
+    
+    Sans correspondance exacte, le premier tag original (dans l'ordre du
+    mapping) qui contient le tag ou qui est contenu dans celui-ci est retenu ;
+    la recherche passe par un index construit une fois par mapping (et par
+    processus lorsque les réponses sont réparties sur le pool de calcul).
+    
+    Args:
+        response_tags (list): Liste des tags par réponse
+        normalized_tags (dict): Dictionnaire de mapping des tags originaux vers les tags normalisés
+    
+    Returns:
+        list: Liste des tags normalisés par réponse
+    """
+    # Créer un mapping inverse pour faciliter la recherche
+    tag_mapping = {}
+    for normalized, originals in normalized_tags.items():
+        for original in originals:
+            tag_mapping[original.lower()] = normalized
+    
+    return cpu_pool.map_batches(reassign_tags, response_tags, tag_mapping)
+
+def _generate_tag_summary(tag, tag_responses_list):
+    """
+    Génère la synthèse d'un tag normalisé dans la limite du budget de tokens.
+    
+    Les réponses sont dédoublonnées et les plus longues tronquées. Si elles
+    dépassent SUMMARY_PROMPT_TOKENS, un échantillon représentatif est envoyé ;
+    au-delà de SUMMARY_HIERARCHICAL_MIN_TOKENS, l'échantillon est synthétisé par
+    parties (au plus SUMMARY_MAX_PARTS) puis les synthèses partielles sont
+    fusionnées. Le nombre d'utilisateurs retourné est toujours le nombre réel
+    de réponses associées au tag.
+    
+    Args:
+        tag (str): Tag normalisé
+        tag_responses_list (list): Réponses associées à ce tag
+    
+    Returns:
+        dict: Synthèse du tag
+    """
+    total = len(tag_responses_list)
+    items = deduplicate_responses(tag_responses_list, SUMMARY_RESPONSE_MAX_TOKENS)
+    items_tokens = sum(estimate_tokens(text) for text, _ in items)
+    logger.info(f"Génération de la synthèse pour le tag '{tag}' ({total} réponses, {len(items)} distinctes)")
+    
+    # Le budget permet toujours d'envoyer au moins une réponse, même si SUMMARY_PROMPT_TOKENS est très bas
+    longest_item = SUMMARY_RESPONSE_MAX_TOKENS + ITEM_OVERHEAD_TOKENS + 1
+    prompt_budget = max(SUMMARY_PROMPT_TOKENS, longest_item)
+    
+    if items_tokens <= SUMMARY_HIERARCHICAL_MIN_TOKENS:
+        sample = sample_within_budget(items, prompt_budget, seed=tag)
+        prompt = _tag_summary_prompt(tag, sample, total, sampled=len(sample) < len(items))
+        summary, _ = _request_tag_summary(tag, prompt, total)
+    else:
+        # Synthèses partielles sur des parties de l'échantillon, puis fusion ; chaque partie
+        # est remplie à au moins une réponse près du budget, d'où au plus SUMMARY_MAX_PARTS parties
+        sample = sample_within_budget(items, max(prompt_budget - longest_item, longest_item) * SUMMARY_MAX_PARTS, seed=tag)
+        sampled = len(sample) < len(items)
+        parts = split_within_budget(sample, prompt_budget)
+        if len(parts) <= 1:
+            parts = parts or [sample]
+            partials = [_request_tag_summary(tag, _tag_summary_prompt(tag, parts[0], total, sampled=sampled), total)]
+        else:
+            with ContextThreadPoolExecutor(max_workers=len(parts)) as executor:
+                partials = list(executor.map(
+                    lambda part: _request_tag_summary(
+                        tag, _tag_summary_prompt(tag, part, total, sampled=sampled, partial=True), total
+                    ),
+                    parts
+                ))
+        succeeded = [partial for partial, ok in partials if ok]
+        if len(succeeded) > 1:
+            summary, _ = _request_tag_summary(tag, _tag_summary_merge_prompt(tag, succeeded, total), total)
+        else:
+            summary = succeeded[0] if succeeded else partials[0][0]
+    
+    if isinstance(summary, dict):
+        summary['nombre_utilisateurs'] = total
+    return summary
+
+def _tag_summary_prompt(tag, items, total, sampled=False, partial=False):
+    """
+    Construit le prompt de synthèse d'un tag.
+    
+    Args:
+        tag (str): Tag normalisé
+        items (list): Réponses envoyées, tuples (texte, nombre d'occurrences)
+        total (int): Nombre total de réponses associées au tag
+        sampled (bool): Les réponses sont un échantillon des réponses distinctes
+        partial (bool): Les réponses sont une partie des réponses envoyées (synthèse par parties)
+    
+    Returns:
+        str: Prompt
+    """
+    if sampled:
+        scope = f"échantillon représentatif des {total} réponses"
+    elif partial:
+        scope = f"partie des {total} réponses"
+    else:
+        scope = f"soit l'ensemble des {total} réponses"
+    
+    if len(items) == total and not sampled and not partial:
+        prompt = f"""
+    Analyse les {total} réponses suivantes qui ont été associées au tag "{tag}".
+    
+    Réponses:
+    """
+    else:
+        prompt = f"""
+    Analyse les {len(items)} réponses suivantes, {scope} qui ont été associées au tag "{tag}".
+    Les réponses identiques n'apparaissent qu'une fois, suivies de leur nombre d'occurrences entre parenthèses.
+    
+    Réponses:
+    """
+    
+    for i, (response, count) in enumerate(items):
+        prompt += f"\n{i+1}. {response}" + (f" (×{count})" if count > 1 else "")
+    
+    prompt += f"""
+    
+    Génère une synthèse concise qui:
+    1. Résume les idées principales exprimées dans ces réponses
+    2. Mentionne que {total} utilisateurs ont exprimé des idées liées à ce tag
+    3. Inclut tous les verbatims représentatifs en extrayant UNIQUEMENT les parties des réponses qui concernent spécifiquement le tag "{tag}" (ne pas inclure les parties de réponses non pertinentes pour ce tag)
+    
+    
+    Format de la réponse:
+    {{
+        "synthèse": "Résumé des idées principales en 2-3 phrases",
+        "nombre_utilisateurs": {total},
+        "verbatims": ["Extrait pertinent 1", "Extrait pertinent 2", "..."]
+    }}
+    
+    Retourne uniquement l'objet JSON, sans autre texte explicatif.
+    """
+    return prompt
+
+def _tag_summary_merge_prompt(tag, partials, total):
+    """
+    Construit le prompt de fusion des synthèses partielles d'un tag.
+    
+    Args:
+        tag (str): Tag normalisé
+        partials (list): Synthèses partielles
+        total (int): Nombre total de réponses associées au tag
+    
+    Returns:
+        str: Prompt
+    """
+    prompt = f"""
+    Voici {len(partials)} synthèses partielles, établies chacune sur une partie des {total} réponses qui ont été associées au tag "{tag}".
+    
+    Synthèses partielles:
+    """
+    
+    verbatims = []
+    for i, partial in enumerate(partials):
+        prompt += f"\n{i+1}. {partial.get('synthèse', '')}"
+        verbatims.extend(partial.get('verbatims', [])[:SUMMARY_MERGE_VERBATIMS_PER_PART])
+    
+    prompt += """
+    
+    Verbatims proposés:
+    """
+    for verbatim in verbatims:
+        prompt += f"\n- {truncate_to_tokens(verbatim, SUMMARY_RESPONSE_MAX_TOKENS)}"
+    
+    prompt += f"""
+    
+    Fusionne ces synthèses en une synthèse unique et concise qui:
+    1. Résume les idées principales, sans répétition
+    2. Mentionne que {total} utilisateurs ont exprimé des idées liées à ce tag
+    3. Conserve les verbatims les plus représentatifs parmi ceux proposés
+    
+    Format de la réponse:
+    {{
+        "synthèse": "Résumé des idées principales en 2-3 phrases",
+        "nombre_utilisateurs": {total},
+        "verbatims": ["Extrait pertinent 1", "Extrait pertinent 2", "..."]
+    }}
+    
+    Retourne uniquement l'objet JSON, sans autre texte explicatif.
+    """
+    return prompt
+
+def _request_tag_summary(tag, prompt, total):
+    """
+    Envoie un prompt de synthèse à Mistral AI et interprète la réponse.
+    
+    Args:
+        tag (str): Tag normalisé
+        prompt (str): Prompt de synthèse
+        total (int): Nombre total de réponses associées au tag
+    
+    Returns:
+        tuple: (synthèse, True si la réponse du modèle a pu être interprétée)
+    """
+    # Structure pour l'API Mistral
+    messages = [
+        {"role": "system", "content": "Vous êtes un analyste expert qui synthétise des retours utilisateurs de manière concise et pertinente."},
+        {"role": "user", "content": prompt}
+    ]
+    
+    try:
+        content = call_mistral(
+            messages, temperature=0.3, max_tokens=1024, stage='summary', cacheable=_complete_json(dict)
+        )
+    except AnalysisCancelled:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de la génération de la synthèse pour le tag '{tag}': {str(e)}")
+        return {
+            "synthèse": f"Erreur: {str(e)}",
+            "nombre_utilisateurs": total,
+            "verbatims": []
+        }, False
+    
+    parsed = _parse_llm_json(content, dict, stage='summary')
+    if parsed.value is None:
+        logger.warning(f"Format de réponse incorrect pour la synthèse du tag '{tag}': {content}")
+        return {
+            "synthèse": content,
+            "nombre_utilisateurs": total,
+            "verbatims": []
+        }, False
+    if not parsed.complete:
+        # Synthèse coupée : les champs complets sont conservés, la synthèse elle-même est indispensable
+        if "synthèse" not in parsed.value:
+            logger.warning(f"Impossible d'extraire la synthèse pour le tag '{tag}': {content}")
+            return {
+                "synthèse": "Erreur lors de la génération de la synthèse",
+                "nombre_utilisateurs": total,
                 "verbatims": []
-            }
+            }, False
+        parsed.value.setdefault("nombre_utilisateurs", total)
+        parsed.value.setdefault("verbatims", [])
+    return parsed.value, True
+
+def group_responses_by_tag(response_tags, responses):
+    """
+    Regroupe les réponses par tag normalisé.
+    
+    Args:
+        response_tags (list): Liste des tags normalisés par réponse
+        responses (list): Liste des réponses originales
+    
+    Returns:
+        dict: Dictionnaire tag normalisé -> réponses associées
+    """
+    # Créer un dictionnaire pour regrouper les réponses par tag normalisé
+    tag_responses = {}
+    
+    # Pour chaque réponse, ajouter à tous les tags normalisés associés
+    for item in response_tags:
+        response_id = item.get('response_id')
+        if response_id <= len(responses):  # Vérifier que l'ID est valide
+            response_index = response_id - 1  # Convertir en index 0-based
+            response_text = responses[response_index]
+            
+            for tag in item.get('normalized_tags', []):
+                if tag not in tag_responses:
+                    tag_responses[tag] = []
+                tag_responses[tag].append(response_text)
+    
+    return tag_responses
+
+def generate_tag_summaries_with_mistral(response_tags, responses, max_workers=None, progress=None, cached_summaries=None,
+                                        on_summary=None):
+    """
+    Génère une synthèse pour chaque tag normalisé en utilisant Mistral AI.
+    
+    Les synthèses sont générées en parallèle (SUMMARY_MAX_WORKERS threads),
+    dans la limite globale de l'ordonnanceur des appels au LLM.
+    L'ordre des clés du dictionnaire retourné ne dépend pas de l'ordre
+    d'arrivée des réponses.
+    
+    Args:
+        response_tags (list): Liste des tags normalisés par réponse
+        responses (list): Liste des réponses originales
+        max_workers (int): Nombre de synthèses générées simultanément
+        progress (callable): Fonction progress(synthèses générées, total) appelée après chaque synthèse
+        cached_summaries (dict): Synthèses déjà connues, réutilisées sans appel au modèle
+        on_summary (callable): Fonction on_summary(tag, synthèse) appelée dès qu'une
+            synthèse est disponible
+    
+    Returns:
+        dict: Dictionnaire des synthèses par tag normalisé
+    """
+    tag_responses = group_responses_by_tag(response_tags, responses)
+    if not tag_responses:
+        return {}
+    
+    cached_summaries = cached_summaries or {}
+    if on_summary:
+        for tag in tag_responses:
+            if tag in cached_summaries:
+                on_summary(tag, cached_summaries[tag])
+    
+    # Générer une synthèse pour chaque tag normalisé
+    tags = list(tag_responses)
+    to_generate = [tag for tag in tags if tag not in cached_summaries]
+    generated = {}
+    
+    if to_generate:
+        max_workers = min(max_workers or SUMMARY_MAX_WORKERS, len(to_generate))
+        
+        completed = [0]
+        completed_lock = threading.Lock()
+        
+        def run_tag(tag):
+            result = _generate_tag_summary(tag, tag_responses[tag])
+            if on_summary:
+                on_summary(tag, result)
+            if progress:
+                with completed_lock:
+                    completed[0] += 1
+                    progress(completed[0], len(to_generate))
+            return result
+        
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            generated = dict(zip(to_generate, executor.map(run_tag, to_generate)))
     
+    summaries = {tag: generated[tag] if tag in generated else cached_summaries[tag] for tag in tags}
     return summaries
 
 if __name__ == '__main__':
+    # Avec le rechargement automatique, seul le processus qui sert les requêtes exécute les tâches
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        job_manager.start()
     app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
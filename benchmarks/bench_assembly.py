@@ -0,0 +1,99 @@
+"""
+Benchmark de l'assemblage des résultats par réponse.
+
+Mesure assemble_results pour des tailles croissantes et vérifie que le temps
+par réponse reste constant (passage à l'échelle linéaire). L'assemblage par
+recherche séquentielle utilisé auparavant est mesuré sur les plus petites
+tailles pour comparaison.
+
+Usage:
+    python benchmarks/bench_assembly.py [--sizes 1000 5000 20000 50000] [--legacy-max 5000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import assemble_results
+
+
+def legacy_assemble_results(ids, responses, response_tags, normalized_response_tags, tag_summaries):
+    # Implémentation de référence : recherche séquentielle des tags de chaque réponse
+    results = []
+    for index, (row_id, response) in enumerate(zip(ids, responses)):
+        original_tags = []
+        for tag_item in response_tags:
+            if tag_item.get('response_id') == index + 1:
+                original_tags = tag_item.get('tags', [])
+                break
+
+        normalized_tags_for_response = []
+        for tag_item in normalized_response_tags:
+            if tag_item.get('response_id') == index + 1:
+                normalized_tags_for_response = tag_item.get('normalized_tags', [])
+                break
+
+        response_summaries = {}
+        for tag in normalized_tags_for_response:
+            if tag in tag_summaries:
+                response_summaries[tag] = tag_summaries[tag]
+
+        results.append({
+            'id': int(row_id),
+            'response': response,
+            'original_tags': original_tags,
+            'normalized_tags': normalized_tags_for_response,
+            'tag_summaries': response_summaries
+        })
+    return results
+
+
+def generate(size, n_tags, seed):
+    rng = random.Random(seed)
+    tags = [f"tag {i}" for i in range(n_tags)]
+    ids = list(range(1, size + 1))
+    responses = [f"Réponse numéro {i}" for i in ids]
+    response_tags = []
+    normalized_response_tags = []
+    for response_id in ids:
+        chosen = rng.sample(tags, k=min(3, n_tags))
+        response_tags.append({'response_id': response_id, 'tags': chosen})
+        normalized_response_tags.append({'response_id': response_id, 'original_tags': chosen, 'normalized_tags': chosen})
+    tag_summaries = {tag: {'synthèse': '...', 'nombre_utilisateurs': 0, 'verbatims': []} for tag in tags}
+    return ids, responses, response_tags, normalized_response_tags, tag_summaries
+
+
+def timed(func, args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de assemble_results")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000, 50000])
+    parser.add_argument('--tags', type=int, default=60, help="Nombre de tags normalisés")
+    parser.add_argument('--legacy-max', type=int, default=5000, help="Taille maximale mesurée pour l'ancienne implémentation")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'réponses':>10} {'indexé (s)':>12} {'µs/réponse':>12} {'séquentiel (s)':>16}")
+    for size in args.sizes:
+        data = generate(size, args.tags, args.seed)
+        indexed, indexed_time = timed(assemble_results, data)
+
+        legacy_column = '-'
+        if size <= args.legacy_max:
+            legacy, legacy_time = timed(legacy_assemble_results, data)
+            assert indexed == legacy, "Les résultats diffèrent de l'implémentation de référence"
+            legacy_column = f"{legacy_time:.3f}"
+
+        print(f"{size:>10} {indexed_time:>12.3f} {indexed_time / size * 1e6:>12.2f} {legacy_column:>16}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+Benchmark de bout en bout du pipeline d'analyse.
+
+Pour chaque taille, une enquête synthétique est générée (synthetic_survey.py)
+puis envoyée à la route /import_and_test, avec le fournisseur de LLM simulé
+(`mock`) et une latence configurable, sans cache ni réseau. Chaque taille est
+mesurée dans un processus séparé pour que le pic de mémoire soit propre à
+cette taille.
+
+Mesures rapportées : temps par étape du pipeline, temps total de la requête,
+pic de mémoire résidente (RSS), nombre d'appels au LLM et tokens envoyés et
+reçus. Les résultats sont enregistrés en JSON, par défaut dans
+benchmarks/results/pipeline-v<version>.json, et peuvent être comparés à ceux
+d'une autre version avec --compare.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--rows 1000 10000] [--themes 200] [--latency-ms 50]
+                                        [--output fichier.json] [--compare ancien.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from version import VERSION
+from synthetic_survey import write_survey_csv
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+class StageTimer:
+    """
+    Fonction de progression du pipeline qui mesure la durée de chaque étape.
+
+    Les étapes s'enchaînent : une étape se termine quand la suivante commence.
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self._stage = None
+        self._started = None
+
+    def __call__(self, stage, done=0, total=0):
+        if stage != self._stage:
+            self.stop()
+            self._stage = stage
+            self._started = time.perf_counter()
+
+    def stop(self):
+        if self._stage is not None:
+            elapsed = time.perf_counter() - self._started
+            self.durations[self._stage] = self.durations.get(self._stage, 0.0) + elapsed
+            self._stage = None
+
+
+def run_single(rows, themes, latency_ms, jitter_ms, seed, workdir):
+    """
+    Mesure une analyse complète dans le processus courant.
+
+    Returns:
+        dict: Mesures de l'exécution
+    """
+    # Configuration à fixer avant l'import de l'application
+    os.environ['LLM_PROVIDER'] = 'mock'
+    os.environ['LLM_CACHE_ENABLED'] = '0'
+    # Toutes les bases locales dans le répertoire de travail : les analyses de l'utilisateur
+    # (data/results.sqlite3, conservées en nombre limité) ne sont ni modifiées ni évincées
+    os.environ['LLM_CACHE_PATH'] = os.path.join(workdir, 'llm_cache.sqlite3')
+    os.environ['EMBEDDING_CACHE_PATH'] = os.path.join(workdir, 'embeddings.sqlite3')
+    os.environ['JOBS_DIR'] = os.path.join(workdir, 'jobs')
+    os.environ['ANALYSIS_STATE_PATH'] = os.path.join(workdir, 'analysis_state.sqlite3')
+    os.environ['RESULT_STORE_PATH'] = os.path.join(workdir, 'results.sqlite3')
+    os.chdir(ROOT)
+
+    import app
+
+    app.llm_provider.latency_ms = latency_ms
+    app.llm_provider.jitter_ms = jitter_ms
+    app.llm_provider.seed = seed
+
+    csv_path = os.path.join(workdir, f'survey-{rows}.csv')
+    write_survey_csv(csv_path, rows, themes, seed)
+
+    # La route /import_and_test appelle run_analysis_pipeline : on y ajoute la mesure des étapes
+    timer = StageTimer()
+    pipeline = app.run_analysis_pipeline
+
+    def timed_pipeline(data, progress=None, dataset=None):
+        try:
+            return pipeline(data, progress=timer, dataset=dataset)
+        finally:
+            timer.stop()
+
+    app.run_analysis_pipeline = timed_pipeline
+
+    client = app.app.test_client()
+    start = time.perf_counter()
+    with open(csv_path, 'rb') as f:
+        response = client.post(
+            '/import_and_test',
+            data={'file': (f, os.path.basename(csv_path))},
+            content_type='multipart/form-data'
+        )
+    total = time.perf_counter() - start
+    if response.status_code != 200:
+        raise RuntimeError(f"Échec de /import_and_test ({response.status_code}): {response.get_data(as_text=True)[:500]}")
+
+    payload = response.get_json()
+    stats = app.llm_provider.stats()
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_rss_kb //= 1024
+
+    return {
+        'rows': rows,
+        'themes': themes,
+        'total_seconds': round(total, 3),
+        'rows_per_second': round(rows / total, 1) if total else None,
+        'stages': {stage: round(seconds, 3) for stage, seconds in timer.durations.items()},
+        'other_seconds': round(total - sum(timer.durations.values()), 3),
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        'llm_calls': stats['calls'],
+        'prompt_tokens': stats['prompt_tokens'],
+        'completion_tokens': stats['completion_tokens'],
+        'normalized_tags': len(payload['tag_mapping']),
+        'results': len(payload['results'])
+    }
+
+
+def run_in_subprocess(args, rows):
+    command = [
+        sys.executable, os.path.abspath(__file__), '--single', str(rows),
+        '--themes', str(args.themes), '--latency-ms', str(args.latency_ms),
+        '--jitter-ms', str(args.jitter_ms), '--seed', str(args.seed)
+    ]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr[-4000:])
+        raise RuntimeError(f"Le benchmark a échoué pour {rows} lignes")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_run(run):
+    stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in run['stages'].items())
+    print(f"{run['rows']:>9} lignes : {run['total_seconds']:.2f}s ({run['rows_per_second']} lignes/s), "
+          f"RSS max {run['peak_rss_mb']} Mo, {run['llm_calls']} appels LLM, "
+          f"{run['prompt_tokens']} tokens envoyés")
+    print(f"{'':>18}{stages}, autres {run['other_seconds']:.2f}s")
+
+
+def compare(current, previous_path):
+    """
+    Affiche l'évolution des mesures par rapport à un fichier de résultats précédent.
+    """
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    previous_runs = {(run['rows'], run['themes']): run for run in previous['runs']}
+
+    print(f"\nComparaison avec v{previous['version']} ({previous_path})")
+    print(f"{'lignes':>9} {'temps':>16} {'RSS max (Mo)':>20} {'appels LLM':>16} {'tokens envoyés':>22}")
+    for run in current['runs']:
+        old = previous_runs.get((run['rows'], run['themes']))
+        if old is None:
+            print(f"{run['rows']:>9}   (absent du fichier précédent)")
+            continue
+
+        def delta(key):
+            before, after = old[key], run[key]
+            ratio = f"{(after - before) / before * 100:+.0f}%" if before else "-"
+            return f"{before}→{after} {ratio}"
+
+        print(f"{run['rows']:>9} {delta('total_seconds'):>16} {delta('peak_rss_mb'):>20} "
+              f"{delta('llm_calls'):>16} {delta('prompt_tokens'):>22}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bout en bout du pipeline d'analyse")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000], help="Tailles des jeux de données (1k à 1M)")
+    parser.add_argument('--themes', type=int, default=200, help="Nombre de thèmes distincts (cardinalité des tags)")
+    parser.add_argument('--latency-ms', type=float, default=50, help="Latence simulée de chaque appel au LLM")
+    parser.add_argument('--jitter-ms', type=float, default=10, help="Variation de la latence simulée")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Fichier JSON des résultats (par défaut benchmarks/results/pipeline-v<version>.json)")
+    parser.add_argument('--compare', help="Fichier JSON de résultats à comparer")
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single is not None:
+        with tempfile.TemporaryDirectory() as workdir:
+            run = run_single(args.single, args.themes, args.latency_ms, args.jitter_ms, args.seed, workdir)
+        print(json.dumps(run))
+        return
+
+    results = {
+        'version': VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'themes': args.themes,
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'seed': args.seed,
+            'environment': {key: value for key, value in os.environ.items()
+                            if key.startswith(('EXTRACTION_', 'NORMALIZATION_', 'SUMMARY_', 'MISTRAL_'))
+                            and not key.endswith('_KEY')}
+        },
+        'runs': []
+    }
+
+    for rows in args.rows:
+        run = run_in_subprocess(args, rows)
+        results['runs'].append(run)
+        print_run(run)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'pipeline-v{VERSION}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nRésultats enregistrés dans {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Micro-benchmark de la réattribution des tags normalisés.
+
+Compare reassign_normalized_tags (recherche partielle indexée) au parcours
+linéaire du mapping utilisé auparavant, et vérifie que les deux donnent
+exactement le même résultat.
+
+Usage:
+    python benchmarks/bench_reassign.py [--originals 5000] [--responses 20000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import reassign_normalized_tags
+
+SYLLABES = ['ra', 'pi', 'de', 'len', 'teur', 'in', 'ter', 'face', 'na', 'vi', 'ga', 'tion',
+            'per', 'for', 'man', 'ce', 'bug', 'prix', 'ser', 'vi', 'ce', 'client', 'sim', 'pli', 'ci', 'te']
+
+
+def legacy_reassign_normalized_tags(response_tags, normalized_tags):
+    # Implémentation de référence : parcours linéaire du mapping pour chaque tag sans correspondance exacte
+    tag_mapping = {}
+    for normalized, originals in normalized_tags.items():
+        for original in originals:
+            tag_mapping[original.lower()] = normalized
+
+    normalized_response_tags = []
+    for response_item in response_tags:
+        original_tags = response_item.get('tags', [])
+        normalized_tags_for_response = []
+        for tag in original_tags:
+            normalized_tag = tag_mapping.get(tag.lower())
+            if normalized_tag and normalized_tag not in normalized_tags_for_response:
+                normalized_tags_for_response.append(normalized_tag)
+            elif not normalized_tag:
+                for original, normalized in tag_mapping.items():
+                    if tag.lower() in original or original in tag.lower():
+                        if normalized not in normalized_tags_for_response:
+                            normalized_tags_for_response.append(normalized)
+                            break
+        normalized_response_tags.append({
+            'response_id': response_item.get('response_id'),
+            'original_tags': original_tags,
+            'normalized_tags': normalized_tags_for_response
+        })
+    return normalized_response_tags
+
+
+def random_tag(rng, words=2):
+    return ' '.join(''.join(rng.choice(SYLLABES) for _ in range(rng.randint(2, 4))) for _ in range(words))
+
+
+def generate(n_originals, n_responses, n_tags_per_response, seed):
+    rng = random.Random(seed)
+    originals = list({random_tag(rng, rng.randint(1, 3)) for _ in range(n_originals)})
+    normalized_tags = {}
+    for original in originals:
+        normalized_tags.setdefault(f"catégorie {rng.randint(1, max(1, n_originals // 10))}", []).append(original)
+
+    response_tags = []
+    for response_id in range(1, n_responses + 1):
+        tags = []
+        for _ in range(n_tags_per_response):
+            kind = rng.random()
+            if kind < 0.5:
+                tags.append(rng.choice(originals).upper())                  # correspondance exacte
+            elif kind < 0.75:
+                tags.append(rng.choice(originals).split(' ')[0][:5])        # contenu dans un original
+            elif kind < 0.9:
+                tags.append(rng.choice(originals) + ' ' + random_tag(rng))  # contient un original
+            else:
+                tags.append(random_tag(rng))                                # probablement sans correspondance
+        response_tags.append({'response_id': response_id, 'tags': tags})
+    return response_tags, normalized_tags
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reassign_normalized_tags")
+    parser.add_argument('--originals', type=int, default=5000, help="Nombre de tags originaux dans le mapping")
+    parser.add_argument('--responses', type=int, default=20000, help="Nombre de réponses")
+    parser.add_argument('--tags-per-response', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    response_tags, normalized_tags = generate(args.originals, args.responses, args.tags_per_response, args.seed)
+    print(f"Mapping: {sum(len(v) for v in normalized_tags.values())} originaux, "
+          f"{len(normalized_tags)} tags normalisés, {len(response_tags)} réponses")
+
+    indexed, indexed_time = timed(reassign_normalized_tags, response_tags, normalized_tags)
+    legacy, legacy_time = timed(legacy_reassign_normalized_tags, response_tags, normalized_tags)
+
+    assert indexed == legacy, "Les résultats diffèrent de l'implémentation de référence"
+    print(f"Parcours linéaire : {legacy_time:.3f} s")
+    print(f"Index             : {indexed_time:.3f} s")
+    print(f"Accélération      : x{legacy_time / indexed_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
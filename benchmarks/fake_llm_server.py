@@ -0,0 +1,133 @@
+"""
+Faux serveur d'API de chat (format Mistral) pour tester l'ordonnanceur des appels au LLM.
+
+Les réponses sont produites par le fournisseur simulé (llm_providers.MockProvider).
+Le serveur peut limiter son débit (réponse 429 avec Retry-After au-delà de
+--rpm requêtes par minute) et renvoyer aléatoirement des erreurs 429 et 503.
+
+Usage:
+    python benchmarks/fake_llm_server.py [--port 8089] [--latency-ms 100] [--rpm 120]
+                                         [--throttle-rate 0.1] [--error-rate 0.05]
+
+Puis, dans config.json : "endpoint": "http://127.0.0.1:8089/v1/chat/completions"
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_providers import MockProvider
+
+
+class FakeChatServer(ThreadingHTTPServer):
+    """
+    Serveur de chat simulé.
+
+    Args:
+        address (tuple): Adresse d'écoute (hôte, port)
+        latency_ms (float): Latence de chaque réponse, en millisecondes
+        rpm (int): Nombre maximum de requêtes par minute (0 : illimité)
+        throttle_rate (float): Part des requêtes refusées au hasard avec un 429
+        error_rate (float): Part des requêtes refusées au hasard avec un 503
+        seed (int): Graine du tirage des erreurs
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, rpm=0, throttle_rate=0.0, error_rate=0.0, seed=0):
+        super().__init__(address, FakeChatHandler)
+        self.provider = MockProvider(latency_ms=latency_ms)
+        self.rpm = rpm
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.accepted = deque()
+        self.counts = Counter()
+
+    def admit(self):
+        """
+        Retourne le code HTTP de refus de la requête, ou None si elle est acceptée.
+        """
+        with self.lock:
+            now = time.monotonic()
+            while self.accepted and now - self.accepted[0] > 60:
+                self.accepted.popleft()
+            draw = self.random.random()
+            if self.rpm and len(self.accepted) >= self.rpm:
+                status = 429
+            elif draw < self.throttle_rate:
+                status = 429
+            elif draw < self.throttle_rate + self.error_rate:
+                status = 503
+            else:
+                status = None
+                self.accepted.append(now)
+            self.counts[status or 200] += 1
+            return status
+
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        status = self.server.admit()
+        if status:
+            self._send(status, {'message': 'Requests rate limit exceeded' if status == 429 else 'Service unavailable'},
+                       {'Retry-After': '1'} if status == 429 else {})
+            return
+
+        result = self.server.provider.chat(
+            body.get('model'), body.get('messages', []), body.get('temperature'), body.get('max_tokens')
+        )
+        self._send(200, {
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': result.content}}],
+            'usage': {'prompt_tokens': result.prompt_tokens, 'completion_tokens': result.completion_tokens}
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Faux serveur d'API de chat pour les tests de charge")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--rpm', type=int, default=0, help="Requêtes acceptées par minute (0 : illimité)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="Part des requêtes refusées avec un 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Part des requêtes refusées avec un 503")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeChatServer((args.host, args.port), args.latency_ms, args.rpm, args.throttle_rate, args.error_rate, args.seed)
+    print(f"Faux serveur de chat sur http://{args.host}:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Réponses envoyées: {dict(server.counts)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Générateur de jeux de données synthétiques de réponses ouvertes en français.
+
+Chaque réponse évoque un à trois thèmes (interface, notifications du tableau
+de bord sur mobile, ...) tirés selon une loi de Zipf : quelques thèmes
+dominent, beaucoup sont rares, comme dans une vraie enquête. Le nombre de
+thèmes distincts fixe la cardinalité du vocabulaire de tags. Une petite part
+des réponses est vide, comme dans les exports réels.
+
+Usage:
+    python benchmarks/synthetic_survey.py sortie.csv --rows 100000 [--themes 200] [--seed 42]
+"""
+
+import csv
+import random
+import argparse
+import itertools
+
+BASE_THEMES = [
+    "l'interface", "la navigation", "le temps de chargement", "les notifications", "la recherche",
+    "le paiement", "la synchronisation", "le mode hors ligne", "les filtres", "le tableau de bord",
+    "la connexion", "les performances", "la batterie", "le support client", "la documentation",
+    "les mises à jour", "l'export des données", "la personnalisation", "le prix de l'abonnement", "la sécurité",
+    "les graphiques", "l'inscription", "le partage", "les favoris", "le thème sombre",
+    "la traduction", "les publicités", "le calendrier", "la messagerie", "l'accessibilité"
+]
+
+CONTEXTS = [
+    "sur mobile", "sur tablette", "sur ordinateur", "au démarrage", "en réunion",
+    "pour les équipes", "des administrateurs", "en voyage", "hors connexion", "du week-end"
+]
+
+POSITIVE = ["pratique", "intuitif", "rapide", "efficace", "agréable", "clair", "fiable"]
+NEGATIVE = ["lent", "confus", "instable", "compliqué", "frustrant", "bogué", "limité"]
+
+TEMPLATES = [
+    "J'adore {theme}, c'est vraiment {pos}.",
+    "Je trouve que {theme} est {neg}, il faudrait l'améliorer.",
+    "Depuis la dernière mise à jour, {theme} est devenu {neg}.",
+    "{Theme} est {pos} mais {other} reste {neg}.",
+    "Franchement {theme} est {pos}, rien à redire.",
+    "Il faudrait revoir {theme}, c'est {neg} au quotidien.",
+    "{Theme} pourrait être plus {pos}."
+]
+
+# Part des réponses laissées vides
+EMPTY_RATE = 0.01
+
+
+def generate_themes(count):
+    """
+    Construit count thèmes distincts : les thèmes de base, puis leurs
+    combinaisons avec un ou plusieurs contextes.
+
+    Args:
+        count (int): Nombre de thèmes souhaités
+
+    Returns:
+        list: Thèmes distincts
+    """
+    themes = []
+    for index in itertools.count():
+        if len(themes) >= count:
+            break
+        base = BASE_THEMES[index % len(BASE_THEMES)]
+        combination = index // len(BASE_THEMES)
+        contexts = []
+        while combination:
+            combination -= 1
+            contexts.append(CONTEXTS[combination % len(CONTEXTS)])
+            combination //= len(CONTEXTS)
+        themes.append(' '.join([base] + contexts))
+    return themes
+
+
+def generate_responses(rows, themes, seed=42):
+    """
+    Génère les réponses d'une enquête synthétique.
+
+    Args:
+        rows (int): Nombre de réponses
+        themes (list): Thèmes évoqués, du plus fréquent au plus rare
+        seed (int): Graine du générateur aléatoire
+
+    Yields:
+        str: Texte de chaque réponse
+    """
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(themes))))
+
+    for _ in range(rows):
+        if rng.random() < EMPTY_RATE:
+            yield ''
+            continue
+
+        sentences = []
+        for _ in range(rng.randint(1, 3)):
+            theme, other = rng.choices(themes, cum_weights=cum_weights, k=2)
+            template = rng.choice(TEMPLATES)
+            sentences.append(template.format(
+                theme=theme,
+                Theme=theme[0].upper() + theme[1:],
+                other=other,
+                pos=rng.choice(POSITIVE),
+                neg=rng.choice(NEGATIVE)
+            ))
+        yield ' '.join(sentences)
+
+
+def write_survey_csv(path, rows, theme_count=200, seed=42):
+    """
+    Écrit un CSV id,response synthétique.
+
+    Args:
+        path (str): Chemin du fichier CSV à créer
+        rows (int): Nombre de réponses
+        theme_count (int): Nombre de thèmes distincts
+        seed (int): Graine du générateur aléatoire
+    """
+    themes = generate_themes(theme_count)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'response'])
+        for row_id, response in enumerate(generate_responses(rows, themes, seed), start=1):
+            writer.writerow([row_id, response])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Génère une enquête synthétique de réponses ouvertes")
+    parser.add_argument('output', help="Chemin du CSV à créer")
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--themes', type=int, default=200, help="Nombre de thèmes distincts (cardinalité des tags)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    write_survey_csv(args.output, args.rows, args.themes, args.seed)
+    print(f"{args.rows} réponses écrites dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Points de reprise des analyses pour l'Analyseur de Réponses Ouvertes.
+
+Une analyse lancée avec un point de reprise enregistre dans une base SQLite :
+- le résultat de chaque étape terminée (tags extraits, mapping des tags,
+  synthèses), qui n'est pas recalculée à la reprise ;
+- la réponse de chaque appel au LLM, indexée comme dans le cache du LLM,
+  pour qu'une étape interrompue ne refasse que les appels manquants.
+Les points de reprise sont liés à l'empreinte du fichier analysé : si le
+fichier change, ils sont effacés.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def file_fingerprint(path, block_size=1 << 20):
+    """
+    Empreinte SHA-256 du contenu d'un fichier.
+
+    Args:
+        path (str): Chemin du fichier
+        block_size (int): Taille des blocs lus
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PipelineCheckpoint:
+    """
+    Points de reprise d'une analyse, enregistrés dans une base SQLite.
+
+    Args:
+        path (str): Chemin de la base SQLite
+        fingerprint (str): Empreinte des données analysées ; les points de
+            reprise d'autres données sont effacés
+    """
+
+    def __init__(self, path, fingerprint=None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS stages (stage TEXT PRIMARY KEY, data TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS calls (key TEXT PRIMARY KEY, content TEXT NOT NULL);
+            """)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if fingerprint is not None and (row is None or row[0] != fingerprint):
+                if row is not None:
+                    logger.info(f"Données modifiées, points de reprise effacés ({path})")
+                self._conn.execute("DELETE FROM stages")
+                self._conn.execute("DELETE FROM calls")
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)", (fingerprint,))
+            self._conn.commit()
+
+    def load(self, stage):
+        """
+        Retourne le résultat enregistré d'une étape, ou None si elle n'est pas terminée.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM stages WHERE stage = ?", (stage,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, stage, data):
+        """
+        Enregistre le résultat d'une étape terminée (sérialisable en JSON).
+        """
+        payload = json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO stages (stage, data) VALUES (?, ?)", (stage, payload))
+            self._conn.commit()
+
+    def get_call(self, key):
+        """
+        Retourne la réponse enregistrée d'un appel au LLM, ou None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT content FROM calls WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_call(self, key, content):
+        """
+        Enregistre la réponse d'un appel au LLM.
+        """
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO calls (key, content) VALUES (?, ?)", (key, content))
+            self._conn.commit()
+
+    def stages(self):
+        """
+        Retourne les noms des étapes terminées.
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT stage FROM stages")]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
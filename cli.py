@@ -0,0 +1,286 @@
+"""
+Analyse en ligne de commande de fichiers CSV pour l'Analyseur de Réponses Ouvertes.
+
+Exécute le même pipeline que l'application web (extraction, normalisation,
+réattribution, synthèses) sur plusieurs fichiers à la fois, sans serveur.
+Pour chaque fichier, les résultats sont écrits dans un sous-répertoire de
+la sortie :
+- responses.csv : id, réponse, tags originaux et normalisés (listes JSON) ;
+- tag_mapping.json : tags normalisés et tags originaux associés ;
+- summaries.json : synthèse de chaque tag normalisé ;
+- run.json : informations sur l'analyse, écrit en dernier.
+Optionnellement, les tables réponses, incidence réponses × tags et tags avec
+leur synthèse au format Parquet (--parquet, nécessite pyarrow), et le nombre
+de réponses de chaque tag par valeur d'une colonne du fichier (--segment).
+
+Chaque étape enregistre un point de reprise (checkpoint.sqlite3, voir
+checkpoint.py) : après un arrêt, relancer la même commande reprend l'analyse
+où elle s'était arrêtée, sans refaire les appels au LLM déjà effectués. Les
+fichiers déjà analysés (run.json présent pour le même contenu) sont ignorés.
+
+Usage:
+    python cli.py données/ [autre.csv ...] --output résultats/ [--workers 2]
+                  [--pattern "*.csv"] [--incremental] [--force] [--keep-checkpoints]
+                  [--parquet] [--segment COLONNE]
+"""
+
+import os
+import csv
+import sys
+import glob
+import json
+import time
+import argparse
+import logging
+
+import pandas as pd
+
+from checkpoint import PipelineCheckpoint, file_fingerprint
+from incidence import TagIncidence, export_tables, write_parquet
+
+logger = logging.getLogger(__name__)
+
+# Nom des fichiers écrits pour chaque CSV analysé
+RESPONSES_FILE = 'responses.csv'
+TAG_MAPPING_FILE = 'tag_mapping.json'
+SUMMARIES_FILE = 'summaries.json'
+RUN_FILE = 'run.json'
+CHECKPOINT_FILE = 'checkpoint.sqlite3'
+PARQUET_DIRECTORY = 'parquet'
+
+
+def find_inputs(paths, pattern='*.csv'):
+    """
+    Liste les fichiers CSV à analyser.
+
+    Args:
+        paths (list): Fichiers ou répertoires (parcourus selon pattern)
+        pattern (str): Motif des fichiers recherchés dans les répertoires
+
+    Returns:
+        list: Chemins des fichiers, sans doublon, dans l'ordre des arguments
+    """
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            inputs.extend(sorted(glob.glob(os.path.join(path, pattern))))
+        else:
+            inputs.append(path)
+    return list(dict.fromkeys(os.path.abspath(path) for path in inputs))
+
+
+def output_names(inputs):
+    """
+    Nomme le répertoire de sortie de chaque fichier d'après son nom, sans collision.
+
+    Returns:
+        dict: Chemin du fichier -> nom du répertoire de sortie
+    """
+    names = {}
+    used = set()
+    for path in inputs:
+        base = os.path.splitext(os.path.basename(path))[0]
+        name, suffix = base, 2
+        while name in used:
+            name, suffix = f"{base}-{suffix}", suffix + 1
+        used.add(name)
+        names[path] = name
+    return names
+
+
+def _write_atomic(path, write):
+    # Le fichier n'apparaît sous son nom qu'une fois entièrement écrit
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8', newline='') as f:
+        write(f)
+    os.replace(temporary, path)
+
+
+def _write_json(path, data):
+    _write_atomic(path, lambda f: json.dump(data, f, ensure_ascii=False, indent=2))
+
+
+def write_results(directory, analysis, parquet=False, segments=None):
+    """
+    Écrit les résultats d'une analyse dans un répertoire (sauf run.json).
+
+    Args:
+        directory (str): Répertoire de sortie
+        analysis (dict): Résultat de run_analysis_pipeline
+        parquet (bool): Exporter aussi les tables au format Parquet
+        segments (pd.Series): Segment de chaque réponse (colonne du fichier), pour
+            écrire le nombre de réponses de chaque tag par segment
+    """
+    def write_responses(f):
+        writer = csv.writer(f)
+        writer.writerow(['id', 'response', 'original_tags', 'normalized_tags'])
+        for result in analysis['results']:
+            writer.writerow([
+                result['id'], result['response'],
+                json.dumps(result.get('original_tags', []), ensure_ascii=False),
+                json.dumps(result.get('normalized_tags', []), ensure_ascii=False)
+            ])
+
+    _write_atomic(os.path.join(directory, RESPONSES_FILE), write_responses)
+    _write_json(os.path.join(directory, TAG_MAPPING_FILE), analysis['tag_mapping'])
+    _write_json(os.path.join(directory, SUMMARIES_FILE), analysis['tag_summaries'])
+
+    if not parquet and segments is None:
+        return
+    results = analysis['results']
+    incidence = TagIncidence.from_response_tags(
+        [{'response_id': row, 'normalized_tags': result['normalized_tags']} for row, result in enumerate(results, start=1)],
+        len(results)
+    )
+    if parquet:
+        write_parquet(export_tables(
+            incidence, [result['id'] for result in results], [result['response'] for result in results],
+            [result['original_tags'] for result in results], analysis['tag_mapping'], analysis['tag_summaries']
+        ), os.path.join(directory, PARQUET_DIRECTORY))
+    if segments is not None:
+        by_segment = incidence.counts_by_segment(segments.tolist())
+        by_segment.index.name = segments.name
+        _write_atomic(os.path.join(directory, f"tags_by_{segments.name}.csv"), by_segment.to_csv)
+
+
+def analyze_file(path, directory, incremental=False, force=False, keep_checkpoints=False, parquet=False, segment=None):
+    """
+    Analyse un fichier CSV et écrit ses résultats, en reprenant les étapes déjà terminées.
+
+    Args:
+        path (str): Fichier CSV (colonnes 'response' et 'id' optionnelle)
+        directory (str): Répertoire de sortie du fichier
+        incremental (bool): Analyse incrémentale, le jeu de données portant le nom du répertoire
+        force (bool): Analyser même si des résultats existent pour ce contenu
+        keep_checkpoints (bool): Conserver les points de reprise après l'analyse
+        parquet (bool): Exporter aussi les tables au format Parquet
+        segment (str): Colonne du fichier par laquelle compter les réponses de chaque tag
+
+    Returns:
+        dict: Informations sur l'analyse (contenu de run.json), 'skipped' si elle a été ignorée
+    """
+    import app as analyzer
+    from ingestion import open_csv_batches
+
+    os.makedirs(directory, exist_ok=True)
+    name = os.path.basename(directory)
+    fingerprint = file_fingerprint(path)
+    run_path = os.path.join(directory, RUN_FILE)
+
+    if not force and os.path.exists(run_path):
+        with open(run_path, encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous.get('fingerprint') == fingerprint:
+            logger.info(f"[{name}] Déjà analysé, ignoré")
+            return {**previous, 'skipped': True}
+    if os.path.exists(run_path):
+        os.remove(run_path)
+
+    segments = None
+    if segment:
+        # Lue avant l'analyse : une colonne absente est signalée sans appel au LLM
+        segments = pd.read_csv(path, usecols=[segment], dtype=str, keep_default_na=False)[segment]
+
+    checkpoint_path = os.path.join(directory, CHECKPOINT_FILE)
+    checkpoint = PipelineCheckpoint(checkpoint_path, fingerprint)
+    done_stages = checkpoint.stages()
+    if done_stages:
+        logger.info(f"[{name}] Reprise après les étapes : {', '.join(done_stages)}")
+
+    current_stage = [None]
+
+    def progress(stage, done=0, total=0):
+        if stage != current_stage[0]:
+            current_stage[0] = stage
+            logger.info(f"[{name}] Étape {stage}")
+
+    started = time.time()
+    try:
+        analysis = analyzer.run_analysis_pipeline(
+            open_csv_batches(path), progress=progress,
+            dataset=name if incremental else None, checkpoint=checkpoint,
+            # Les résultats sont écrits dans le répertoire de sortie, pas dans le stockage de l'interface web
+            store=None
+        )
+        write_results(directory, analysis, parquet=parquet, segments=segments)
+    finally:
+        checkpoint.close()
+
+    run = {
+        'source': path,
+        'fingerprint': fingerprint,
+        'responses': len(analysis['results']),
+        'tags': len(analysis['tag_mapping']),
+        'summaries': len(analysis['tag_summaries']),
+        'resumed_stages': done_stages,
+        'seconds': round(time.time() - started, 2)
+    }
+    _write_json(run_path, run)
+
+    if not keep_checkpoints:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(checkpoint_path + suffix):
+                os.remove(checkpoint_path + suffix)
+    logger.info(f"[{name}] Terminé : {run['responses']} réponses, {run['tags']} tags en {run['seconds']}s")
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse en ligne de commande de fichiers CSV de réponses ouvertes")
+    parser.add_argument('inputs', nargs='+', help="Fichiers CSV ou répertoires")
+    parser.add_argument('--output', required=True, help="Répertoire des résultats (un sous-répertoire par fichier)")
+    parser.add_argument('--pattern', default='*.csv', help="Motif des fichiers recherchés dans les répertoires")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('CLI_MAX_WORKERS', '2')),
+                        help="Nombre de fichiers analysés simultanément")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Analyse incrémentale : seules les lignes nouvelles ou modifiées depuis la dernière exécution sont extraites")
+    parser.add_argument('--force', action='store_true', help="Analyser à nouveau les fichiers déjà analysés")
+    parser.add_argument('--keep-checkpoints', action='store_true', help="Conserver les points de reprise après l'analyse")
+    parser.add_argument('--parquet', action='store_true',
+                        help="Exporter aussi les réponses, l'incidence réponses × tags et les tags au format Parquet (nécessite pyarrow)")
+    parser.add_argument('--segment', help="Colonne du fichier par laquelle compter les réponses de chaque tag")
+    args = parser.parse_args()
+
+    if args.parquet:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise SystemExit("L'export Parquet nécessite le paquet pyarrow (pip install pyarrow)")
+
+    inputs = find_inputs(args.inputs, args.pattern)
+    if not inputs:
+        raise SystemExit("Aucun fichier CSV à analyser")
+    names = output_names(inputs)
+
+    # Import après l'analyse des arguments : il charge la configuration et ouvre les bases locales
+    from llm_scheduler import ContextThreadPoolExecutor
+
+    logger.info(f"Analyse de {len(inputs)} fichiers ({args.workers} à la fois)")
+    failures = []
+    with ContextThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {
+            executor.submit(
+                analyze_file, path, os.path.join(args.output, names[path]),
+                incremental=args.incremental, force=args.force, keep_checkpoints=args.keep_checkpoints,
+                parquet=args.parquet, segment=args.segment
+            ): path
+            for path in inputs
+        }
+        for future, path in futures.items():
+            try:
+                run = future.result()
+            except Exception as e:
+                logger.exception(f"[{names[path]}] Échec de l'analyse: {e}")
+                failures.append(path)
+                continue
+            status = 'ignoré' if run.get('skipped') else f"{run['seconds']}s"
+            print(f"{names[path]}: {run['responses']} réponses, {run['tags']} tags ({status})")
+
+    if failures:
+        print(f"{len(failures)} fichier(s) en échec, relancer la commande pour reprendre : {', '.join(names[path] for path in failures)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
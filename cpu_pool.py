@@ -0,0 +1,86 @@
+"""
+Pool de processus pour les étapes du pipeline limitées par le CPU.
+
+Le travail est découpé en lots indépendants (sans état partagé) envoyés à un
+ProcessPoolExecutor, ce qui évite que ces calculs se disputent le GIL avec le
+traitement des requêtes et permet d'utiliser plusieurs cœurs. Les fonctions
+exécutées doivent être définies au niveau d'un module importable, et leurs
+arguments et résultats sérialisables (pickle).
+
+En dessous d'une taille minimale, ou avec moins de deux workers, les lots sont
+traités dans le processus courant : l'échange des données entre processus
+coûterait plus qu'il ne rapporte.
+"""
+
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+class CPUPool:
+    """
+    Pool de processus créé à la première utilisation.
+
+    Args:
+        max_workers (int): Nombre de processus (0 ou 1 : exécution dans le processus courant)
+        min_items (int): Nombre minimum d'éléments pour passer par le pool
+    """
+
+    def __init__(self, max_workers, min_items=20000):
+        self.max_workers = max_workers
+        self.min_items = min_items
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def enabled(self):
+        return self.max_workers > 1
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # 'spawn' : les processus ne copient pas l'état du serveur (threads, connexions SQLite)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                logger.info(f"Pool de calcul démarré avec {self.max_workers} processus")
+            return self._executor
+
+    def map_batches(self, func, items, *args):
+        """
+        Applique func(*args, lot) à des lots consécutifs de items et concatène
+        les résultats, dans l'ordre des lots.
+
+        Args:
+            func (callable): Fonction de module retournant une liste par lot
+            items (list): Éléments à traiter
+            *args: Arguments communs, transmis à chaque lot
+
+        Returns:
+            list: Résultats de tous les lots, dans l'ordre des éléments
+        """
+        if not self.enabled or len(items) < self.min_items:
+            return func(*args, items)
+
+        size = -(-len(items) // self.max_workers)
+        batches = [items[start:start + size] for start in range(0, len(items), size)]
+        try:
+            executor = self._get_executor()
+            futures = [executor.submit(func, *args, batch) for batch in batches]
+            return [result for future in futures for result in future.result()]
+        except BrokenProcessPool:
+            # Un processus a été tué (mémoire, signal) : le pool sera recréé au prochain appel
+            logger.warning("Pool de calcul interrompu, traitement dans le processus courant")
+            with self._lock:
+                self._executor = None
+            return func(*args, items)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,205 @@
+"""
+Regroupement des réponses identiques ou presque pour l'Analyseur de Réponses Ouvertes.
+
+Les réponses à une question ouverte se répètent souvent (« trop lent »,
+« Trop lent ! », plaintes copiées-collées). Avant l'extraction des tags, les
+réponses sont regroupées localement et seule une réponse représentative par
+groupe est envoyée au LLM ; ses tags sont ensuite attribués à tous les membres
+du groupe.
+
+Deux niveaux de regroupement :
+- les réponses identiques une fois repliées (casse, accents, ponctuation,
+  espaces) sont regroupées par empreinte ;
+- les réponses presque identiques sont rapprochées par MinHash (similarité de
+  Jaccard des n-grammes de caractères) et LSH (découpage des signatures en
+  bandes), sans comparer toutes les paires.
+Chaque réponse est rattachée au premier représentant suffisamment similaire ;
+les membres d'un groupe sont donc tous proches de son représentant (pas de
+chaîne de réponses de plus en plus éloignées). Les réponses peuvent être
+ajoutées par lots successifs.
+"""
+
+import re
+import hashlib
+import logging
+import unicodedata
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Taille des n-grammes comparés, en octets du texte replié (au plus 4 : un n-gramme tient sur 32 bits)
+SHINGLE_SIZE = 4
+
+# Nombre maximum d'octets de texte traités à la fois (borne la mémoire du calcul des signatures)
+SIGNATURE_BLOCK_SIZE = 65536
+
+# Nombre maximum de représentants par case du LSH (borne les comparaisons par réponse)
+BUCKET_MAX_SIZE = 8
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+
+# Lettres latines accentuées -> lettres sans accent (str.translate évite une boucle par caractère)
+_ACCENTS = {}
+for _code in range(0xC0, 0x250):
+    _base = ''.join(char for char in unicodedata.normalize('NFKD', chr(_code)) if not unicodedata.combining(char))
+    if _base and _base != chr(_code):
+        _ACCENTS[_code] = _base
+
+
+def normalize_response(text):
+    """
+    Forme comparable d'une réponse : minuscules, sans accents, ponctuation ni espaces superflus.
+
+    Args:
+        text (str): Réponse
+
+    Returns:
+        str: Réponse repliée
+    """
+    text = str(text).lower().translate(_ACCENTS)
+    return ' '.join(_PUNCTUATION_RE.sub(' ', text).split())
+
+
+class ResponseDeduplicator:
+    """
+    Regroupement incrémental des réponses identiques ou presque.
+
+    Args:
+        threshold (float): Similarité de Jaccard estimée minimale pour rattacher une
+            réponse à un représentant (1 ou plus : réponses identiques une fois repliées seulement)
+        num_perm (int): Nombre de permutations de la signature MinHash
+        bands (int): Nombre de bandes du LSH (diviseur de num_perm)
+        seed (int): Graine des permutations
+    """
+
+    def __init__(self, threshold=0.8, num_perm=64, bands=16, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+
+        generator = np.random.RandomState(seed)
+        # Hachage multiplicatif (a * x + b) >> 32 sur 64 bits, a impair : une permutation par ligne
+        self._a = generator.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = generator.randint(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        self._band_weights = generator.randint(1, 1 << 62, size=num_perm // bands, dtype=np.uint64)
+
+        self._exact = {}  # empreinte de la réponse repliée -> index du représentant
+        self._buckets = [{} for _ in range(bands)]  # par bande : empreinte de la bande -> lignes de _signatures
+        self._signatures = np.empty((1024, num_perm), dtype=np.uint32)  # signatures des représentants comparables
+        self._signature_owner = []  # index de la réponse représentée par chaque ligne de _signatures
+        self.representatives = []  # index des représentants, dans l'ordre d'ajout
+        self.size = 0
+
+    @property
+    def near_duplicates(self):
+        return self.threshold < 1
+
+    def _signatures_of(self, encoded):
+        # Signatures MinHash de textes encodés (au moins SHINGLE_SIZE octets), par blocs d'octets
+        signatures = np.empty((len(encoded), self.num_perm), dtype=np.uint32)
+        start = 0
+        while start < len(encoded):
+            end = start
+            total = 0
+            while end < len(encoded) and (end == start or total + len(encoded[end]) <= SIGNATURE_BLOCK_SIZE):
+                total += len(encoded[end])
+                end += 1
+
+            # Chaque n-gramme de SHINGLE_SIZE octets est lu comme un entier ; les n-grammes
+            # à cheval sur deux textes sont écartés. Les doublons ne changent pas le minimum.
+            data = np.frombuffer(b''.join(encoded[start:end]), dtype=np.uint8).astype(np.uint64)
+            values = data[:len(data) - SHINGLE_SIZE + 1].copy()
+            for shift in range(1, SHINGLE_SIZE):
+                values = (values << np.uint64(8)) | data[shift:len(data) - SHINGLE_SIZE + 1 + shift]
+            lengths = np.array([len(text) for text in encoded[start:end]])
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            counts = lengths - SHINGLE_SIZE + 1
+            positions = np.repeat(offsets, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+            values = values[positions]
+
+            hashed = ((self._a * values + self._b) >> np.uint64(32)).astype(np.uint32)
+            segments = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            signatures[start:end] = np.minimum.reduceat(hashed, segments, axis=1).T
+            start = end
+        return signatures
+
+    def _band_hashes(self, signatures):
+        # Une empreinte par bande : les collisions ne font qu'ajouter des candidats, vérifiés ensuite
+        return (signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64) * self._band_weights).sum(axis=2)
+
+    def add(self, texts):
+        """
+        Ajoute des réponses et retourne le représentant de chacune.
+
+        Args:
+            texts (list): Réponses à ajouter
+
+        Returns:
+            list: Pour chaque réponse, index (global, dans l'ordre d'ajout) de son
+                représentant ; une réponse qui ouvre un nouveau groupe est son propre représentant
+        """
+        base = self.size
+        self.size += len(texts)
+        assigned = [None] * len(texts)
+
+        # Réponses identiques une fois repliées
+        unknown = {}
+        for k, text in enumerate(texts):
+            encoded = f" {normalize_response(text)} ".encode('utf-8')
+            key = hashlib.blake2b(encoded, digest_size=16).digest()
+            representative = self._exact.get(key)
+            if representative is None:
+                self._exact[key] = base + k
+                unknown[k] = (key, encoded)
+            else:
+                assigned[k] = representative
+
+        # Réponses presque identiques, parmi les réponses repliées encore inconnues
+        comparable = [k for k, (_, encoded) in unknown.items() if len(encoded) >= SHINGLE_SIZE]
+        signatures = {}
+        band_hashes = {}
+        if self.near_duplicates and comparable:
+            computed = self._signatures_of([unknown[k][1] for k in comparable])
+            signatures = dict(zip(comparable, computed))
+            band_hashes = dict(zip(comparable, self._band_hashes(computed).tolist()))
+
+        for k, (key, _) in unknown.items():
+            representative = None
+            hashes = band_hashes.get(k)
+            if hashes is not None:
+                signature = signatures[k]
+                rows = set()
+                for band, value in enumerate(hashes):
+                    rows.update(self._buckets[band].get(value, ()))
+                if rows:
+                    rows = sorted(rows)
+                    matches = np.count_nonzero(self._signatures[rows] == signature, axis=1)
+                    best = int(np.argmax(matches))
+                    if matches[best] >= self.threshold * self.num_perm:
+                        representative = self._signature_owner[rows[best]]
+
+            if representative is None:
+                representative = base + k
+                self.representatives.append(representative)
+                if hashes is not None:
+                    row = len(self._signature_owner)
+                    if row == len(self._signatures):
+                        self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+                    self._signatures[row] = signature
+                    self._signature_owner.append(representative)
+                    for band, value in enumerate(hashes):
+                        bucket = self._buckets[band].setdefault(value, [])
+                        if len(bucket) < BUCKET_MAX_SIZE:
+                            bucket.append(row)
+            assigned[k] = representative
+            self._exact[key] = representative
+
+        # Les doublons exacts d'une réponse rattachée suivent son représentant
+        for k, index in enumerate(assigned):
+            if index >= base and index != base + k:
+                assigned[k] = assigned[index - base]
+
+        return assigned
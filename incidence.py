@@ -0,0 +1,379 @@
+"""
+Matrice d'incidence réponses × tags normalisés pour l'Analyseur de Réponses Ouvertes.
+
+Le résultat de la réattribution (tags normalisés de chaque réponse) est
+représenté par une matrice creuse au format CSR : pour chaque réponse, les
+numéros de ses tags, stockés dans deux tableaux numpy. Les comptages par tag,
+les cooccurrences et les comptages par segment (colonne du fichier d'origine)
+sont calculés par opérations vectorisées plutôt qu'en parcourant les listes
+de tags de chaque ligne. scipy, s'il est installé, est utilisé pour le
+produit matriciel des cooccurrences.
+
+Les résultats peuvent être exportés au format Parquet (pyarrow, optionnel) :
+réponses, incidence (une ligne par couple réponse-tag) et tags avec leur
+synthèse, chaque synthèse n'apparaissant qu'une fois.
+"""
+
+import os
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Nombre de réponses converties à la fois en matrice dense pour les cooccurrences sans scipy
+DENSE_BLOCK_ROWS = 8192
+
+# Tables exportées au format Parquet
+EXPORT_TABLES = ('responses', 'incidence', 'tags')
+
+
+class TagIncidence:
+    """
+    Matrice d'incidence creuse (CSR) réponses × tags normalisés.
+
+    Args:
+        tags (list): Tags normalisés, dans l'ordre des colonnes
+        indptr (np.ndarray): Début des tags de chaque réponse dans indices (taille n + 1)
+        indices (np.ndarray): Numéros de colonne des tags, triés pour chaque réponse
+    """
+
+    def __init__(self, tags, indptr, indices):
+        self.tags = list(tags)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self._columns = {tag: column for column, tag in enumerate(self.tags)}
+        self._tag_rows = None
+
+    @classmethod
+    def from_pairs(cls, rows, columns, tags, n_rows):
+        """
+        Construit la matrice à partir de couples (réponse, tag), éventuellement répétés.
+
+        Args:
+            rows: Positions des réponses (à partir de 0)
+            columns: Numéros de colonne des tags, dans tags
+            tags (list): Tags normalisés
+            n_rows (int): Nombre de réponses
+
+        Returns:
+            TagIncidence: Matrice d'incidence
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        if len(rows):
+            # Tri par réponse puis par tag, les couples répétés ne comptent qu'une fois
+            keys = np.unique(rows * max(1, len(tags)) + columns)
+            rows, columns = np.divmod(keys, max(1, len(tags)))
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return cls(tags, indptr, columns)
+
+    @classmethod
+    def from_response_tags(cls, normalized_response_tags, n_rows, tags=None):
+        """
+        Construit la matrice à partir des tags normalisés par réponse du pipeline.
+
+        Args:
+            normalized_response_tags (list): Dictionnaires (response_id à partir de 1, normalized_tags) ;
+                en cas de doublon, la première entrée l'emporte
+            n_rows (int): Nombre de réponses
+            tags (list): Ordre des colonnes (par défaut, du tag le plus fréquent au moins fréquent)
+
+        Returns:
+            TagIncidence: Matrice d'incidence
+        """
+        seen = set()
+        pairs = []
+        for item in normalized_response_tags:
+            row = item.get('response_id', 0) - 1
+            if 0 <= row < n_rows and row not in seen:
+                seen.add(row)
+                pairs.extend((row, tag) for tag in item.get('normalized_tags', []))
+
+        if tags is None:
+            counts = {}
+            for _, tag in set(pairs):
+                counts[tag] = counts.get(tag, 0) + 1
+            tags = sorted(counts, key=lambda tag: (-counts[tag], tag))
+        columns = {tag: column for column, tag in enumerate(tags)}
+        pairs = [(row, columns[tag]) for row, tag in pairs if tag in columns]
+        return cls.from_pairs([row for row, _ in pairs], [column for _, column in pairs], tags, n_rows)
+
+    @property
+    def shape(self):
+        return len(self.indptr) - 1, len(self.tags)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def _entry_rows(self):
+        # Réponse de chaque élément non nul (forme COO)
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def _column(self, tag):
+        column = self._columns.get(tag)
+        if column is None:
+            raise KeyError(f"Tag inconnu: {tag}")
+        return column
+
+    def to_scipy(self):
+        """
+        Retourne la matrice au format scipy.sparse.csr_matrix (nécessite scipy).
+        """
+        try:
+            from scipy import sparse
+        except ImportError as e:
+            raise ImportError("La conversion en matrice scipy nécessite le paquet scipy (pip install scipy)") from e
+        data = np.ones(self.nnz, dtype=np.int32)
+        return sparse.csr_matrix((data, self.indices, self.indptr), shape=self.shape)
+
+    def counts(self):
+        """
+        Retourne le nombre de réponses portant chaque tag.
+
+        Returns:
+            pd.Series: Nombre de réponses par tag, dans l'ordre des colonnes
+        """
+        return pd.Series(np.bincount(self.indices, minlength=len(self.tags)), index=self.tags)
+
+    def top_tags(self, limit=10, rows=None):
+        """
+        Retourne les tags les plus fréquents, éventuellement parmi certaines réponses.
+
+        Args:
+            limit (int): Nombre de tags retournés
+            rows: Positions des réponses retenues (par défaut toutes)
+
+        Returns:
+            list: Couples (tag, nombre de réponses), du plus fréquent au moins fréquent
+        """
+        if rows is None:
+            counts = np.bincount(self.indices, minlength=len(self.tags))
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+            starts, ends = self.indptr[rows], self.indptr[rows + 1]
+            lengths = ends - starts
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            counts = np.bincount(self.indices[positions], minlength=len(self.tags))
+        order = np.lexsort((np.arange(len(self.tags)), -counts))[:limit]
+        return [(self.tags[column], int(counts[column])) for column in order if counts[column]]
+
+    def rows_with(self, *tags):
+        """
+        Retourne les positions des réponses portant tous les tags demandés.
+
+        Returns:
+            np.ndarray: Positions triées des réponses (à partir de 0)
+        """
+        if self._tag_rows is None:
+            # Index inverse (CSC) : réponses de chaque tag, construit à la première recherche
+            order = np.argsort(self.indices, kind='stable')
+            self._tag_rows = (
+                np.concatenate(([0], np.cumsum(np.bincount(self.indices, minlength=len(self.tags))))),
+                self._entry_rows()[order]
+            )
+        tag_indptr, tag_rows = self._tag_rows
+        result = None
+        for tag in tags:
+            column = self._column(tag)
+            rows = tag_rows[tag_indptr[column]:tag_indptr[column + 1]]
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return result if result is not None else np.arange(self.shape[0])
+
+    def cooccurrence(self, tags=None):
+        """
+        Calcule le nombre de réponses portant chaque paire de tags.
+
+        Args:
+            tags (list): Tags retenus (par défaut tous)
+
+        Returns:
+            pd.DataFrame: Matrice symétrique tags × tags ; la diagonale contient
+                le nombre de réponses de chaque tag
+        """
+        indptr, indices = self.indptr, self.indices
+        labels = self.tags
+        if tags is not None:
+            # Sous-matrice des colonnes retenues, renumérotées
+            labels = list(tags)
+            selected = np.array([self._column(tag) for tag in labels], dtype=np.int64)
+            remap = np.full(len(self.tags), -1, dtype=np.int64)
+            remap[selected] = np.arange(len(selected))
+            kept = remap[indices] >= 0
+            indices = remap[indices][kept]
+            indptr = np.zeros(self.shape[0] + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self._entry_rows()[kept], minlength=self.shape[0]), out=indptr[1:])
+        width = len(labels)
+
+        try:
+            from scipy import sparse
+        except ImportError:
+            sparse = None
+
+        if sparse is not None:
+            matrix = sparse.csr_matrix(
+                (np.ones(len(indices), dtype=np.int64), indices, indptr), shape=(len(indptr) - 1, width)
+            )
+            result = (matrix.T @ matrix).toarray()
+        else:
+            # Sans scipy : produit par blocs de réponses converties en matrices denses
+            result = np.zeros((width, width), dtype=np.int64)
+            for start in range(0, len(indptr) - 1, DENSE_BLOCK_ROWS):
+                end = min(start + DENSE_BLOCK_ROWS, len(indptr) - 1)
+                block = np.zeros((end - start, width), dtype=np.float32)
+                lengths = np.diff(indptr[start:end + 1])
+                block[np.repeat(np.arange(end - start), lengths), indices[indptr[start]:indptr[end]]] = 1
+                result += (block.T @ block).astype(np.int64)
+        return pd.DataFrame(result, index=labels, columns=labels)
+
+    def related_tags(self, tag, limit=10):
+        """
+        Retourne les tags les plus souvent associés à un tag.
+
+        Returns:
+            list: Couples (tag, nombre de réponses portant les deux tags), du plus fréquent au moins fréquent
+        """
+        column = self._column(tag)
+        return [(other, count) for other, count in self.top_tags(limit + 1, rows=self.rows_with(tag))
+                if self._columns[other] != column][:limit]
+
+    def counts_by_segment(self, segments):
+        """
+        Compte les réponses de chaque tag par segment (valeur d'une colonne du fichier d'origine).
+
+        Args:
+            segments: Segment de chaque réponse, dans l'ordre des réponses
+
+        Returns:
+            pd.DataFrame: Segments × tags, avec une colonne 'total' (nombre de réponses du segment)
+        """
+        segments = np.asarray(['' if segment is None else str(segment) for segment in segments])
+        if len(segments) != self.shape[0]:
+            raise ValueError(f"{len(segments)} segments pour {self.shape[0]} réponses")
+        labels, inverse = np.unique(segments, return_inverse=True)
+        width = len(self.tags)
+        counts = np.bincount(
+            inverse[self._entry_rows()] * width + self.indices, minlength=len(labels) * width
+        ).reshape(len(labels), width)
+        result = pd.DataFrame(counts, index=labels, columns=self.tags)
+        result.insert(0, 'total', np.bincount(inverse, minlength=len(labels)))
+        return result
+
+
+def summary_fields(summary):
+    """
+    Colonnes exportées d'une synthèse, quelle que soit sa forme.
+
+    Les synthèses viennent du LLM ou du stockage et n'ont pas toujours la forme
+    attendue : une synthèse réduite à un texte est conservée, les champs de
+    type inattendu sont convertis ou laissés vides.
+
+    Args:
+        summary: Synthèse d'un tag (dict avec 'synthèse', 'nombre_utilisateurs' et 'verbatims')
+
+    Returns:
+        dict: 'synthèse' (str ou None), 'nombre_utilisateurs' (int ou None) et 'verbatims' (liste de str)
+    """
+    if isinstance(summary, str):
+        summary = {'synthèse': summary}
+    elif not isinstance(summary, dict):
+        summary = {}
+
+    text = summary.get('synthèse')
+    if text is not None and not isinstance(text, str):
+        text = json.dumps(text, ensure_ascii=False)
+
+    users = summary.get('nombre_utilisateurs')
+    try:
+        users = int(users) if users is not None and not isinstance(users, bool) else None
+    except (TypeError, ValueError):
+        users = None
+
+    verbatims = summary.get('verbatims')
+    if isinstance(verbatims, str):
+        verbatims = [verbatims]
+    elif not isinstance(verbatims, (list, tuple)):
+        verbatims = []
+    verbatims = [verbatim if isinstance(verbatim, str) else json.dumps(verbatim, ensure_ascii=False)
+                 for verbatim in verbatims if verbatim is not None]
+
+    return {'synthèse': text, 'nombre_utilisateurs': users, 'verbatims': verbatims}
+
+
+def export_tables(incidence, ids, responses, original_tags, tag_mapping, tag_summaries):
+    """
+    Prépare les tables exportées au format Arrow (nécessite pyarrow).
+
+    Args:
+        incidence (TagIncidence): Tags normalisés des réponses
+        ids (list): Identifiants des réponses
+        responses (list): Textes des réponses
+        original_tags (list): Tags extraits de chaque réponse
+        tag_mapping (dict): Tag normalisé -> tags originaux
+        tag_summaries (dict): Synthèses par tag normalisé
+
+    Returns:
+        dict: Tables 'responses' (row, id, response, original_tags), 'incidence'
+            (row, tag) et 'tags' (tag, count, originals, synthèse, nombre_utilisateurs, verbatims)
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("L'export Parquet nécessite le paquet pyarrow (pip install pyarrow)") from e
+
+    n_rows = incidence.shape[0]
+    counts = incidence.counts()
+    tags = incidence.tags + [tag for tag in tag_mapping if tag not in incidence._columns]
+    summaries = [summary_fields(tag_summaries.get(tag)) for tag in tags]
+
+    return {
+        'responses': pa.table({
+            'row': pa.array(np.arange(n_rows, dtype=np.int32)),
+            'id': pa.array([int(row_id) for row_id in ids], type=pa.int64()),
+            'response': pa.array([str(response) for response in responses], type=pa.string()),
+            'original_tags': pa.array(list(original_tags), type=pa.list_(pa.string()))
+        }),
+        'incidence': pa.table({
+            'row': pa.array(incidence._entry_rows().astype(np.int32)),
+            # Tags encodés par dictionnaire : chaque tag n'est stocké qu'une fois
+            'tag': pa.DictionaryArray.from_arrays(
+                pa.array(incidence.indices), pa.array(incidence.tags, type=pa.string())
+            )
+        }),
+        'tags': pa.table({
+            'tag': pa.array(tags, type=pa.string()),
+            'count': pa.array([int(counts.get(tag, 0)) for tag in tags], type=pa.int64()),
+            'originals': pa.array([list(tag_mapping.get(tag, [])) for tag in tags], type=pa.list_(pa.string())),
+            'synthèse': pa.array([summary['synthèse'] for summary in summaries], type=pa.string()),
+            'nombre_utilisateurs': pa.array([summary['nombre_utilisateurs'] for summary in summaries], type=pa.int64()),
+            'verbatims': pa.array([summary['verbatims'] for summary in summaries], type=pa.list_(pa.string()))
+        })
+    }
+
+
+def write_parquet(tables, directory):
+    """
+    Écrit les tables exportées dans un répertoire, un fichier Parquet par table.
+
+    Args:
+        tables (dict): Tables retournées par export_tables
+        directory (str): Répertoire de destination
+
+    Returns:
+        list: Chemins des fichiers écrits
+    """
+    import pyarrow.parquet as pq
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, table in tables.items():
+        path = os.path.join(directory, f"{name}.parquet")
+        temporary = f"{path}.tmp"
+        pq.write_table(table, temporary)
+        os.replace(temporary, path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,164 @@
+"""
+État persistant des analyses incrémentales pour l'Analyseur de Réponses Ouvertes.
+
+Pour chaque jeu de données (identifié par son nom), la base SQLite conserve :
+- les tags extraits de chaque ligne, indexés par (id, empreinte du texte) ;
+- le vocabulaire de normalisation (tag original -> tag normalisé) ;
+- les synthèses par tag, avec l'empreinte de l'ensemble des réponses membres.
+Une nouvelle analyse du même jeu de données ne retraite ainsi que les lignes
+nouvelles ou modifiées et les tags dont les membres ont changé.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def hash_response(text):
+    """
+    Empreinte du texte d'une réponse.
+    """
+    return hashlib.sha1(str(text).encode('utf-8')).hexdigest()
+
+
+def hash_members(texts):
+    """
+    Empreinte de l'ensemble des réponses associées à un tag (indépendante de l'ordre).
+    """
+    digest = hashlib.sha1()
+    for text in sorted(str(text) for text in texts):
+        digest.update(text.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class AnalysisStateStore:
+    """
+    Stockage SQLite de l'état des analyses incrémentales.
+
+    Args:
+        path (str): Chemin de la base SQLite
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS datasets (
+                    name TEXT PRIMARY KEY,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS dataset_rows (
+                    dataset TEXT NOT NULL,
+                    row_id TEXT NOT NULL,
+                    response_hash TEXT NOT NULL,
+                    tags TEXT NOT NULL,
+                    PRIMARY KEY (dataset, row_id)
+                );
+                CREATE TABLE IF NOT EXISTS dataset_vocabulary (
+                    dataset TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    original TEXT NOT NULL,
+                    normalized TEXT NOT NULL,
+                    PRIMARY KEY (dataset, position)
+                );
+                CREATE TABLE IF NOT EXISTS dataset_summaries (
+                    dataset TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    members_hash TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    PRIMARY KEY (dataset, tag)
+                );
+            """)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def load(self, dataset):
+        """
+        Charge l'état d'un jeu de données.
+
+        Args:
+            dataset (str): Nom du jeu de données
+
+        Returns:
+            dict: 'rows' (row_id -> (empreinte, tags)), 'vocabulary'
+                (tag normalisé -> tags originaux) et 'summaries'
+                (tag -> (empreinte des membres, synthèse))
+        """
+        with self._connect() as conn:
+            rows = {
+                row_id: (response_hash, json.loads(tags))
+                for row_id, response_hash, tags in conn.execute(
+                    "SELECT row_id, response_hash, tags FROM dataset_rows WHERE dataset = ?", (dataset,)
+                )
+            }
+
+            vocabulary = {}
+            for original, normalized in conn.execute(
+                "SELECT original, normalized FROM dataset_vocabulary WHERE dataset = ? ORDER BY position", (dataset,)
+            ):
+                vocabulary.setdefault(normalized, []).append(original)
+
+            summaries = {
+                tag: (members_hash, json.loads(summary))
+                for tag, members_hash, summary in conn.execute(
+                    "SELECT tag, members_hash, summary FROM dataset_summaries WHERE dataset = ?", (dataset,)
+                )
+            }
+
+        return {'rows': rows, 'vocabulary': vocabulary, 'summaries': summaries}
+
+    def save(self, dataset, rows, vocabulary, summaries):
+        """
+        Remplace l'état d'un jeu de données.
+
+        Args:
+            dataset (str): Nom du jeu de données
+            rows (list): Tuples (row_id, empreinte de la réponse, tags extraits)
+            vocabulary (dict): Tag normalisé -> tags originaux
+            summaries (dict): Tag -> (empreinte des membres, synthèse)
+        """
+        vocabulary_rows = []
+        for normalized, originals in vocabulary.items():
+            for original in originals:
+                vocabulary_rows.append((dataset, len(vocabulary_rows), original, normalized))
+
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM dataset_rows WHERE dataset = ?", (dataset,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO dataset_rows (dataset, row_id, response_hash, tags) VALUES (?, ?, ?, ?)",
+                ((dataset, str(row_id), response_hash, json.dumps(tags, ensure_ascii=False))
+                 for row_id, response_hash, tags in rows)
+            )
+
+            conn.execute("DELETE FROM dataset_vocabulary WHERE dataset = ?", (dataset,))
+            conn.executemany(
+                "INSERT INTO dataset_vocabulary (dataset, position, original, normalized) VALUES (?, ?, ?, ?)",
+                vocabulary_rows
+            )
+
+            conn.execute("DELETE FROM dataset_summaries WHERE dataset = ?", (dataset,))
+            conn.executemany(
+                "INSERT INTO dataset_summaries (dataset, tag, members_hash, summary) VALUES (?, ?, ?, ?)",
+                ((dataset, tag, members_hash, json.dumps(summary, ensure_ascii=False))
+                 for tag, (members_hash, summary) in summaries.items())
+            )
+
+            conn.execute(
+                "INSERT OR REPLACE INTO datasets (name, updated_at) VALUES (?, ?)", (dataset, time.time())
+            )
+        logger.info(f"État du jeu de données '{dataset}' enregistré ({len(rows)} lignes)")
@@ -0,0 +1,59 @@
+"""
+Lecture en flux des fichiers CSV importés pour l'Analyseur de Réponses Ouvertes.
+
+Le fichier est lu par lots directement depuis le flux d'entrée (fichier
+téléversé ou fichier sur disque), sans décoder l'intégralité du contenu en
+mémoire, et seules les colonnes utilisées par l'analyse sont chargées.
+"""
+
+import itertools
+import logging
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Colonnes utilisées par l'analyse, les autres ne sont pas chargées
+INGESTION_COLUMNS = ('id', 'response')
+
+# Nombre de lignes lues par lot
+INGESTION_BATCH_SIZE = 5000
+
+
+def open_csv_batches(source, batch_size=INGESTION_BATCH_SIZE, encoding='utf-8'):
+    """
+    Ouvre un CSV en lecture par lots.
+
+    Le premier lot est lu immédiatement pour valider les colonnes, de sorte
+    qu'un fichier invalide soit signalé avant le début de l'analyse.
+
+    Args:
+        source: Chemin du fichier ou flux binaire/texte
+        batch_size (int): Nombre de lignes par lot
+        encoding (str): Encodage du fichier
+
+    Returns:
+        iterator: Lots (DataFrame) contenant les colonnes 'response' et, si présente, 'id'
+
+    Raises:
+        ValueError: Si le fichier ne contient pas de colonne 'response'
+    """
+    reader = pd.read_csv(
+        source,
+        usecols=lambda column: column in INGESTION_COLUMNS,
+        dtype={'response': str},
+        chunksize=batch_size,
+        encoding=encoding
+    )
+
+    first_batch = next(reader, None)
+    if first_batch is None or 'response' not in first_batch.columns:
+        reader.close()
+        raise ValueError("Le fichier CSV doit contenir une colonne 'response'")
+
+    return _clean_batches(itertools.chain([first_batch], reader))
+
+
+def _clean_batches(batches):
+    for batch in batches:
+        batch['response'] = batch['response'].fillna('')
+        yield batch
@@ -0,0 +1,258 @@
+"""
+File de tâches asynchrones pour l'Analyseur de Réponses Ouvertes.
+
+Les analyses longues sont exécutées en arrière-plan par un pool de threads.
+L'état des tâches (étapes, progression, résultat) est persisté dans une base
+SQLite locale afin de survivre à un redémarrage du serveur et d'être lisible
+depuis n'importe quel processus.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+STAGE_PENDING = 'pending'
+STAGE_RUNNING = 'running'
+STAGE_DONE = 'done'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobManager:
+    """
+    Gestionnaire de tâches persistantes exécutées en arrière-plan.
+
+    Chaque tâche est réclamée de manière atomique dans la base (UPDATE
+    conditionnel), ce qui permet à plusieurs processus de partager la même
+    file sans exécuter deux fois une tâche. Les threads d'exécution sont
+    démarrés par start() au lancement du serveur, pour que les tâches en
+    attente ou interrompues reprennent sans attendre une nouvelle soumission.
+
+    Args:
+        db_path (str): Chemin de la base SQLite
+        storage_dir (str): Dossier des fichiers d'entrée des tâches
+        runner (callable): Fonction runner(job, progress) qui exécute une tâche
+            et retourne son résultat (dict sérialisable en JSON)
+        stages (list): Noms des étapes, dans l'ordre d'exécution
+        max_workers (int): Nombre de tâches exécutées simultanément
+    """
+
+    def __init__(self, db_path, storage_dir, runner, stages, max_workers=2):
+        self.db_path = db_path
+        self.storage_dir = storage_dir
+        self.runner = runner
+        self.stages = list(stages)
+        self.max_workers = max_workers
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._started = False
+
+        os.makedirs(storage_dir, exist_ok=True)
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    input_path TEXT,
+                    params TEXT,
+                    stages TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def start(self):
+        """
+        Démarre les threads d'exécution (idempotent) et relance les tâches
+        interrompues par l'arrêt d'un processus.
+        """
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            # Après un fork, le processus enfant doit s'identifier avec son propre pid
+            self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._recover_orphans()
+
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+        logger.info(f"File de tâches démarrée avec {self.max_workers} workers")
+
+    def _recover_orphans(self):
+        hostname = socket.gethostname()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, owner FROM jobs WHERE status = ?", (JOB_RUNNING,)).fetchall()
+            for job_id, owner in rows:
+                host, _, pid = (owner or '').rpartition(':')
+                if host == hostname and pid.isdigit() and _pid_alive(int(pid)):
+                    continue
+                logger.info(f"Reprise de la tâche interrompue {job_id}")
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                    (JOB_QUEUED, time.time(), job_id, JOB_RUNNING)
+                )
+
+    def submit(self, input_path=None, params=None, job_id=None):
+        """
+        Ajoute une tâche à la file.
+
+        Args:
+            input_path (str): Fichier d'entrée de la tâche
+            params (dict): Paramètres transmis au runner
+            job_id (str): Identifiant de la tâche (généré si absent)
+
+        Returns:
+            str: Identifiant de la tâche
+        """
+        job_id = job_id or self.new_job_id()
+        now = time.time()
+        stages = {stage: {'status': STAGE_PENDING, 'done': 0, 'total': 0} for stage in self.stages}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, input_path, params, stages, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, input_path, json.dumps(params or {}), json.dumps(stages), now, now)
+            )
+        self._wakeup.set()
+        return job_id
+
+    @staticmethod
+    def new_job_id():
+        return uuid.uuid4().hex
+
+    def input_path_for(self, job_id, extension='.csv'):
+        """
+        Retourne le chemin où stocker le fichier d'entrée d'une tâche.
+        """
+        return os.path.join(self.storage_dir, f"{job_id}{extension}")
+
+    def get(self, job_id):
+        """
+        Retourne l'état d'une tâche, ou None si elle n'existe pas.
+
+        Returns:
+            dict: Statut, progression par étape, erreur et résultat éventuels
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, stages, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        job = {
+            'id': row[0],
+            'status': row[1],
+            'stages': json.loads(row[2]),
+            'error': row[4],
+            'created_at': row[5],
+            'updated_at': row[6]
+        }
+        if row[3] is not None:
+            job['result'] = json.loads(row[3])
+        return job
+
+    def _claim_next(self):
+        with self._connect() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT id, input_path, params FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (JOB_QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                claimed = conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ? AND status = ?",
+                    (JOB_RUNNING, self.owner, time.time(), row[0], JOB_QUEUED)
+                ).rowcount
+                conn.commit()
+                if claimed:
+                    return {'id': row[0], 'input_path': row[1], 'params': json.loads(row[2] or '{}')}
+
+    def _worker_loop(self):
+        while True:
+            job = self._claim_next()
+            if job is None:
+                self._wakeup.wait(timeout=2)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        job_id = job['id']
+        logger.info(f"Exécution de la tâche {job_id}")
+        stages = {stage: {'status': STAGE_PENDING, 'done': 0, 'total': 0} for stage in self.stages}
+
+        def progress(stage, done=0, total=0):
+            # Une étape qui démarre termine toutes les étapes précédentes
+            if stage in stages:
+                for previous in self.stages[:self.stages.index(stage)]:
+                    stages[previous]['status'] = STAGE_DONE
+            finished = total and done >= total
+            stages[stage] = {'status': STAGE_DONE if finished else STAGE_RUNNING, 'done': done, 'total': total}
+            self._update(job_id, stages=stages)
+
+        try:
+            result = self.runner(job, progress)
+            for stage in stages.values():
+                stage['status'] = STAGE_DONE
+            self._update(job_id, status=JOB_DONE, stages=stages, result=result)
+            logger.info(f"Tâche {job_id} terminée")
+        except Exception as e:
+            logger.exception(f"Erreur lors de l'exécution de la tâche {job_id}")
+            self._update(job_id, status=JOB_FAILED, stages=stages, error=str(e))
+
+    def _update(self, job_id, status=None, stages=None, result=None, error=None):
+        fields = ['updated_at = ?']
+        values = [time.time()]
+        if status is not None:
+            fields.append('status = ?')
+            values.append(status)
+        if stages is not None:
+            fields.append('stages = ?')
+            values.append(json.dumps(stages))
+        if result is not None:
+            fields.append('result = ?')
+            values.append(json.dumps(result, ensure_ascii=False))
+        if error is not None:
+            fields.append('error = ?')
+            values.append(error)
+        values.append(job_id)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {', '.join(fields)} WHERE id = ?", values)
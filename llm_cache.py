@@ -0,0 +1,172 @@
+"""
+Cache persistant des réponses du LLM pour l'Analyseur de Réponses Ouvertes.
+
+Les réponses sont stockées dans une base SQLite locale, indexées par une
+empreinte du fournisseur, du modèle, des paramètres d'échantillonnage et des
+messages.
+Relancer une analyse sur le même fichier ne refait donc aucun appel à l'API.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model, temperature, max_tokens, messages, provider=None):
+    """
+    Calcule la clé de cache d'une requête de chat.
+
+    Args:
+        model (str): Nom du modèle
+        temperature (float): Température d'échantillonnage
+        max_tokens (int): Nombre maximum de tokens générés
+        messages (list): Messages de la conversation (objets avec role/content ou dicts)
+        provider (str): Nom du fournisseur : un même nom de modèle chez deux fournisseurs
+            (par exemple le fournisseur simulé) ne partage pas ses réponses
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    normalized_messages = []
+    for message in messages:
+        if isinstance(message, dict):
+            normalized_messages.append([message.get('role'), message.get('content')])
+        else:
+            normalized_messages.append([message.role, message.content])
+
+    payload = json.dumps({
+        'provider': provider,
+        'model': model,
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+        'messages': normalized_messages
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """
+    Cache clé/valeur des réponses du LLM, persistant sur disque (SQLite).
+
+    Les entrées expirent après ttl_seconds et les moins récemment utilisées
+    sont évincées au-delà de max_entries. Les compteurs hits/misses sont
+    tenus en mémoire pour la durée de vie du processus.
+    """
+
+    def __init__(self, path, max_entries=100000, ttl_seconds=30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        """
+        Retourne la valeur associée à la clé, ou None si absente ou expirée.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        """
+        Enregistre une valeur dans le cache.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._conn.commit()
+
+            # L'éviction est faite par paquets pour ne pas compter les lignes à chaque écriture
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction >= 100:
+                self._evict(now)
+
+    def evict(self):
+        """
+        Supprime les entrées expirées et les plus anciennes au-delà de max_entries.
+        """
+        with self._lock:
+            self._evict(time.time())
+
+    def _evict(self, now):
+        self._writes_since_eviction = 0
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        if self.max_entries:
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute("""
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?
+                    )
+                """, (count - self.max_entries,))
+        self._conn.commit()
+
+    def clear(self):
+        """
+        Vide le cache et remet les compteurs à zéro.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Retourne les statistiques du cache.
+
+        Returns:
+            dict: Nombre de hits, de misses et d'entrées stockées
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': entries
+            }
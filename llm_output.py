@@ -0,0 +1,143 @@
+"""
+Interprétation des réponses JSON du LLM pour l'Analyseur de Réponses Ouvertes.
+
+Le modèle ne retourne pas toujours un JSON valide : texte ou balises markdown
+autour du JSON, virgule finale, ou réponse coupée par la limite de tokens.
+Plutôt que de chercher le JSON par expression régulière (ce qui prend parfois
+le mauvais passage et perd tout en cas de coupure), le texte est parcouru
+élément par élément avec le décodeur de la bibliothèque standard :
+- un JSON valide entouré de texte est extrait tel quel ;
+- d'un tableau ou d'un objet coupé, les éléments complets sont conservés.
+Un tableau n'est retenu que si ses éléments ont le type attendu : dans
+« Voici les tags [1] : [{...}] », c'est le second tableau qui est retenu.
+"""
+
+import json
+from typing import NamedTuple
+
+# Statuts de l'interprétation
+PARSE_JSON = 'json'          # Réponse entièrement valide
+PARSE_EXTRACTED = 'extrait'  # JSON complet trouvé dans du texte
+PARSE_PARTIAL = 'partiel'    # JSON incomplet (coupé ou invalide) : seuls les éléments complets sont conservés
+PARSE_FAILED = 'echec'       # Aucun élément exploitable
+
+# Nombre maximum de débuts de JSON examinés dans une réponse
+MAX_CANDIDATES = 32
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class ParsedOutput(NamedTuple):
+    """
+    Résultat de l'interprétation d'une réponse du LLM.
+
+    Attributes:
+        value: Tableau ou objet obtenu (None en cas d'échec)
+        status (str): PARSE_JSON, PARSE_EXTRACTED, PARSE_PARTIAL ou PARSE_FAILED
+    """
+    value: object
+    status: str
+
+    @property
+    def complete(self):
+        return self.status in (PARSE_JSON, PARSE_EXTRACTED)
+
+
+def _skip_whitespace(text, pos):
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _decode_partial(text, start, kind):
+    """
+    Décode le tableau ou l'objet commençant à start, élément par élément.
+
+    Returns:
+        tuple: (valeur, True si le conteneur est refermé)
+    """
+    closing = ']' if kind is list else '}'
+    value = [] if kind is list else {}
+    pos = start + 1
+
+    while True:
+        pos = _skip_whitespace(text, pos)
+        if pos < len(text) and text[pos] == closing:
+            # Conteneur refermé (y compris après une virgule finale)
+            return value, True
+        try:
+            if kind is list:
+                element, pos = _decoder.raw_decode(text, pos)
+                value.append(element)
+            else:
+                key, pos = _decoder.raw_decode(text, pos)
+                pos = _skip_whitespace(text, pos)
+                if not isinstance(key, str) or pos >= len(text) or text[pos] != ':':
+                    return value, False
+                element, pos = _decoder.raw_decode(text, _skip_whitespace(text, pos + 1))
+                value[key] = element
+        except json.JSONDecodeError:
+            return value, False
+
+        pos = _skip_whitespace(text, pos)
+        if pos < len(text) and text[pos] == ',':
+            pos += 1
+        elif pos < len(text) and text[pos] == closing:
+            return value, True
+        else:
+            return value, False
+
+
+def _has_elements(value, element):
+    # Un tableau n'est retenu que si ses éléments ont le type attendu
+    return element is None or not isinstance(value, list) or all(isinstance(item, element) for item in value)
+
+
+def parse_json_output(content, kind=list, element=None):
+    """
+    Interprète la réponse du LLM comme un tableau ou un objet JSON.
+
+    Les débuts de tableau (ou d'objet) sont examinés dans l'ordre ; le premier
+    qui donne un JSON complet du type attendu, ou au moins un élément complet,
+    est retenu, à condition que ses éléments soient du type element.
+
+    Args:
+        content (str): Texte retourné par le LLM
+        kind (type): list ou dict
+        element (type): Type attendu des éléments d'un tableau (par exemple dict), ou None
+
+    Returns:
+        ParsedOutput: Valeur obtenue et statut de l'interprétation
+    """
+    content = content or ''
+    try:
+        value = json.loads(content)
+        if isinstance(value, kind) and _has_elements(value, element):
+            return ParsedOutput(value, PARSE_JSON)
+    except json.JSONDecodeError:
+        pass
+
+    opening = '[' if kind is list else '{'
+    candidates = []
+    pos = content.find(opening)
+    while pos != -1 and len(candidates) < MAX_CANDIDATES:
+        candidates.append(pos)
+        pos = content.find(opening, pos + 1)
+
+    for start in candidates:
+        try:
+            value, _ = _decoder.raw_decode(content, start)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if isinstance(value, kind) and _has_elements(value, element):
+                return ParsedOutput(value, PARSE_EXTRACTED)
+
+        # Les débuts suivants peuvent être imbriqués dans celui-ci : le premier qui donne des éléments est retenu
+        value, closed = _decode_partial(content, start, kind)
+        if value and _has_elements(value, element):
+            # Conteneur refermé : seule une virgule finale empêchait le décodage complet
+            return ParsedOutput(value, PARSE_EXTRACTED if closed else PARSE_PARTIAL)
+
+    return ParsedOutput(None, PARSE_FAILED)
@@ -0,0 +1,464 @@
+"""
+Fournisseurs de LLM pour l'Analyseur de Réponses Ouvertes.
+
+Le fournisseur est choisi dans config.json (champ "provider") :
+- "mistral" : API de chat Mistral AI, via une session HTTP avec pool de
+  connexions persistantes (keep-alive) ;
+- "mock" : fournisseur local déterministe, avec latence configurable, qui
+  produit des réponses au format attendu par chaque étape du pipeline. Il
+  permet de tester et de mesurer le débit du pipeline sans réseau.
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import random
+import hashlib
+import threading
+import logging
+import unicodedata
+from collections import Counter
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {
+    'provider': 'mistral',
+    'endpoint': 'https://api.mistral.ai/v1/chat/completions',
+    'embeddings_endpoint': 'https://api.mistral.ai/v1/embeddings',
+    'api_key': 'ENV_MISTRAL_API_KEY',
+    'model': 'mistral-large-latest',
+    'models': {},
+    'timeout': 120,
+    'pool_size': 16,
+    'mock': {},
+    'normalization_mode': 'llm',
+    'embeddings': {}
+}
+
+
+def load_llm_config(path='config.json'):
+    """
+    Charge la configuration du LLM.
+
+    Les valeurs de la forme "ENV_NOM" sont remplacées par la variable
+    d'environnement NOM. La variable LLM_PROVIDER, si elle est définie,
+    remplace le fournisseur du fichier.
+
+    Args:
+        path (str): Chemin du fichier de configuration
+
+    Returns:
+        dict: Configuration complétée par les valeurs par défaut
+    """
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            config.update(json.load(f))
+
+    for key, value in config.items():
+        if isinstance(value, str) and value.startswith('ENV_'):
+            config[key] = os.environ.get(value[len('ENV_'):], '')
+
+    if os.environ.get('LLM_PROVIDER'):
+        config['provider'] = os.environ['LLM_PROVIDER']
+    return config
+
+
+def _message_fields(message):
+    if isinstance(message, dict):
+        return message.get('role'), message.get('content')
+    return message.role, message.content
+
+
+class LLMError(Exception):
+    """
+    Erreur d'un appel au LLM.
+
+    Args:
+        message (str): Description de l'erreur
+        status (int): Code HTTP de la réponse, s'il y en a une
+        retry_after (float): Délai demandé par le serveur avant une nouvelle tentative, en secondes
+        retryable (bool): L'erreur est transitoire et l'appel peut être réessayé
+    """
+
+    def __init__(self, message, status=None, retry_after=None, retryable=False):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.retryable = retryable
+
+
+def _parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class ChatResult:
+    """
+    Réponse d'un fournisseur de LLM.
+
+    Args:
+        content (str): Texte généré
+        prompt_tokens (int): Nombre de tokens envoyés
+        completion_tokens (int): Nombre de tokens générés
+    """
+
+    def __init__(self, content, prompt_tokens=0, completion_tokens=0):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMProvider:
+    """
+    Interface commune des fournisseurs de LLM.
+
+    Les compteurs d'appels et de tokens sont tenus pour la durée de vie du
+    processus et consultables via stats().
+    """
+
+    name = 'base'
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def chat(self, model, messages, temperature, max_tokens):
+        """
+        Envoie une requête de chat.
+
+        Args:
+            model (str): Nom du modèle
+            messages (list): Messages (dicts role/content)
+            temperature (float): Température d'échantillonnage
+            max_tokens (int): Nombre maximum de tokens générés
+
+        Returns:
+            ChatResult: Texte généré et consommation de tokens
+
+        Raises:
+            LLMError: Si l'appel échoue
+        """
+        result = self._chat(model, messages, temperature, max_tokens)
+        with self._stats_lock:
+            self.calls += 1
+            self.prompt_tokens += result.prompt_tokens
+            self.completion_tokens += result.completion_tokens
+        return result
+
+    def _chat(self, model, messages, temperature, max_tokens):
+        raise NotImplementedError
+
+    def embed(self, model, texts):
+        """
+        Calcule les embeddings d'une liste de textes en une requête.
+
+        Args:
+            model (str): Nom du modèle d'embeddings
+            texts (list): Textes à représenter
+
+        Returns:
+            list: Un vecteur (liste de nombres) par texte, dans l'ordre des textes
+
+        Raises:
+            LLMError: Si l'appel échoue
+        """
+        vectors, prompt_tokens = self._embed(model, texts)
+        with self._stats_lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+        return vectors
+
+    def _embed(self, model, texts):
+        raise NotImplementedError(f"Le fournisseur {self.name} ne calcule pas d'embeddings")
+
+    def stats(self):
+        """
+        Retourne les compteurs d'appels et de tokens.
+        """
+        with self._stats_lock:
+            return {
+                'provider': self.name,
+                'calls': self.calls,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+
+class MistralProvider(LLMProvider):
+    """
+    Fournisseur Mistral AI (API de chat compatible OpenAI).
+
+    Une seule session HTTP est partagée par tous les threads : les connexions
+    TLS sont réutilisées (keep-alive) dans la limite de pool_size connexions.
+    Les nouvelles tentatives sont du ressort de l'appelant (voir llm_scheduler) :
+    les réponses 429 et 5xx et les erreurs réseau lèvent une LLMError réessayable.
+
+    Args:
+        api_key (str): Clé API
+        endpoint (str): URL de l'API de chat
+        timeout (float): Délai maximum par requête, en secondes
+        pool_size (int): Nombre de connexions conservées dans le pool
+        embeddings_endpoint (str): URL de l'API d'embeddings
+    """
+
+    name = 'mistral'
+
+    def __init__(self, api_key, endpoint, timeout=120, pool_size=16, embeddings_endpoint=None):
+        super().__init__()
+        self.endpoint = endpoint
+        self.embeddings_endpoint = embeddings_endpoint or DEFAULT_CONFIG['embeddings_endpoint']
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _chat(self, model, messages, temperature, max_tokens):
+        data = self._post(self.endpoint, {
+            'model': model,
+            'messages': [dict(zip(('role', 'content'), _message_fields(message))) for message in messages],
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        })
+        usage = data.get('usage') or {}
+        return ChatResult(
+            data['choices'][0]['message']['content'],
+            prompt_tokens=usage.get('prompt_tokens', 0),
+            completion_tokens=usage.get('completion_tokens', 0)
+        )
+
+    def _embed(self, model, texts):
+        data = self._post(self.embeddings_endpoint, {'model': model, 'input': list(texts)})
+        items = sorted(data['data'], key=lambda item: item.get('index', 0))
+        return [item['embedding'] for item in items], (data.get('usage') or {}).get('prompt_tokens', 0)
+
+    def _post(self, url, payload):
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise LLMError(f"Erreur réseau lors de l'appel au LLM: {e}", retryable=True) from e
+
+        if response.status_code >= 400:
+            raise LLMError(
+                f"Erreur HTTP {response.status_code} du LLM: {response.text[:200]}",
+                status=response.status_code,
+                retry_after=_parse_retry_after(response.headers.get('Retry-After')),
+                retryable=response.status_code == 429 or response.status_code >= 500
+            )
+        return response.json()
+
+
+# Mots ignorés par le fournisseur simulé (repliés, sans accents)
+MOCK_STOPWORDS = {
+    'avec', 'dans', 'pour', 'sans', 'sous', 'plus', 'moins', 'tres', 'trop', 'bien', 'mais', 'comme',
+    'tout', 'tous', 'toute', 'toutes', 'cette', 'leur', 'leurs', 'etre', 'avoir', 'application'
+}
+
+# Taille des vecteurs d'embedding du fournisseur simulé
+MOCK_EMBEDDING_DIMENSIONS = 512
+
+
+def _mock_fold(text):
+    # Minuscules, sans accents ni ponctuation
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.sub(r"[^\w\s]|_", ' ', text).split())
+
+
+def _mock_words(text):
+    # Mots significatifs d'un texte, sans s ou x final
+    words = set()
+    for word in _mock_fold(text).split():
+        if len(word) > 4 and word[-1] in 'sx':
+            word = word[:-1]
+        if len(word) >= 4 and word not in MOCK_STOPWORDS:
+            words.add(word)
+    return words
+
+
+def _mock_embedding(text):
+    # Vecteur des trigrammes de caractères et des mots, haché dans MOCK_EMBEDDING_DIMENSIONS cases
+    vector = [0.0] * MOCK_EMBEDDING_DIMENSIONS
+    padded = f" {_mock_fold(text)} "
+    features = [padded[i:i + 3] for i in range(len(padded) - 2)] + [f"mot:{word}" for word in padded.split()]
+    for feature in features:
+        vector[zlib.crc32(feature.encode('utf-8')) % MOCK_EMBEDDING_DIMENSIONS] += 1.0
+    return vector
+
+
+class MockProvider(LLMProvider):
+    """
+    Fournisseur local déterministe, sans réseau.
+
+    Les réponses dépendent uniquement du contenu des messages : les tags sont
+    les mots significatifs les plus longs de chaque réponse, la normalisation
+    regroupe les tags par mot commun, les synthèses reprennent les premières
+    réponses, les embeddings sont des vecteurs de n-grammes de caractères.
+    Ces réponses sont calculées ici, sans dépendre du pipeline. Une latence simulée (latency_ms ± jitter_ms) est appliquée à
+    chaque appel.
+
+    Args:
+        latency_ms (float): Latence moyenne simulée, en millisecondes
+        jitter_ms (float): Variation maximale de la latence, en millisecondes
+        tags_per_response (int): Nombre maximum de tags par réponse
+        seed (int): Graine de la variation de latence
+    """
+
+    name = 'mock'
+
+    def __init__(self, latency_ms=0, jitter_ms=0, tags_per_response=3, seed=0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tags_per_response = tags_per_response
+        self.seed = seed
+
+    def _chat(self, model, messages, temperature, max_tokens):
+        system, prompt = '', ''
+        for message in messages:
+            role, content = _message_fields(message)
+            if role == 'system':
+                system = content
+            else:
+                prompt = content
+
+        self._simulate_latency(prompt)
+
+        if 'extrait des tags' in system:
+            content = self._extract(prompt)
+        elif 'Groupes:' in prompt:
+            content = self._name_groups(prompt)
+        elif 'Nouveaux tags:' in prompt:
+            content = self._map_to_categories(prompt)
+        elif 'normalise' in system:
+            content = self._normalize(prompt)
+        else:
+            content = self._summarize(prompt)
+
+        prompt_tokens = sum(len(str(_message_fields(message)[1])) for message in messages) // 4 + 1
+        return ChatResult(content, prompt_tokens=prompt_tokens, completion_tokens=len(content) // 4 + 1)
+
+    def _embed(self, model, texts):
+        self._simulate_latency('\n'.join(texts))
+        return [_mock_embedding(text) for text in texts], sum(len(text) for text in texts) // 4 + 1
+
+    def _simulate_latency(self, text):
+        if self.latency_ms or self.jitter_ms:
+            digest = hashlib.sha1(text.encode('utf-8')).digest()
+            jitter = random.Random(digest + str(self.seed).encode()).uniform(-self.jitter_ms, self.jitter_ms)
+            time.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+
+    @staticmethod
+    def _section(prompt, start, end):
+        # Lignes du prompt comprises entre deux marqueurs
+        section = prompt.split(start, 1)[1] if start in prompt else ''
+        return section.split(end, 1)[0].splitlines()
+
+    @classmethod
+    def _numbered(cls, prompt, start, end):
+        items = []
+        for line in cls._section(prompt, start, end):
+            match = re.match(r'\s*(\d+)\. (.*)$', line)
+            if match:
+                items.append((int(match.group(1)), match.group(2)))
+        return items
+
+    @classmethod
+    def _listed(cls, prompt, start, end):
+        return [line.strip()[2:] for line in cls._section(prompt, start, end) if line.strip().startswith('- ')]
+
+    def _extract(self, prompt):
+        items = []
+        for number, text in self._numbered(prompt, 'Réponses à analyser:', 'Pour chaque réponse'):
+            words = sorted(_mock_words(text), key=lambda word: (-len(word), word))
+            items.append({'response_id': number, 'tags': words[:self.tags_per_response]})
+        return json.dumps(items, ensure_ascii=False)
+
+    def _normalize(self, prompt):
+        groups = {}
+        for tag in self._listed(prompt, 'Tags à normaliser:', 'Retourne'):
+            tokens = sorted(_mock_words(tag))
+            groups.setdefault(tokens[0] if tokens else _mock_fold(tag), []).append(tag)
+        return json.dumps(groups, ensure_ascii=False)
+
+    def _name_groups(self, prompt):
+        names = {}
+        for number, members in self._numbered(prompt, 'Groupes:', 'Retourne'):
+            tokens = Counter(token for tag in members.split(' | ') for token in _mock_words(tag))
+            names[str(number)] = tokens.most_common(1)[0][0] if tokens else members.split(' | ')[0]
+        return json.dumps(names, ensure_ascii=False)
+
+    def _map_to_categories(self, prompt):
+        by_token = {}
+        for category in self._listed(prompt, 'Catégories existantes:', 'Associe'):
+            for token in sorted(_mock_words(category)):
+                by_token.setdefault(token, category)
+
+        mapping = {}
+        for tag in self._listed(prompt, 'Nouveaux tags:', 'Retourne'):
+            tokens = sorted(_mock_words(tag))
+            category = next((by_token[token] for token in tokens if token in by_token), None)
+            mapping.setdefault(category or (tokens[0] if tokens else tag), []).append(tag)
+        return json.dumps(mapping, ensure_ascii=False)
+
+    def _summarize(self, prompt):
+        match = re.search(r'tag "([^"]+)"', prompt)
+        tag = match.group(1) if match else ''
+        responses = [text for _, text in self._numbered(prompt, 'Réponses:', 'Génère')]
+        if not responses:
+            # Fusion de synthèses partielles
+            responses = self._listed(prompt, 'Verbatims proposés:', 'Fusionne')
+        words = Counter(word for text in responses for word in _mock_words(text))
+        themes = ', '.join(word for word, _ in words.most_common(3))
+        return json.dumps({
+            'synthèse': f"Les utilisateurs évoquent « {tag} » ({themes}).",
+            'nombre_utilisateurs': len(responses),
+            'verbatims': responses[:3]
+        }, ensure_ascii=False)
+
+
+def create_provider(config):
+    """
+    Crée le fournisseur de LLM décrit par la configuration.
+
+    Args:
+        config (dict): Configuration issue de load_llm_config
+
+    Returns:
+        LLMProvider: Fournisseur prêt à l'emploi
+    """
+    provider = config.get('provider', 'mistral')
+    logger.info(f"Fournisseur de LLM: {provider}")
+    if provider == 'mistral':
+        return MistralProvider(
+            api_key=config.get('api_key', ''),
+            endpoint=config.get('endpoint', DEFAULT_CONFIG['endpoint']),
+            timeout=config.get('timeout', DEFAULT_CONFIG['timeout']),
+            pool_size=config.get('pool_size', DEFAULT_CONFIG['pool_size']),
+            embeddings_endpoint=config.get('embeddings_endpoint', DEFAULT_CONFIG['embeddings_endpoint'])
+        )
+    if provider == 'mock':
+        return MockProvider(**config.get('mock', {}))
+    raise ValueError(f"Fournisseur de LLM inconnu: {provider}")
@@ -0,0 +1,247 @@
+"""
+Ordonnanceur des appels au LLM pour l'Analyseur de Réponses Ouvertes.
+
+Tous les appels au LLM du processus passent par un même ordonnanceur qui :
+- borne le nombre d'appels simultanés, et réduit cette borne de moitié à
+  chaque réponse 429 avant de la rétablir progressivement ;
+- respecte un débit maximum de requêtes et de tokens par minute (seaux à jetons) ;
+- sert les appels par priorité : les analyses interactives passent devant
+  les tâches en arrière-plan ;
+- réessaie les erreurs transitoires (429, 5xx, coupures réseau) avec un délai
+  exponentiel aléatoire, en respectant l'en-tête Retry-After ;
+- fusionne les requêtes identiques en cours : un seul appel est envoyé et
+  tous les demandeurs reçoivent sa réponse.
+"""
+
+import time
+import heapq
+import random
+import itertools
+import threading
+import contextvars
+import logging
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Priorités des appels (la plus petite valeur passe en premier)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_priority = contextvars.ContextVar('llm_priority', default=PRIORITY_BATCH)
+
+
+@contextmanager
+def llm_priority(priority):
+    """
+    Fixe la priorité des appels au LLM effectués dans le bloc, y compris
+    depuis les threads d'un ContextThreadPoolExecutor.
+
+    Args:
+        priority (int): PRIORITY_INTERACTIVE, PRIORITY_BATCH ou autre valeur
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor qui exécute chaque tâche dans le contexte du thread qui
+    l'a soumise, afin que la priorité des appels au LLM soit conservée.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class TokenBucket:
+    """
+    Seau à jetons rempli en continu à raison de rate_per_minute jetons par minute.
+
+    Une demande plus grande que la capacité est servie lorsque le seau est
+    plein, et le met en négatif. Un débit nul désactive la limite.
+
+    Args:
+        rate_per_minute (float): Débit autorisé
+        burst_seconds (float): Capacité du seau, en secondes de débit
+    """
+
+    def __init__(self, rate_per_minute, burst_seconds=10):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount):
+        """
+        Retourne le délai, en secondes, avant que amount jetons soient disponibles.
+        """
+        if not self.rate:
+            return 0.0
+        self._refill(time.monotonic())
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount):
+        if self.rate:
+            self._refill(time.monotonic())
+            self.level -= amount
+
+
+class LLMScheduler:
+    """
+    Ordonnanceur partagé des appels au LLM.
+
+    Les exceptions réessayables portent un attribut retryable vrai, et
+    éventuellement status (code HTTP) et retry_after (secondes).
+
+    Args:
+        max_in_flight (int): Nombre maximum d'appels simultanés
+        requests_per_minute (float): Débit maximum de requêtes (0 : illimité)
+        tokens_per_minute (float): Débit maximum de tokens (0 : illimité)
+        max_retries (int): Nombre maximum de nouvelles tentatives par appel
+        base_delay (float): Délai de la première nouvelle tentative, en secondes
+        max_delay (float): Délai maximum entre deux tentatives, en secondes
+    """
+
+    def __init__(self, max_in_flight=8, requests_per_minute=0, tokens_per_minute=0,
+                 max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._limit = float(max_in_flight)
+        self._paused_until = 0.0
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+
+        self._pending_lock = threading.Lock()
+        self._pending = {}
+
+    def run(self, key, func, tokens=0, priority=None):
+        """
+        Exécute un appel au LLM via l'ordonnanceur.
+
+        Args:
+            key (str): Clé de la requête ; les appels de même clé en cours sont
+                fusionnés (None pour ne pas fusionner)
+            func (callable): Fonction sans argument qui effectue l'appel
+            tokens (int): Tokens estimés de la requête (prompt et réponse)
+            priority (int): Priorité ; par défaut celle fixée par llm_priority
+
+        Returns:
+            Résultat de func
+
+        Raises:
+            Exception: Dernière erreur de func si elle n'est pas réessayable
+                ou si les tentatives sont épuisées
+        """
+        if priority is None:
+            priority = _priority.get()
+        if key is None:
+            return self._execute(func, tokens, priority)
+
+        with self._pending_lock:
+            future = self._pending.get(key)
+            leader = future is None
+            if leader:
+                future = self._pending[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._execute(func, tokens, priority)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._pending_lock:
+                del self._pending[key]
+
+    def _execute(self, func, tokens, priority):
+        for attempt in itertools.count():
+            self._acquire(priority, tokens)
+            try:
+                result = func()
+            except Exception as e:
+                throttled = getattr(e, 'status', None) == 429
+                self._release(throttled=throttled)
+                if not getattr(e, 'retryable', False) or attempt >= self.max_retries:
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+                delay = max(delay, getattr(e, 'retry_after', None) or 0)
+                logger.warning(f"Appel au LLM en échec ({e}), nouvelle tentative dans {delay:.1f}s")
+                if throttled:
+                    # Les autres appels attendent aussi la fin du délai
+                    with self._cond:
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                        self._cond.notify_all()
+                else:
+                    time.sleep(delay)
+                continue
+            self._release(throttled=False)
+            return result
+
+    def _acquire(self, priority, tokens):
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket and self._in_flight < max(1, int(self._limit)):
+                        wait = max(
+                            self._paused_until - time.monotonic(),
+                            self._requests.delay(1),
+                            self._tokens.delay(tokens)
+                        )
+                        if wait <= 0:
+                            heapq.heappop(self._waiting)
+                            self._requests.take(1)
+                            self._tokens.take(tokens)
+                            self._in_flight += 1
+                            self._cond.notify_all()
+                            return
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+    def _release(self, throttled):
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._limit = max(1.0, self._limit / 2)
+            else:
+                self._limit = min(float(self.max_in_flight), self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    def stats(self):
+        """
+        Retourne l'état courant de l'ordonnanceur.
+        """
+        with self._cond:
+            return {
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiting),
+                'concurrency_limit': int(self._limit)
+            }
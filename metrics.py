@@ -0,0 +1,330 @@
+"""
+Métriques de l'Analyseur de Réponses Ouvertes.
+
+Compteurs, jauges et histogrammes en mémoire, avec étiquettes, exposés au
+format texte de Prometheus (route /metrics). Les mesures sont désactivables
+avec METRICS_ENABLED=0 : chaque opération se réduit alors à un test.
+
+Sous un serveur à plusieurs workers (serve.py), chaque worker tient ses
+propres valeurs. Avec METRICS_MULTIPROC_DIR (renseigné par serve.py), chaque
+worker écrit régulièrement ses valeurs dans ce répertoire partagé (un fichier
+par pid, toutes les METRICS_FLUSH_SECONDS secondes et à l'arrêt), et /metrics
+retourne la somme de tous les workers, quel que soit celui qui traite la
+requête. Les compteurs et histogrammes des workers arrêtés restent comptés ;
+les jauges ne portent que sur les workers en vie. Avec METRICS_PROCESS_LABEL=1,
+les séries ne sont pas sommées mais portent l'étiquette pid de leur worker.
+"""
+
+import os
+import json
+import time
+import atexit
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+METRICS_PROCESS_LABEL = os.environ.get("METRICS_PROCESS_LABEL", "0") == "1"
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR") or None
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+# Bornes par défaut des histogrammes de durée, en secondes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def snapshot(self):
+        """
+        Retourne une copie des valeurs, par combinaison d'étiquettes.
+        """
+        with self._lock:
+            return list(self._values.items())
+
+    @staticmethod
+    def merge(first, second):
+        return first + second
+
+    def render(self, samples=None):
+        """
+        Lignes au format de Prometheus.
+
+        Args:
+            samples (list): Triplets (étiquettes, valeur, étiquettes supplémentaires) ;
+                par défaut, les valeurs du processus
+        """
+        if samples is None:
+            extra = tuple(self.registry.constant_labels())
+            samples = [(key, value, extra) for key, value in self.snapshot()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value, extra in sorted(samples, key=lambda sample: (sample[0], sample[2])):
+            lines.extend(self._render_sample(key, value, extra))
+        return lines
+
+    def _render_sample(self, key, value, extra=()):
+        return [f"{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    """
+    Compteur croissant, par combinaison d'étiquettes.
+    """
+
+    kind = 'counter'
+
+    def inc(self, value=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(_Metric):
+    """
+    Valeur instantanée, par combinaison d'étiquettes.
+    """
+
+    kind = 'gauge'
+
+    def inc(self, value=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def dec(self, value=1, **labels):
+        self.inc(-value, **labels)
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """
+    Distribution des valeurs observées, par tranches cumulées.
+
+    Args:
+        buckets (tuple): Bornes supérieures des tranches, croissantes
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Mesure la durée du bloc, en secondes (span).
+        """
+        if not self.registry.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return [(key, [list(state[0]), state[1], state[2]]) for key, state in self._values.items()]
+
+    @staticmethod
+    def merge(first, second):
+        return [[a + b for a, b in zip(first[0], second[0])], first[1] + second[1], first[2] + second[2]]
+
+    def _render_sample(self, key, state, extra=()):
+        counts, total, count = state
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, [*extra, ('le', _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key, extra)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Ensemble des métriques déclarées par l'application.
+
+    Args:
+        enabled (bool): Active l'enregistrement des mesures
+        process_label (bool): Ajoute l'étiquette pid du processus à chaque série
+        multiprocess_dir (str): Répertoire partagé par les processus du serveur, dont
+            les valeurs sont additionnées au rendu (None : valeurs du seul processus)
+        flush_seconds (float): Intervalle d'écriture des valeurs dans multiprocess_dir
+    """
+
+    def __init__(self, enabled=True, process_label=False, multiprocess_dir=None, flush_seconds=5):
+        self.enabled = enabled
+        self.process_label = process_label
+        self.multiprocess_dir = multiprocess_dir
+        self.flush_seconds = flush_seconds
+        self._metrics = []
+        self._flusher_pid = None
+        self._flusher_lock = threading.Lock()
+        if enabled and multiprocess_dir:
+            os.makedirs(multiprocess_dir, exist_ok=True)
+            self._start_flusher()
+            atexit.register(self.flush)
+
+    def constant_labels(self):
+        # Lu au rendu : le pid est celui du worker, après le fork
+        return [('pid', os.getpid())] if self.process_label else []
+
+    def _start_flusher(self):
+        # Un thread d'écriture par processus (relancé dans un processus issu d'un fork)
+        with self._flusher_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def flush_periodically():
+            while True:
+                time.sleep(self.flush_seconds)
+                self.flush()
+
+        threading.Thread(target=flush_periodically, name='metrics-flush', daemon=True).start()
+
+    def flush(self):
+        """
+        Écrit les valeurs du processus dans le répertoire partagé.
+        """
+        if not self.multiprocess_dir:
+            return
+        data = {metric.name: [[list(key), value] for key, value in metric.snapshot()] for metric in self._metrics}
+        path = os.path.join(self.multiprocess_dir, f"{os.getpid()}.json")
+        try:
+            # Écriture atomique : les autres processus ne lisent jamais un fichier incomplet
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            logger.warning(f"Écriture des métriques impossible ({path}): {e}")
+
+    def _collect(self):
+        # Valeurs de tous les processus : {nom: {(étiquettes, étiquettes supplémentaires): valeur}}
+        self._start_flusher()
+        self.flush()
+        merged = {metric.name: {} for metric in self._metrics}
+        kinds = {metric.name: metric for metric in self._metrics}
+        for filename in sorted(os.listdir(self.multiprocess_dir)):
+            pid, extension = os.path.splitext(filename)
+            if extension != '.json' or not pid.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.multiprocess_dir, filename), encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = int(pid) == os.getpid() or _pid_alive(int(pid))
+            extra = (('pid', pid),) if self.process_label else ()
+            for name, samples in data.items():
+                metric = kinds.get(name)
+                if metric is None or (metric.kind == 'gauge' and not alive):
+                    continue
+                values = merged[name]
+                for key, value in samples:
+                    sample = (tuple(key), extra)
+                    values[sample] = metric.merge(values[sample], value) if sample in values else value
+        return merged
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def render(self):
+        """
+        Retourne toutes les métriques au format texte de Prometheus.
+        """
+        lines = []
+        if self.multiprocess_dir:
+            merged = self._collect()
+            for metric in self._metrics:
+                lines.extend(metric.render([(key, value, extra) for (key, extra), value in merged[metric.name].items()]))
+        else:
+            for metric in self._metrics:
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry(
+    enabled=METRICS_ENABLED, process_label=METRICS_PROCESS_LABEL,
+    multiprocess_dir=METRICS_MULTIPROC_DIR, flush_seconds=METRICS_FLUSH_SECONDS
+)
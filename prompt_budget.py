@@ -0,0 +1,154 @@
+"""
+Budget de tokens des prompts pour l'Analyseur de Réponses Ouvertes.
+
+Les tokens sont estimés localement (environ 4 caractères par token). Pour les
+synthèses, les réponses d'un tag sont dédoublonnées, les réponses trop longues
+tronquées, puis un échantillon représentatif est choisi dans la limite du
+budget : les réponses les plus fréquentes d'abord, puis un tirage déterministe
+(même tag, même échantillon) parmi les autres.
+"""
+
+import random
+
+from dedup import normalize_response
+
+# Nombre moyen de caractères par token
+CHARS_PER_TOKEN = 4
+
+# Tokens ajoutés par la numérotation d'une réponse dans le prompt
+ITEM_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    """
+    Estime localement le nombre de tokens d'un texte.
+
+    Approximation d'environ 4 caractères par token, suffisante pour
+    dimensionner les lots sans appeler de tokenizer.
+
+    Args:
+        text (str): Texte à évaluer
+
+    Returns:
+        int: Nombre de tokens estimé
+    """
+    return len(str(text)) // CHARS_PER_TOKEN + 1
+
+
+def truncate_to_tokens(text, max_tokens):
+    """
+    Tronque un texte à environ max_tokens tokens, sur une fin de mot.
+
+    Args:
+        text (str): Texte à tronquer
+        max_tokens (int): Nombre maximum de tokens
+
+    Returns:
+        str: Texte, suivi de « … » s'il a été tronqué
+    """
+    text = str(text)
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(' ')
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut.rstrip() + '…'
+
+
+def deduplicate_responses(responses, max_tokens=None):
+    """
+    Regroupe les réponses identiques (à la casse, aux accents, à la ponctuation et aux espaces près).
+
+    Les réponses vides sont ignorées.
+
+    Args:
+        responses (list): Réponses à regrouper
+        max_tokens (int): Taille maximale d'une réponse, au-delà de laquelle elle est tronquée
+
+    Returns:
+        list: Tuples (texte, nombre d'occurrences), dans l'ordre de première apparition
+    """
+    counts = {}
+    texts = {}
+    for response in responses:
+        text = ' '.join(str(response).split())
+        if not text:
+            continue
+        key = normalize_response(text) or text.casefold()
+        if key not in counts:
+            counts[key] = 0
+            texts[key] = truncate_to_tokens(text, max_tokens) if max_tokens else text
+        counts[key] += 1
+    return [(texts[key], count) for key, count in counts.items()]
+
+
+def item_tokens(item):
+    """
+    Tokens occupés dans le prompt par une réponse (texte, nombre d'occurrences).
+    """
+    return estimate_tokens(item[0]) + ITEM_OVERHEAD_TOKENS
+
+
+def sample_within_budget(items, budget, seed=None):
+    """
+    Choisit un échantillon représentatif de réponses dans la limite du budget.
+
+    Les réponses les plus fréquentes sont retenues en priorité ; à fréquence
+    égale, l'ordre est tiré au hasard avec la graine fournie, ce qui rend
+    l'échantillon reproductible.
+
+    Args:
+        items (list): Tuples (texte, nombre d'occurrences)
+        budget (int): Nombre maximum de tokens de l'échantillon
+        seed: Graine du tirage (par exemple le nom du tag)
+
+    Returns:
+        list: Tuples retenus, dans leur ordre d'origine
+    """
+    costs = [item_tokens(item) for item in items]
+    if sum(costs) <= budget:
+        return list(items)
+
+    order = list(range(len(items)))
+    random.Random(seed).shuffle(order)
+    order.sort(key=lambda index: -items[index][1])
+
+    chosen = []
+    used = 0
+    for index in order:
+        if used + costs[index] > budget:
+            continue
+        chosen.append(index)
+        used += costs[index]
+        if budget - used <= ITEM_OVERHEAD_TOKENS:
+            break
+    return [items[index] for index in sorted(chosen)]
+
+
+def split_within_budget(items, budget):
+    """
+    Découpe des réponses en parties consécutives d'au plus budget tokens.
+
+    Args:
+        items (list): Tuples (texte, nombre d'occurrences)
+        budget (int): Nombre maximum de tokens par partie
+
+    Returns:
+        list: Parties (listes de tuples)
+    """
+    parts = []
+    current = []
+    used = 0
+    for item in items:
+        cost = item_tokens(item)
+        if current and used + cost > budget:
+            parts.append(current)
+            current = []
+            used = 0
+        current.append(item)
+        used += cost
+    if current:
+        parts.append(current)
+    return parts
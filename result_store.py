@@ -0,0 +1,365 @@
+"""
+Stockage des résultats d'analyse pour l'Analyseur de Réponses Ouvertes.
+
+Les résultats de chaque analyse sont enregistrés dans une base SQLite locale,
+afin d'être consultés page par page plutôt que renvoyés en un seul bloc :
+- les lignes (id, réponse, tags originaux et normalisés), indexées par numéro de ligne et par id ;
+- l'association tag normalisé -> lignes, indexée par tag pour filtrer et compter ;
+- les tags normalisés avec leurs tags originaux et leur synthèse ;
+- un index plein texte (FTS5) des réponses, si SQLite le permet.
+La matrice d'incidence réponses × tags (incidence.py) est reconstruite à la
+demande à partir de l'association tag normalisé -> lignes.
+Seules les RESULT_STORE_MAX_ANALYSES analyses les plus récentes sont conservées.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+
+from incidence import TagIncidence
+
+logger = logging.getLogger(__name__)
+
+# Taille maximale d'une page de réponses
+MAX_PAGE_SIZE = 500
+
+# Nombre de matrices d'incidence gardées en mémoire
+INCIDENCE_CACHE_SIZE = 4
+
+
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def encode_rows(analysis_id, rows):
+    """
+    Prépare les lignes de résultats à insérer dans la table result_rows.
+
+    Fonction de module sans état partagé : elle peut être exécutée dans un
+    processus du pool de calcul (voir cpu_pool.CPUPool).
+
+    Args:
+        analysis_id (str): Identifiant de l'analyse
+        rows (list): Tuples (numéro de ligne, id, réponse, tags originaux, tags normalisés)
+
+    Returns:
+        list: Tuples prêts à insérer, tags encodés en JSON
+    """
+    return [
+        (analysis_id, row, int(row_id), str(response), _encode_json(original_tags), _encode_json(normalized_tags))
+        for row, row_id, response, original_tags, normalized_tags in rows
+    ]
+
+
+def _fts_query(text):
+    # Chaque mot est cherché comme préfixe ; les guillemets neutralisent la syntaxe de FTS5
+    words = [word.replace('"', '""') for word in str(text).split()]
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class ResultStore:
+    """
+    Stockage SQLite des résultats d'analyse, consultables par page.
+
+    Args:
+        path (str): Chemin de la base SQLite
+        max_analyses (int): Nombre d'analyses conservées (les plus anciennes sont supprimées)
+        map_batches (callable): Fonction map_batches(func, éléments, *args) qui répartit
+            l'encodage des lignes par lots (par exemple CPUPool.map_batches)
+    """
+
+    def __init__(self, path, max_analyses=20, map_batches=None):
+        self.path = path
+        self.max_analyses = max_analyses
+        self._map_batches = map_batches or (lambda func, items, *args: func(*args, items))
+        self._lock = threading.Lock()
+        self._incidences = OrderedDict()  # matrices d'incidence récemment consultées (les analyses ne changent pas)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    id TEXT PRIMARY KEY,
+                    created_at REAL NOT NULL,
+                    responses INTEGER NOT NULL,
+                    tags INTEGER NOT NULL,
+                    dataset TEXT
+                );
+                CREATE TABLE IF NOT EXISTS result_rows (
+                    analysis_id TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    id INTEGER NOT NULL,
+                    response TEXT NOT NULL,
+                    original_tags TEXT NOT NULL,
+                    normalized_tags TEXT NOT NULL,
+                    PRIMARY KEY (analysis_id, row)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS result_rows_id ON result_rows (analysis_id, id);
+                CREATE TABLE IF NOT EXISTS result_row_tags (
+                    analysis_id TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    PRIMARY KEY (analysis_id, tag, row)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS result_tags (
+                    analysis_id TEXT NOT NULL,
+                    tag TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    originals TEXT NOT NULL,
+                    summary TEXT,
+                    PRIMARY KEY (analysis_id, tag)
+                ) WITHOUT ROWID;
+            """)
+            try:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS result_rows_fts USING fts5(
+                        response, analysis_id UNINDEXED, row UNINDEXED,
+                        tokenize = 'unicode61 remove_diacritics 2'
+                    )
+                """)
+                self.full_text = True
+            except sqlite3.OperationalError:
+                # SQLite compilé sans FTS5 : la recherche se fait par LIKE
+                logger.warning("FTS5 indisponible, la recherche dans les réponses se fera sans index plein texte")
+                self.full_text = False
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, ids, responses, response_tags, normalized_response_tags, tag_mapping, tag_summaries, dataset=None):
+        """
+        Enregistre les résultats d'une analyse.
+
+        Args:
+            ids (list): Identifiants des réponses
+            responses (list): Textes des réponses
+            response_tags (list): Tags extraits par réponse (response_id, tags)
+            normalized_response_tags (list): Tags normalisés par réponse (response_id, normalized_tags)
+            tag_mapping (dict): Tag normalisé -> tags originaux
+            tag_summaries (dict): Synthèses par tag normalisé
+            dataset (str): Nom du jeu de données (analyse incrémentale)
+
+        Returns:
+            str: Identifiant de l'analyse
+        """
+        analysis_id = uuid.uuid4().hex
+        original_by_row = {}
+        for item in response_tags:
+            original_by_row.setdefault(item.get('response_id'), item.get('tags', []))
+        normalized_by_row = {}
+        for item in normalized_response_tags:
+            normalized_by_row.setdefault(item.get('response_id'), item.get('normalized_tags', []))
+
+        counts = {}
+        for tags in normalized_by_row.values():
+            for tag in set(tags):
+                counts[tag] = counts.get(tag, 0) + 1
+
+        encoded_rows = self._map_batches(encode_rows, [
+            (row, row_id, response, original_by_row.get(row, []), normalized_by_row.get(row, []))
+            for row, (row_id, response) in enumerate(zip(ids, responses), start=1)
+        ], analysis_id)
+
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO analyses (id, created_at, responses, tags, dataset) VALUES (?, ?, ?, ?, ?)",
+                (analysis_id, time.time(), len(responses), len(counts), dataset)
+            )
+            conn.executemany(
+                "INSERT INTO result_rows (analysis_id, row, id, response, original_tags, normalized_tags) VALUES (?, ?, ?, ?, ?, ?)",
+                encoded_rows
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO result_row_tags (analysis_id, tag, row) VALUES (?, ?, ?)",
+                ((analysis_id, tag, row) for row, tags in normalized_by_row.items() for tag in tags)
+            )
+            conn.executemany(
+                "INSERT INTO result_tags (analysis_id, tag, count, originals, summary) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (analysis_id, tag, counts.get(tag, 0),
+                     json.dumps(tag_mapping.get(tag, []), ensure_ascii=False),
+                     json.dumps(tag_summaries[tag], ensure_ascii=False) if tag in tag_summaries else None)
+                    for tag in set(tag_mapping) | set(counts)
+                )
+            )
+            if self.full_text:
+                conn.executemany(
+                    "INSERT INTO result_rows_fts (response, analysis_id, row) VALUES (?, ?, ?)",
+                    ((str(response), analysis_id, row) for row, response in enumerate(responses, start=1))
+                )
+            self._prune(conn)
+
+        logger.info(f"Résultats de l'analyse {analysis_id} enregistrés ({len(responses)} réponses, {len(counts)} tags)")
+        return analysis_id
+
+    def _prune(self, conn):
+        expired = [row[0] for row in conn.execute(
+            "SELECT id FROM analyses ORDER BY created_at DESC LIMIT -1 OFFSET ?", (self.max_analyses,)
+        )]
+        for analysis_id in expired:
+            for table in ('result_rows', 'result_row_tags', 'result_tags'):
+                conn.execute(f"DELETE FROM {table} WHERE analysis_id = ?", (analysis_id,))
+            if self.full_text:
+                conn.execute("DELETE FROM result_rows_fts WHERE analysis_id = ?", (analysis_id,))
+            conn.execute("DELETE FROM analyses WHERE id = ?", (analysis_id,))
+
+    def get(self, analysis_id):
+        """
+        Retourne les informations générales d'une analyse, ou None si elle est inconnue.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, created_at, responses, tags, dataset FROM analyses WHERE id = ?", (analysis_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('id', 'created_at', 'responses', 'tags', 'dataset'), row))
+
+    def tag_counts(self, analysis_id):
+        """
+        Retourne les tags normalisés d'une analyse, du plus fréquent au moins fréquent.
+
+        Returns:
+            list: Dictionnaires (tag, count, originals, has_summary)
+        """
+        with self._connect() as conn:
+            return [
+                {'tag': tag, 'count': count, 'originals': json.loads(originals), 'has_summary': has_summary}
+                for tag, count, originals, has_summary in conn.execute(
+                    "SELECT tag, count, originals, summary IS NOT NULL FROM result_tags "
+                    "WHERE analysis_id = ? ORDER BY count DESC, tag",
+                    (analysis_id,)
+                )
+            ]
+
+    def incidence(self, analysis_id):
+        """
+        Retourne la matrice d'incidence réponses × tags normalisés d'une analyse.
+
+        Returns:
+            TagIncidence: Matrice d'incidence (lignes numérotées à partir de 0),
+                colonnes du tag le plus fréquent au moins fréquent
+        """
+        with self._lock:
+            if analysis_id in self._incidences:
+                self._incidences.move_to_end(analysis_id)
+                return self._incidences[analysis_id]
+
+        with self._connect() as conn:
+            n_rows = conn.execute("SELECT responses FROM analyses WHERE id = ?", (analysis_id,)).fetchone()[0]
+            tags = [tag for tag, in conn.execute(
+                "SELECT tag FROM result_tags WHERE analysis_id = ? AND count > 0 ORDER BY count DESC, tag", (analysis_id,)
+            )]
+            columns = {tag: column for column, tag in enumerate(tags)}
+            pairs = conn.execute("SELECT row, tag FROM result_row_tags WHERE analysis_id = ?", (analysis_id,)).fetchall()
+        incidence = TagIncidence.from_pairs(
+            [row - 1 for row, _ in pairs], [columns[tag] for _, tag in pairs], tags, n_rows
+        )
+
+        with self._lock:
+            self._incidences[analysis_id] = incidence
+            while len(self._incidences) > INCIDENCE_CACHE_SIZE:
+                self._incidences.popitem(last=False)
+        return incidence
+
+    def columns(self, analysis_id):
+        """
+        Retourne les colonnes des réponses d'une analyse, dans l'ordre des lignes.
+
+        Returns:
+            dict: Listes 'id', 'response' et 'original_tags'
+        """
+        columns = {'id': [], 'response': [], 'original_tags': []}
+        with self._connect() as conn:
+            for row_id, response, original_tags in conn.execute(
+                "SELECT id, response, original_tags FROM result_rows WHERE analysis_id = ? ORDER BY row", (analysis_id,)
+            ):
+                columns['id'].append(row_id)
+                columns['response'].append(response)
+                columns['original_tags'].append(json.loads(original_tags))
+        return columns
+
+    def tag_mapping(self, analysis_id):
+        """
+        Retourne les tags originaux de chaque tag normalisé d'une analyse.
+        """
+        with self._connect() as conn:
+            return {tag: json.loads(originals) for tag, originals in conn.execute(
+                "SELECT tag, originals FROM result_tags WHERE analysis_id = ? ORDER BY count DESC, tag", (analysis_id,)
+            )}
+
+    def summaries(self, analysis_id, tags=None):
+        """
+        Retourne les synthèses d'une analyse (toutes, ou celles des tags demandés).
+
+        Returns:
+            dict: Synthèse par tag normalisé
+        """
+        query = "SELECT tag, summary FROM result_tags WHERE analysis_id = ? AND summary IS NOT NULL"
+        params = [analysis_id]
+        if tags:
+            query += f" AND tag IN ({','.join('?' * len(tags))})"
+            params.extend(tags)
+        with self._connect() as conn:
+            return {tag: json.loads(summary) for tag, summary in conn.execute(query + " ORDER BY count DESC, tag", params)}
+
+    def responses(self, analysis_id, tag=None, search=None, offset=0, limit=50):
+        """
+        Retourne une page de réponses, éventuellement filtrée.
+
+        Args:
+            analysis_id (str): Identifiant de l'analyse
+            tag (str): Ne retenir que les réponses portant ce tag normalisé
+            search (str): Ne retenir que les réponses contenant ces mots (début de mot, sans accents)
+            offset (int): Nombre de réponses à sauter
+            limit (int): Nombre maximum de réponses retournées (au plus MAX_PAGE_SIZE)
+
+        Returns:
+            dict: 'total' (nombre de réponses retenues), 'offset', 'limit' et 'items'
+                (row, id, response, original_tags, normalized_tags)
+        """
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        joins = []
+        conditions = ["r.analysis_id = ?"]
+        params = [analysis_id]
+        if tag is not None:
+            joins.append("JOIN result_row_tags t ON t.analysis_id = r.analysis_id AND t.row = r.row AND t.tag = ?")
+            params.insert(0, tag)
+        if search and search.strip():
+            if self.full_text:
+                conditions.append(
+                    "r.row IN (SELECT row FROM result_rows_fts WHERE result_rows_fts MATCH ? AND analysis_id = ?)"
+                )
+                params.extend([_fts_query(search), analysis_id])
+            else:
+                conditions.append("r.response LIKE ?")
+                params.append(f"%{search.strip()}%")
+
+        where = f"FROM result_rows r {' '.join(joins)} WHERE {' AND '.join(conditions)}"
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT r.row, r.id, r.response, r.original_tags, r.normalized_tags {where} ORDER BY r.row LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+
+        return {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'items': [
+                {'row': row, 'id': row_id, 'response': response,
+                 'original_tags': json.loads(original_tags), 'normalized_tags': json.loads(normalized_tags)}
+                for row, row_id, response, original_tags, normalized_tags in rows
+            ]
+        }
@@ -0,0 +1,113 @@
+"""
+Serveur de production pour l'Analyseur de Réponses Ouvertes.
+
+Lance l'application avec gunicorn sur plusieurs processus (workers), chacun
+servant les requêtes sur plusieurs threads : les analyses simultanées ne se
+disputent plus un seul GIL. L'application est chargée séparément dans chaque
+worker, qui possède donc son propre ordonnanceur des appels au LLM et ses
+propres connexions SQLite ; les limites de débit et de concurrence du LLM
+sont réparties entre les workers pour que leur somme reste celle configurée.
+Les workers écrivent leurs métriques dans un répertoire partagé
+(METRICS_MULTIPROC_DIR, temporaire par défaut) : /metrics retourne la somme de
+tous les workers. /cache/stats reste propre au worker qui traite la requête.
+
+Usage:
+    pip install gunicorn
+    python serve.py [--bind 0.0.0.0:8000] [--workers 4] [--threads 8] [--timeout 600]
+"""
+
+import os
+import glob
+import argparse
+import logging
+import tempfile
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# Variables d'environnement dont la valeur est une limite globale, répartie entre les workers
+SHARED_LIMITS = {
+    'MISTRAL_MAX_IN_FLIGHT': '8',
+    'LLM_REQUESTS_PER_MINUTE': '0',
+    'LLM_TOKENS_PER_MINUTE': '0',
+}
+
+
+def split_limits(workers):
+    """
+    Répartit les limites globales du LLM entre les workers, avant le chargement de l'application.
+
+    Args:
+        workers (int): Nombre de processus du serveur
+    """
+    for name, default in SHARED_LIMITS.items():
+        value = float(os.environ.get(name, default))
+        if value:
+            share = value / workers
+            os.environ[name] = str(max(1, int(share))) if name == 'MISTRAL_MAX_IN_FLIGHT' else str(share)
+
+    # Les cœurs sont partagés entre les workers et leurs pools de calcul
+    if 'CPU_POOL_WORKERS' not in os.environ:
+        os.environ['CPU_POOL_WORKERS'] = str(max(1, (os.cpu_count() or 1) // workers))
+
+
+def prepare_metrics_directory():
+    """
+    Prépare le répertoire où les workers écrivent leurs métriques, avant leur démarrage.
+
+    Returns:
+        str: Chemin du répertoire, vidé des valeurs d'une exécution précédente
+    """
+    directory = os.environ.get('METRICS_MULTIPROC_DIR') or tempfile.mkdtemp(prefix='analyzer-metrics-')
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        os.remove(path)
+    os.environ['METRICS_MULTIPROC_DIR'] = directory
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serveur de production de l'Analyseur de Réponses Ouvertes")
+    parser.add_argument('--bind', default=os.environ.get('WEB_BIND', '0.0.0.0:8000'))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', str(min(4, os.cpu_count() or 1)))))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', '8')), help="Threads par worker")
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('WEB_TIMEOUT', '600')),
+                        help="Durée maximum d'une requête, en secondes")
+    args = parser.parse_args()
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("Le serveur de production nécessite le paquet gunicorn (pip install gunicorn)")
+
+    load_dotenv()
+    workers = max(1, args.workers)
+    split_limits(workers)
+    # Les métriques de chaque worker sont additionnées par /metrics, quel que soit le worker interrogé
+    metrics_directory = prepare_metrics_directory()
+
+    class AnalyzerApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', args.bind)
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', max(1, args.threads))
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', args.timeout)
+            # Pas de préchargement : chaque worker crée ses threads et ses connexions après le fork
+            self.cfg.set('preload_app', False)
+
+        def load(self):
+            from app import app, job_manager
+            # Chaque worker exécute les tâches en attente, y compris celles interrompues par un arrêt
+            job_manager.start()
+            return app
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info(f"Démarrage sur {args.bind} avec {workers} workers de {args.threads} threads")
+    logger.info(f"Métriques des workers dans {metrics_directory}")
+    AnalyzerApplication().run()
+
+
+if __name__ == '__main__':
+    main()
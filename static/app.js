@@ -91,43 +91,12 @@ function displayResults(data) {
     // Afficher les données brutes
     const dataTable = getElement('dataTable');
     if (dataTable) {
+        resetDataTable();
         const tbody = dataTable.querySelector('tbody');
         if (tbody) {
-            tbody.innerHTML = '';
-            
-            data.results.forEach(item => {
-                const row = document.createElement('tr');
-                
-                // ID
-                const idCell = document.createElement('td');
-                idCell.textContent = item.id;
-                row.appendChild(idCell);
-                
-                // Réponse
-                const responseCell = document.createElement('td');
-                responseCell.textContent = item.response;
-                row.appendChild(responseCell);
-                
-                // Tags originaux (colonne séparée)
-                const originalTagsCell = document.createElement('td');
-                if (item.original_tags && item.original_tags.length > 0) {
-                    originalTagsCell.innerHTML = formatTags(item.original_tags, 'bg-secondary');
-                } else {
-                    originalTagsCell.innerHTML = '<span class="text-muted">Aucun tag</span>';
-                }
-                row.appendChild(originalTagsCell);
-                
-                // Tags normalisés (colonne séparée)
-                const normalizedTagsCell = document.createElement('td');
-                if (item.normalized_tags && item.normalized_tags.length > 0) {
-                    normalizedTagsCell.innerHTML = formatTags(item.normalized_tags, 'bg-primary');
-                } else {
-                    normalizedTagsCell.innerHTML = '<span class="text-muted">Aucun tag</span>';
-                }
-                row.appendChild(normalizedTagsCell);
-                
-                tbody.appendChild(row);
-            });
+            const fragment = document.createDocumentFragment();
+            data.results.forEach(item => fragment.appendChild(createDataRow(item)));
+            tbody.appendChild(fragment);
         }
         
         // Masquer le message "pas de données" et afficher le tableau
@@ -137,6 +106,42 @@ function displayResults(data) {
     }
 }
 
+// Créer une ligne du tableau des données
+function createDataRow(item) {
+    const row = document.createElement('tr');
+    
+    // ID
+    const idCell = document.createElement('td');
+    idCell.textContent = item.id;
+    row.appendChild(idCell);
+    
+    // Réponse
+    const responseCell = document.createElement('td');
+    responseCell.textContent = item.response;
+    row.appendChild(responseCell);
+    
+    // Tags originaux (colonne séparée)
+    const originalTagsCell = document.createElement('td');
+    fillTagsCell(originalTagsCell, item.original_tags, 'bg-secondary');
+    row.appendChild(originalTagsCell);
+    
+    // Tags normalisés (colonne séparée)
+    const normalizedTagsCell = document.createElement('td');
+    fillTagsCell(normalizedTagsCell, item.normalized_tags, 'bg-primary');
+    row.appendChild(normalizedTagsCell);
+    
+    return row;
+}
+
+// Remplir une cellule avec des tags, ou « Aucun tag »
+function fillTagsCell(cell, tags, bgClass) {
+    if (tags && tags.length > 0) {
+        cell.innerHTML = formatTags(tags, bgClass);
+    } else {
+        cell.innerHTML = '<span class="text-muted">Aucun tag</span>';
+    }
+}
+
 // Fonction pour afficher une alerte
 function showAlert(message, type = 'info') {
     // Créer l'élément d'alerte
@@ -313,18 +318,6 @@ function formatTagSummaries(tagSummaries) {
 // Fonction pour afficher les tags à partir des résultats
 function displayTagsFromResults(results, tagMapping = null, tagSummaries = null) {
     console.log("Affichage des tags à partir des résultats:", results);
-    console.log("Mapping des tags:", tagMapping);
-    
-    // Récupérer le conteneur des tags
-    const tagsContent = getElement('tagsContent');
-    if (!tagsContent) {
-        console.error("Conteneur des tags non trouvé");
-        return;
-    }
-    
-    // Masquer le message "pas de tags"
-    const noTagsContent = getElement('noTagsContent');
-    if (noTagsContent) noTagsContent.style.display = 'none';
     
     // Collecter tous les tags normalisés et leur fréquence
     const tagFrequency = {};
@@ -344,6 +337,24 @@ function displayTagsFromResults(results, tagMapping = null, tagSummaries = null)
         .sort((a, b) => b[1] - a[1])
         .map(([tag, count]) => ({ tag, count }));
     
+    displayTagCounts(sortedTags, totalResponses, tagMapping);
+}
+
+// Fonction pour afficher les tags à partir de leur nombre de réponses (triés par fréquence)
+function displayTagCounts(sortedTags, totalResponses, tagMapping = null) {
+    console.log("Mapping des tags:", tagMapping);
+    
+    // Récupérer le conteneur des tags
+    const tagsContent = getElement('tagsContent');
+    if (!tagsContent) {
+        console.error("Conteneur des tags non trouvé");
+        return;
+    }
+    
+    // Masquer le message "pas de tags"
+    const noTagsContent = getElement('noTagsContent');
+    if (noTagsContent) noTagsContent.style.display = 'none';
+    
     // Calculer les pourcentages
     sortedTags.forEach(item => {
         item.percentage = Math.round((item.count / totalResponses) * 100);
@@ -495,13 +506,387 @@ function displaySynthesesFromResults(tagSummaries) {
 
 // Fonction pour afficher l'onglet de synthèse
 function showSynthesisTab() {
-    const synthesisTab = document.getElementById('synthesis-tab');
-    if (synthesisTab) {
-        const tabInstance = new bootstrap.Tab(synthesisTab);
+    showTab('synthesis-tab');
+}
+
+// Afficher un onglet à partir de l'ID de son bouton
+function showTab(tabId) {
+    const tab = document.getElementById(tabId);
+    if (tab) {
+        const tabInstance = bootstrap.Tab.getOrCreateInstance(tab);
         tabInstance.show();
     }
 }
 
+// Libellés des étapes du pipeline d'analyse
+const STAGE_LABELS = {
+    extraction: "Extraction des tags",
+    collecte: "Collecte des tags uniques",
+    normalisation: "Normalisation des tags",
+    reattribution: "Réattribution des tags normalisés",
+    syntheses: "Génération des synthèses"
+};
+
+// Construire le message de progression d'une analyse en flux
+function formatStreamProgress(event) {
+    const label = STAGE_LABELS[event.stage] || "Analyse en cours";
+    const counter = event.total ? ` (${event.done}/${event.total})` : '';
+    return `${label}${counter}...`;
+}
+
+// Intervalle entre deux interrogations de l'état d'une tâche (ms)
+const JOB_POLL_INTERVAL = 1000;
+
+// Taille à partir de laquelle un fichier est analysé en tâche de fond (octets) :
+// la tâche survit à une déconnexion et à un redémarrage du serveur
+const JOB_UPLOAD_MIN_BYTES = 20 * 1024 * 1024;
+
+// Construire le message de progression d'une tâche
+function formatJobProgress(job) {
+    if (job.status === 'queued') {
+        return "Analyse en attente de démarrage...";
+    }
+    
+    const stages = job.stages || {};
+    const current = Object.keys(STAGE_LABELS).filter(stage => stages[stage] && stages[stage].status === 'running').pop();
+    if (!current) {
+        return "Analyse en cours...";
+    }
+    return formatStreamProgress({ stage: current, ...stages[current] });
+}
+
+// Attendre la fin d'une tâche en interrogeant régulièrement le serveur
+async function waitForJob(jobId, onProgress) {
+    while (true) {
+        const job = await fetchJson(`/jobs/${jobId}`);
+        if (job.status === 'done') {
+            return job.result;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || "L'analyse a échoué");
+        }
+        
+        if (onProgress) onProgress(job);
+        await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+    }
+}
+
+// Analyser un fichier en tâche de fond et afficher ses résultats enregistrés
+async function runImportJob(formData) {
+    const response = await fetch('/jobs', {
+        method: 'POST',
+        body: formData
+    });
+    
+    const submission = await response.json();
+    if (!response.ok || submission.error) {
+        throw new Error(submission.error || `Erreur HTTP: ${response.status}`);
+    }
+    
+    const data = await waitForJob(submission.job_id, job => showLoading(formatJobProgress(job)));
+    const tagCounts = await fetchJson(`/analyses/${data.analysis_id}/tags`);
+    hideLoading();
+    getElement('loadingTags').classList.add('d-none');
+    getElement('loadingSummaries').classList.add('d-none');
+    displayTagCounts(tagCounts.tags, data.results.length, data.tag_mapping);
+    displaySynthesesFromResults(data.tag_summaries);
+    showStoredResultsTable(data.analysis_id, tagCounts.tags);
+}
+
+// Lire une réponse NDJSON au fil de l'eau et appeler onEvent pour chaque ligne
+async function readNdjsonStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+        
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (line) onEvent(JSON.parse(line));
+        }
+        
+        if (done) break;
+    }
+    
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
+// Nombre maximum de lignes affichées pendant l'analyse en flux (aperçu)
+const STREAM_PREVIEW_ROWS = 200;
+
+// Affichage progressif des résultats d'une analyse en flux :
+// un aperçu du tableau se remplit dès l'extraction des premiers lots,
+// et chaque synthèse est affichée dès qu'elle est reçue
+function createStreamingResultsView() {
+    resetDataTable();
+    const dataTable = getElement('dataTable');
+    const tbody = dataTable.querySelector('tbody');
+    
+    const items = new Map();  // numéro de ligne -> { item, row }, pour les lignes de l'aperçu
+    const chunks = [];  // premier numéro de ligne et première ligne du tableau de chaque paquet, triés
+    const tagSummaries = {};
+    let tagMapping = {};
+    let summariesContainer = null;
+    let receivedRows = 0;
+    let summary = null;
+    
+    // Insérer un paquet de lignes à sa place : les paquets arrivent dans le désordre
+    function addRows(rows) {
+        rows = rows.slice(0, Math.max(0, STREAM_PREVIEW_ROWS - items.size));
+        if (rows.length === 0) return;
+        
+        const fragment = document.createDocumentFragment();
+        rows.forEach(item => {
+            const row = createDataRow(item);
+            items.set(item.row, { item, row });
+            fragment.appendChild(row);
+        });
+        
+        const first = rows[0].row;
+        let index = chunks.findIndex(chunk => chunk.first > first);
+        if (index < 0) index = chunks.length;
+        const firstRow = fragment.firstChild;
+        tbody.insertBefore(fragment, index < chunks.length ? chunks[index].row : null);
+        chunks.splice(index, 0, { first, row: firstRow });
+        
+        getElement('noDataContent').style.display = 'none';
+        dataTable.style.display = 'table';
+    }
+    
+    function setNormalizedTags(rows) {
+        rows.forEach(({ row, normalized_tags }) => {
+            const entry = items.get(row);
+            if (!entry) return;
+            entry.item.normalized_tags = normalized_tags;
+            fillTagsCell(entry.row.cells[3], normalized_tags, 'bg-primary');
+        });
+    }
+    
+    function addSummary(tag, summary) {
+        tagSummaries[tag] = summary;
+        if (!summariesContainer) {
+            getElement('loadingSummaries').classList.add('d-none');
+            displaySynthesesFromResults({});
+            summariesContainer = getElement('synthesisContent').querySelector('.syntheses-container');
+        }
+        summariesContainer.insertAdjacentHTML('beforeend', formatTagSummaries({ [tag]: summary }));
+    }
+    
+    return {
+        handleEvent(event) {
+            switch (event.type) {
+                case 'progress': {
+                    // Le chargement global ne masque la page que jusqu'aux premiers résultats
+                    const message = formatStreamProgress(event);
+                    if (receivedRows === 0) showLoading(message);
+                    const loadingLabel = getElement('loadingTags').querySelector('h5');
+                    if (loadingLabel) loadingLabel.textContent = message;
+                    break;
+                }
+                case 'rows':
+                    if (receivedRows === 0) {
+                        hideLoading();
+                        showTab('data-tab');
+                    }
+                    receivedRows += event.rows.length;
+                    addRows(event.rows);
+                    break;
+                case 'tag_mapping':
+                    tagMapping = event.tag_mapping;
+                    break;
+                case 'normalized':
+                    setNormalizedTags(event.rows);
+                    break;
+                case 'summary':
+                    addSummary(event.tag, event.summary);
+                    break;
+                case 'done':
+                    summary = event;
+                    break;
+                case 'error':
+                    throw new Error(event.error);
+            }
+        },
+        
+        // Afficher les vues qui portent sur l'ensemble des résultats, enregistrés côté serveur
+        async finish() {
+            const loadingLabel = getElement('loadingTags').querySelector('h5');
+            if (loadingLabel) loadingLabel.textContent = "Extraction des tags en cours...";
+            
+            const tagCounts = await fetchJson(`/analyses/${summary.analysis_id}/tags`);
+            getElement('loadingTags').classList.add('d-none');
+            getElement('loadingSummaries').classList.add('d-none');
+            displayTagCounts(tagCounts.tags, summary.responses, tagMapping);
+            displaySynthesesFromResults(tagSummaries);
+            showStoredResultsTable(summary.analysis_id, tagCounts.tags);
+        }
+    };
+}
+
+// Récupérer un document JSON et lever une erreur en cas d'échec
+async function fetchJson(url) {
+    const response = await fetch(url);
+    const data = await response.json();
+    if (!response.ok || data.error) {
+        throw new Error(data.error || `Erreur HTTP: ${response.status}`);
+    }
+    return data;
+}
+
+// Hauteur d'une ligne du tableau des données (px), taille des pages demandées au serveur
+// et nombre de lignes rendues en plus au-dessus et au-dessous de la zone visible
+const VIRTUAL_ROW_HEIGHT = 41;
+const RESULTS_PAGE_SIZE = 200;
+const VIRTUAL_OVERSCAN = 10;
+
+// Tableau des données virtualisé : seules les lignes visibles sont présentes dans le DOM,
+// et les pages de réponses sont demandées au serveur au fil du défilement
+let storedResultsTable = null;
+
+// Revenir à un tableau des données simple et vide
+function resetDataTable() {
+    if (storedResultsTable) {
+        storedResultsTable.destroy();
+        storedResultsTable = null;
+    }
+    const dataTable = getElement('dataTable');
+    dataTable.classList.remove('virtual-table');
+    dataTable.querySelector('tbody').innerHTML = '';
+    getElement('dataFilters').classList.add('d-none');
+}
+
+function showStoredResultsTable(analysisId, tagCounts) {
+    resetDataTable();
+    storedResultsTable = createVirtualResultsTable(analysisId);
+    
+    // Filtres : tag normalisé et recherche dans les réponses
+    const tagFilter = getElement('dataTagFilter');
+    tagFilter.innerHTML = '<option value="">Tous les tags</option>' + tagCounts.map(item =>
+        `<option value="${escapeHtml(item.tag)}">${escapeHtml(item.tag)} (${item.count})</option>`
+    ).join('');
+    getElement('dataSearch').value = '';
+    getElement('dataFilters').classList.remove('d-none');
+    getElement('noDataContent').style.display = 'none';
+    getElement('dataTable').style.display = 'table';
+}
+
+function createVirtualResultsTable(analysisId) {
+    const scroller = getElement('dataScroll');
+    const dataTable = getElement('dataTable');
+    const tbody = dataTable.querySelector('tbody');
+    dataTable.classList.add('virtual-table');
+    
+    let filters = {};
+    let total = 0;
+    let pages = new Map();  // numéro de page -> lignes reçues
+    let pending = new Set();  // pages en cours de chargement
+    let generation = 0;  // incrémenté à chaque changement de filtre, pour ignorer les pages obsolètes
+    let frame = null;
+    
+    async function loadPage(page) {
+        if (pages.has(page) || pending.has(page)) return;
+        pending.add(page);
+        const current = generation;
+        const params = new URLSearchParams({ offset: page * RESULTS_PAGE_SIZE, limit: RESULTS_PAGE_SIZE });
+        if (filters.tag) params.set('tag', filters.tag);
+        if (filters.q) params.set('q', filters.q);
+        try {
+            const data = await fetchJson(`/analyses/${analysisId}/responses?${params}`);
+            if (current !== generation) return;
+            total = data.total;
+            pages.set(page, data.items);
+            scheduleRender();
+        } catch (error) {
+            showAlert(`Erreur lors du chargement des réponses: ${error.message}`, "danger");
+        } finally {
+            if (current === generation) pending.delete(page);
+        }
+    }
+    
+    function spacerRow(height) {
+        const row = document.createElement('tr');
+        row.className = 'virtual-spacer';
+        row.innerHTML = `<td colspan="4" style="height: ${height}px"></td>`;
+        return row;
+    }
+    
+    function render() {
+        frame = null;
+        const visible = Math.ceil(scroller.clientHeight / VIRTUAL_ROW_HEIGHT);
+        // Premier indice pair, pour que l'alternance des couleurs des lignes reste stable au défilement
+        let first = Math.max(0, Math.floor(scroller.scrollTop / VIRTUAL_ROW_HEIGHT) - VIRTUAL_OVERSCAN);
+        first -= first % 2;
+        const last = Math.min(total, first + visible + 2 * VIRTUAL_OVERSCAN);
+        
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(spacerRow(first * VIRTUAL_ROW_HEIGHT));
+        for (let index = first; index < last; index++) {
+            const page = Math.floor(index / RESULTS_PAGE_SIZE);
+            const items = pages.get(page);
+            if (!items) {
+                loadPage(page);
+                const row = document.createElement('tr');
+                row.innerHTML = '<td colspan="4" class="text-muted">Chargement...</td>';
+                fragment.appendChild(row);
+                continue;
+            }
+            const item = items[index - page * RESULTS_PAGE_SIZE];
+            if (item) fragment.appendChild(createDataRow(item));
+        }
+        fragment.appendChild(spacerRow((total - last) * VIRTUAL_ROW_HEIGHT));
+        
+        tbody.innerHTML = '';
+        tbody.appendChild(fragment);
+        getElement('dataCount').textContent = `${total} réponses`;
+    }
+    
+    function scheduleRender() {
+        if (frame === null) frame = requestAnimationFrame(render);
+    }
+    
+    // Recharger le tableau avec de nouveaux filtres
+    async function reset(newFilters) {
+        filters = newFilters;
+        generation++;
+        pages = new Map();
+        pending = new Set();
+        scroller.scrollTop = 0;
+        await loadPage(0);
+        scheduleRender();
+    }
+    
+    let searchTimer = null;
+    const onScroll = () => scheduleRender();
+    const onTagChange = () => reset({ tag: getElement('dataTagFilter').value, q: getElement('dataSearch').value.trim() });
+    const onSearch = () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(onTagChange, 300);
+    };
+    scroller.addEventListener('scroll', onScroll);
+    // La zone visible n'a pas de hauteur tant que l'onglet des données est masqué
+    getElement('data-tab').addEventListener('shown.bs.tab', onScroll);
+    getElement('dataTagFilter').addEventListener('change', onTagChange);
+    getElement('dataSearch').addEventListener('input', onSearch);
+    
+    reset({});
+    
+    return {
+        destroy() {
+            clearTimeout(searchTimer);
+            scroller.removeEventListener('scroll', onScroll);
+            getElement('data-tab').removeEventListener('shown.bs.tab', onScroll);
+            getElement('dataTagFilter').removeEventListener('change', onTagChange);
+            getElement('dataSearch').removeEventListener('input', onSearch);
+            generation++;
+        }
+    };
+}
+
 // Fonction pour tester le workflow avec un fichier CSV importé
 async function importAndTestWorkflow() {
     console.log("Importation et test du workflow avec un fichier CSV");
@@ -554,33 +939,45 @@ async function importAndTestWorkflow() {
         const formData = new FormData();
         formData.append('file', file);
         
-        // Appeler l'API pour importer et tester le workflow
-        const response = await fetch('/import_and_test', {
-            method: 'POST',
-            body: formData
-        });
-        
-        if (!response.ok) {
-            throw new Error(`Erreur HTTP: ${response.status}`);
+        // Analyse incrémentale : le jeu de données est identifié par le nom du fichier
+        const incrementalCheck = getElement('incrementalCheck');
+        if (incrementalCheck && incrementalCheck.checked) {
+            formData.append('incremental', '1');
+            formData.append('dataset', file.name);
         }
         
-        const data = await response.json();
-        console.log("Données reçues:", data);
-        
-        if (data.error) {
-            throw new Error(data.error);
+        if (file.size >= JOB_UPLOAD_MIN_BYTES) {
+            // Gros fichier : tâche de fond suivie par interrogation
+            await runImportJob(formData);
+        } else {
+            // Les résultats sont reçus et affichés au fil de l'analyse
+            const response = await fetch('/import_and_test/stream', {
+                method: 'POST',
+                body: formData
+            });
+            
+            if (!response.ok) {
+                const error = await response.json().catch(() => ({}));
+                throw new Error(error.error || `Erreur HTTP: ${response.status}`);
+            }
+            
+            const view = createStreamingResultsView();
+            let completed = false;
+            await readNdjsonStream(response, event => {
+                view.handleEvent(event);
+                if (event.type === 'done') completed = true;
+            });
+            if (!completed) {
+                throw new Error("L'analyse a été interrompue");
+            }
+            
+            // Masquer le message de chargement global
+            hideLoading();
+            
+            // Afficher les vues qui portent sur l'ensemble des résultats
+            await view.finish();
         }
         
-        // Masquer les indicateurs de chargement
-        getElement('loadingTags').classList.add('d-none');
-        getElement('loadingSummaries').classList.add('d-none');
-        
-        // Masquer le message de chargement global
-        hideLoading();
-        
-        // Afficher les résultats
-        displayResults(data);
-        
         // Afficher un message de succès
         showAlert("Importation et analyse effectuées avec succès !", "success");
         
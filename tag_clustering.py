@@ -0,0 +1,243 @@
+"""
+Regroupement local des tags pour l'Analyseur de Réponses Ouvertes.
+
+Avant la normalisation par le LLM :
+- les variantes évidentes d'un même tag (casse, accents, ponctuation, élisions,
+  pluriels simples) sont fusionnées localement et seul un représentant par
+  variante est envoyé au modèle ;
+- les tags sont répartis en lots de taille bornée, en plaçant dans le même lot
+  les tags qui partagent un mot significatif, afin que chaque lot puisse être
+  normalisé indépendamment.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+
+# Mots trop fréquents pour rapprocher deux tags
+STOPWORDS = {
+    'avec', 'dans', 'pour', 'sans', 'sous', 'plus', 'moins', 'tres', 'trop', 'bien', 'peu',
+    'mais', 'comme', 'tout', 'tous', 'toute', 'toutes', 'cette', 'leur', 'leurs', 'etre', 'avoir',
+    'application', 'app', 'utilisateur', 'utilisateurs'
+}
+
+# Longueur minimale d'un mot pour rapprocher deux tags
+MIN_TOKEN_LENGTH = 4
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+_SPACES_RE = re.compile(r"\s+")
+_ELISION_RE = re.compile(r"\b(?:l|d|j|m|n|s|t|c|qu)['’]")
+
+
+def fold_tag(tag):
+    """
+    Forme comparable d'un tag : minuscules, sans accents ni ponctuation.
+
+    Args:
+        tag (str): Tag à transformer
+
+    Returns:
+        str: Tag replié
+    """
+    text = unicodedata.normalize('NFKD', str(tag).lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    text = _PUNCTUATION_RE.sub(' ', text)
+    return _SPACES_RE.sub(' ', text).strip()
+
+
+# Pluriels en -aux qui ne viennent pas d'un singulier en -al
+IRREGULAR_PLURALS = {
+    'travaux': 'travail', 'vitraux': 'vitrail', 'coraux': 'corail', 'soupiraux': 'soupirail', 'vantaux': 'vantail',
+    'tuyaux': 'tuyau', 'noyaux': 'noyau', 'boyaux': 'boyau', 'joyaux': 'joyau', 'preaux': 'preau',
+}
+
+# Mots terminés par -s ou -x au singulier (repliés, plus de 4 lettres)
+INVARIABLE_WORDS = {
+    'choix', 'croix', 'cours', 'parcours', 'discours', 'secours', 'concours', 'recours', 'velours',
+    'temps', 'printemps', 'corps', 'poids', 'fonds', 'repas', 'matelas', 'embarras',
+    'devis', 'colis', 'tapis', 'souris', 'permis', 'paradis', 'relais', 'mauvais', 'frais', 'francais', 'anglais',
+    'acces', 'succes', 'progres', 'proces', 'exces', 'processus', 'virus', 'bonus', 'campus', 'corpus',
+    'consensus', 'refus', 'surplus', 'focus', 'terminus', 'chaux', 'emaux',
+}
+
+# Terminaisons propres à des mots invariables (un pluriel français ne se termine pas ainsi)
+INVARIABLE_SUFFIXES = ('ix', 'ours', 'ss')
+
+
+def singularize(token):
+    """
+    Retire les marques simples du pluriel français d'un mot replié.
+
+    Les mots courts (4 lettres ou moins) sont laissés intacts pour ne pas
+    tronquer des mots comme « prix » ou « bus », ainsi que les mots invariables
+    terminés par -s ou -x (« choix », « cours »). Les pluriels en -aux sont
+    ramenés à -al (« journaux »), sauf les pluriels irréguliers connus (« travaux »).
+
+    Args:
+        token (str): Mot en minuscules, sans accents
+
+    Returns:
+        str: Mot au singulier
+    """
+    if len(token) <= MIN_TOKEN_LENGTH or token in INVARIABLE_WORDS or token.endswith(INVARIABLE_SUFFIXES):
+        return token
+    if token in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[token]
+    if token.endswith('eaux'):
+        return token[:-1]
+    if token.endswith('aux'):
+        return token[:-3] + 'al'
+    if token[-1] in 'sx':
+        return token[:-1]
+    return token
+
+
+def canonical_tag_key(tag):
+    """
+    Clé canonique d'un tag : deux tags de même clé sont des variantes évidentes
+    l'un de l'autre (casse, accents, ponctuation, élisions, pluriels simples).
+
+    Args:
+        tag (str): Tag à transformer
+
+    Returns:
+        str: Clé canonique
+    """
+    text = _ELISION_RE.sub('', str(tag).lower())
+    return ' '.join(singularize(token) for token in fold_tag(text).split(' ') if token)
+
+
+def prenormalize_tags(tags, counts=None):
+    """
+    Fusionne localement les variantes évidentes des tags.
+
+    Pour chaque clé canonique, un représentant est choisi : la variante la plus
+    fréquente, puis la plus courte, puis la première dans l'ordre alphabétique.
+
+    Args:
+        tags (list): Tags uniques à pré-normaliser
+        counts (dict): Nombre d'occurrences de chaque tag (optionnel)
+
+    Returns:
+        tuple: (représentants à envoyer au modèle, dict représentant -> variantes)
+    """
+    counts = counts or {}
+    groups = {}
+    for tag in tags:
+        groups.setdefault(canonical_tag_key(tag), []).append(tag)
+
+    variants = {}
+    for members in groups.values():
+        representative = min(members, key=lambda tag: (-counts.get(tag, 0), len(tag), tag))
+        variants[representative] = sorted(members, key=lambda tag: tag != representative)
+
+    representatives = sorted(variants)
+    return representatives, variants
+
+
+def expand_tag_mapping(mapping, variants):
+    """
+    Remplace chaque représentant du mapping par l'ensemble de ses variantes.
+
+    Args:
+        mapping (dict): Mapping tag normalisé -> représentants
+        variants (dict): Dict représentant -> variantes, issu de prenormalize_tags
+
+    Returns:
+        dict: Mapping tag normalisé -> tags originaux
+    """
+    expanded = {}
+    for normalized, originals in mapping.items():
+        members = expanded.setdefault(normalized, [])
+        for original in originals:
+            for variant in variants.get(original, [original]):
+                if variant not in members:
+                    members.append(variant)
+    return expanded
+
+
+def count_tags(response_tags):
+    """
+    Compte les occurrences de chaque tag extrait.
+
+    Args:
+        response_tags (list): Tags extraits par réponse
+
+    Returns:
+        Counter: Nombre d'occurrences par tag
+    """
+    return Counter(tag for item in response_tags for tag in item.get('tags', []))
+
+
+def significant_tokens(tag):
+    """
+    Mots significatifs d'un tag, utilisés pour rapprocher les tags entre eux.
+
+    Args:
+        tag (str): Tag à analyser
+
+    Returns:
+        set: Mots repliés, sans marque simple du pluriel
+    """
+    tokens = set()
+    for token in canonical_tag_key(tag).split(' '):
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS:
+            tokens.add(token)
+    return tokens
+
+
+def cluster_tags(tags, max_batch_size):
+    """
+    Répartit les tags en lots de taille bornée, en gardant ensemble les tags
+    qui partagent un mot significatif.
+
+    Les groupes sont formés par union des tags partageant un mot, sans jamais
+    dépasser max_batch_size, puis rangés dans des lots dans l'ordre alphabétique
+    de leur premier tag. Le résultat est déterministe pour un même ensemble de tags.
+
+    Args:
+        tags (list): Tags à répartir
+        max_batch_size (int): Nombre maximum de tags par lot
+
+    Returns:
+        list: Lots de tags
+    """
+    tags = sorted(set(tags), key=lambda tag: (fold_tag(tag), tag))
+    parent = list(range(len(tags)))
+    size = [1] * len(tags)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # Union des tags qui partagent un mot significatif, dans la limite de la taille d'un lot
+    first_with_token = {}
+    for i, tag in enumerate(tags):
+        for token in sorted(significant_tokens(tag)):
+            j = first_with_token.setdefault(token, i)
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j and size[root_i] + size[root_j] <= max_batch_size:
+                if root_i < root_j:
+                    root_i, root_j = root_j, root_i
+                parent[root_i] = root_j
+                size[root_j] += size[root_i]
+
+    groups = {}
+    for i, tag in enumerate(tags):
+        groups.setdefault(find(i), []).append(tag)
+
+    # Remplissage des lots avec des groupes entiers
+    batches = []
+    current = []
+    for root in sorted(groups):
+        group = groups[root]
+        if current and len(current) + len(group) > max_batch_size:
+            batches.append(current)
+            current = []
+        current.extend(group)
+    if current:
+        batches.append(current)
+
+    return batches
@@ -0,0 +1,270 @@
+"""
+Normalisation des tags par embeddings pour l'Analyseur de Réponses Ouvertes.
+
+Mode de normalisation alternatif à la normalisation par prompt : chaque tag
+est représenté par un vecteur (embedding), les vecteurs sont rassemblés dans
+une matrice NumPy, et les tags sont regroupés par classification
+ascendante (liaison par centroïde) sur les similarités cosinus. Le LLM ne
+sert plus qu'à nommer les groupes.
+
+Les embeddings sont calculés :
+- par l'API d'embeddings du fournisseur de LLM (par lots), ou
+- localement : modèle sentence-transformers s'il est installé, ou vecteurs
+  de n-grammes de caractères (purement lexicaux, sans dépendance).
+Ils sont conservés dans un cache SQLite indexé par (modèle, texte du tag).
+"""
+
+import os
+import zlib
+import sqlite3
+import threading
+import logging
+
+import numpy as np
+
+from tag_clustering import fold_tag
+from llm_scheduler import ContextThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximum de voisins examinés par tag lors du regroupement
+CLUSTER_NEIGHBORS = 20
+
+# Nombre de lignes de la matrice de similarité calculées à la fois
+SIMILARITY_BLOCK_SIZE = 1024
+
+
+class HashingEmbedder:
+    """
+    Embeddings locaux par hachage des n-grammes de caractères et des mots.
+
+    Rapproche les tags qui partagent des fragments de mots (variantes,
+    pluriels, fautes de frappe), sans notion de synonymie.
+
+    Args:
+        dimensions (int): Taille des vecteurs
+        ngram_size (int): Taille des n-grammes de caractères
+    """
+
+    def __init__(self, dimensions=512, ngram_size=3):
+        self.dimensions = dimensions
+        self.ngram_size = ngram_size
+        self.model = f"hashing-{ngram_size}gram-{dimensions}"
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            folded = fold_tag(text)
+            padded = f" {folded} "
+            features = [padded[i:i + self.ngram_size] for i in range(len(padded) - self.ngram_size + 1)]
+            features.extend(f"mot:{word}" for word in folded.split())
+            for feature in features:
+                matrix[row, zlib.crc32(feature.encode('utf-8')) % self.dimensions] += 1.0
+        return matrix
+
+
+class SentenceTransformerEmbedder:
+    """
+    Embeddings calculés localement sur CPU par un modèle sentence-transformers.
+
+    Args:
+        model (str): Nom du modèle (par exemple paraphrase-multilingual-MiniLM-L12-v2)
+        batch_size (int): Nombre de textes encodés à la fois
+    """
+
+    def __init__(self, model, batch_size=64):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "Le mode d'embeddings 'local' nécessite le paquet sentence-transformers "
+                "(pip install sentence-transformers)"
+            ) from e
+        self.model = model
+        self.batch_size = batch_size
+        self._encoder = SentenceTransformer(model, device='cpu')
+
+    def embed(self, texts):
+        return np.asarray(self._encoder.encode(list(texts), batch_size=self.batch_size), dtype=np.float32)
+
+
+class ProviderEmbedder:
+    """
+    Embeddings calculés par l'API du fournisseur de LLM, par lots.
+
+    Args:
+        embed_batch (callable): Fonction embed_batch(textes) -> liste de vecteurs
+        model (str): Nom du modèle d'embeddings
+        batch_size (int): Nombre de textes par requête
+        max_workers (int): Nombre de lots envoyés en parallèle
+    """
+
+    def __init__(self, embed_batch, model, batch_size=64, max_workers=1):
+        self._embed_batch = embed_batch
+        self.model = model
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    def embed(self, texts):
+        texts = list(texts)
+        batches = [texts[start:start + self.batch_size] for start in range(0, len(texts), self.batch_size)]
+        if self.max_workers > 1 and len(batches) > 1:
+            with ContextThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+                results = list(executor.map(self._embed_batch, batches))
+        else:
+            results = [self._embed_batch(batch) for batch in batches]
+        vectors = [vector for result in results for vector in result]
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+
+class EmbeddingCache:
+    """
+    Cache SQLite des embeddings, indexé par (modèle, texte).
+
+    Args:
+        path (str): Chemin de la base SQLite
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, text)
+                )
+            """)
+            self._conn.commit()
+
+    def get_many(self, model, texts):
+        """
+        Retourne les embeddings connus, sous forme de dict texte -> vecteur.
+        """
+        found = {}
+        texts = list(texts)
+        with self._lock:
+            for start in range(0, len(texts), 500):
+                chunk = texts[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for text, vector in self._conn.execute(
+                    f"SELECT text, vector FROM embeddings WHERE model = ? AND text IN ({placeholders})",
+                    [model] + chunk
+                ):
+                    found[text] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def set_many(self, model, items):
+        """
+        Enregistre des embeddings (itérable de couples texte, vecteur).
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text, vector) VALUES (?, ?, ?)",
+                ((model, text, np.asarray(vector, dtype=np.float32).tobytes()) for text, vector in items)
+            )
+            self._conn.commit()
+
+
+def embed_tags(tags, embedder, cache=None):
+    """
+    Calcule la matrice des embeddings normalisés (norme 1) des tags.
+
+    Seuls les tags absents du cache sont envoyés à l'embedder.
+
+    Args:
+        tags (list): Tags à représenter
+        embedder: Objet exposant embed(textes) et model
+        cache (EmbeddingCache): Cache des embeddings (optionnel)
+
+    Returns:
+        np.ndarray: Matrice (nombre de tags, dimension), une ligne par tag
+    """
+    known = cache.get_many(embedder.model, tags) if cache is not None else {}
+    missing = [tag for tag in tags if tag not in known]
+    if missing:
+        vectors = embedder.embed(missing)
+        computed = dict(zip(missing, vectors))
+        if cache is not None:
+            cache.set_many(embedder.model, computed.items())
+        known.update(computed)
+    logger.info(f"Embeddings de {len(tags)} tags ({len(missing)} calculés, {len(tags) - len(missing)} en cache)")
+
+    matrix = np.vstack([known[tag] for tag in tags]).astype(np.float32) if tags else np.zeros((0, 0), dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _candidate_pairs(matrix, threshold, neighbors):
+    # Paires (similarité, i, j) au-dessus du seuil, limitées aux plus proches voisins de chaque tag
+    count = len(matrix)
+    k = min(neighbors, count - 1)
+    pairs = set()
+    for start in range(0, count, SIMILARITY_BLOCK_SIZE):
+        block = matrix[start:start + SIMILARITY_BLOCK_SIZE] @ matrix.T
+        rows = np.arange(len(block))
+        block[rows, rows + start] = -np.inf
+        nearest = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        similarities = block[rows[:, None], nearest]
+        for row, column in zip(*np.nonzero(similarities >= threshold)):
+            i, j = start + int(row), int(nearest[row, column])
+            pairs.add((min(i, j), max(i, j)))
+
+    # La similarité est recalculée pour que les paires vues dans les deux sens soient identiques
+    scored = [(float(matrix[i] @ matrix[j]), i, j) for i, j in pairs]
+    return sorted(scored, key=lambda pair: (-pair[0], pair[1], pair[2]))
+
+
+def cluster_embeddings(matrix, threshold, neighbors=CLUSTER_NEIGHBORS):
+    """
+    Classification ascendante des tags par liaison par centroïde.
+
+    Les paires de tags proches sont examinées de la plus similaire à la moins
+    similaire ; deux groupes sont fusionnés si la similarité cosinus de leurs
+    centroïdes reste au moins égale au seuil, ce qui évite les chaînes de
+    tags de plus en plus éloignés. Le résultat est déterministe.
+
+    Args:
+        matrix (np.ndarray): Embeddings normalisés, une ligne par tag
+        threshold (float): Similarité cosinus minimale entre centroïdes
+        neighbors (int): Nombre de voisins examinés par tag
+
+    Returns:
+        list: Groupes d'indices de lignes, triés par premier indice
+    """
+    count = len(matrix)
+    if count < 2:
+        return [[i] for i in range(count)]
+
+    parent = list(range(count))
+    sums = matrix.astype(np.float64)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for _, i, j in _candidate_pairs(matrix, threshold, neighbors):
+        root_i, root_j = find(i), find(j)
+        if root_i == root_j:
+            continue
+        sum_i, sum_j = sums[root_i], sums[root_j]
+        similarity = float(sum_i @ sum_j) / (np.linalg.norm(sum_i) * np.linalg.norm(sum_j) or 1.0)
+        if similarity < threshold:
+            continue
+        root, child = min(root_i, root_j), max(root_i, root_j)
+        parent[child] = root
+        sums[root] = sum_i + sum_j
+
+    groups = {}
+    for i in range(count):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values(), key=lambda group: group[0])
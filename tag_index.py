@@ -0,0 +1,197 @@
+"""
+Index de correspondance des tags pour l'Analyseur de Réponses Ouvertes.
+
+Lorsqu'un tag extrait n'a pas de correspondance exacte dans le mapping de
+normalisation, on cherche un tag original qui le contient ou qui est contenu
+dans celui-ci. Cet index évite de parcourir tout le mapping pour chaque tag :
+- les originaux qui contiennent le tag sont trouvés via un index inversé de n-grammes ;
+- les originaux contenus dans le tag sont trouvés en un seul parcours du tag
+  par un automate d'Aho-Corasick construit sur les originaux.
+Les correspondances sont retournées dans l'ordre du mapping, ce qui conserve
+la sémantique « première correspondance » du parcours linéaire.
+"""
+
+from collections import deque
+
+# Taille maximale des n-grammes indexés
+NGRAM_SIZE = 3
+
+# En dessous de ce nombre d'originaux, le parcours linéaire est plus rapide que l'index
+INDEX_MIN_ORIGINALS = 500
+
+
+class TagMatchIndex:
+    """
+    Index de recherche exacte et partielle sur un mapping tag original -> tag normalisé.
+
+    Args:
+        tag_mapping (dict): Mapping des tags originaux (en minuscules) vers les
+            tags normalisés ; l'ordre d'itération définit la priorité des correspondances
+    """
+
+    def __init__(self, tag_mapping):
+        self._mapping = tag_mapping
+        self._originals = list(tag_mapping.keys())
+        self._partial_cache = {}
+        self._indexed = len(self._originals) >= INDEX_MIN_ORIGINALS
+
+        # Les structures de recherche partielle sont construites à la première recherche
+        self._goto = None
+        self._postings = {}
+
+    def _get_postings(self, size):
+        # Index inversé : n-gramme -> positions des originaux qui le contiennent
+        postings = self._postings.get(size)
+        if postings is None:
+            postings = {}
+            for position, original in enumerate(self._originals):
+                for gram in {original[i:i + size] for i in range(len(original) - size + 1)}:
+                    postings.setdefault(gram, set()).add(position)
+            self._postings[size] = postings
+        return postings
+
+    def _build_automaton(self):
+        # Automate d'Aho-Corasick : transitions, liens d'échec, originaux reconnus
+        # par état et lien vers le plus proche état suffixe qui reconnaît un original
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for position, original in enumerate(self._originals):
+            state = 0
+            for char in original:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(position)
+        self._output_link = [0] * len(self._goto)
+
+        # Parcours en largeur pour calculer les liens d'échec
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                fail_state = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = fail_state
+                self._output_link[next_state] = fail_state if self._output[fail_state] else self._output_link[fail_state]
+
+    def get(self, tag):
+        """
+        Retourne le tag normalisé correspondant exactement au tag (insensible à la casse).
+        """
+        return self._mapping.get(tag.lower())
+
+    def partial_matches(self, tag):
+        """
+        Retourne les tags normalisés des originaux qui contiennent le tag ou
+        sont contenus dans celui-ci, dans l'ordre du mapping.
+
+        Args:
+            tag (str): Tag à rechercher
+
+        Returns:
+            list: Tags normalisés candidats, du plus prioritaire au moins prioritaire
+        """
+        tag = tag.lower()
+        cached = self._partial_cache.get(tag)
+        if cached is not None:
+            return cached
+
+        if self._indexed:
+            if self._goto is None:
+                self._build_automaton()
+            positions = sorted(self._containing(tag) | self._contained(tag))
+        else:
+            positions = [position for position, original in enumerate(self._originals)
+                         if tag in original or original in tag]
+        matches = [self._mapping[self._originals[position]] for position in positions]
+        self._partial_cache[tag] = matches
+        return matches
+
+    def _containing(self, tag):
+        # Originaux qui contiennent le tag
+        if not tag:
+            return set(range(len(self._originals)))
+
+        size = min(len(tag), NGRAM_SIZE)
+        index = self._get_postings(size)
+        postings = []
+        for gram in {tag[i:i + size] for i in range(len(tag) - size + 1)}:
+            posting = index.get(gram)
+            if not posting:
+                return set()
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return {position for position in candidates if tag in self._originals[position]}
+
+    def _contained(self, tag):
+        # Originaux contenus dans le tag (l'original vide, s'il existe, est toujours reconnu)
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        output_link = self._output_link
+        found = set(output[0])
+        state = 0
+        for char in tag:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            match = state if output[state] else output_link[state]
+            while match:
+                found.update(output[match])
+                match = output_link[match]
+        return found
+
+
+def reassign_tags(tag_mapping, response_tags):
+    """
+    Réattribue les tags normalisés à un lot de réponses.
+
+    Fonction de module sans état partagé : elle peut être exécutée dans un
+    processus du pool de calcul (voir cpu_pool.CPUPool), chaque processus
+    construisant son propre index.
+
+    Args:
+        tag_mapping (dict): Mapping des tags originaux (en minuscules) vers les tags normalisés
+        response_tags (list): Tags extraits par réponse (response_id, tags)
+
+    Returns:
+        list: Tags normalisés par réponse (response_id, original_tags, normalized_tags)
+    """
+    index = TagMatchIndex(tag_mapping)
+    normalized_response_tags = []
+
+    for response_item in response_tags:
+        original_tags = response_item.get('tags', [])
+
+        # Convertir les tags originaux en tags normalisés
+        normalized_tags = []
+        for tag in original_tags:
+            normalized_tag = index.get(tag)
+            if normalized_tag and normalized_tag not in normalized_tags:
+                normalized_tags.append(normalized_tag)
+            elif not normalized_tag:
+                # Si aucune correspondance exacte n'est trouvée, chercher une correspondance partielle
+                for normalized in index.partial_matches(tag):
+                    if normalized not in normalized_tags:
+                        normalized_tags.append(normalized)
+                        break
+
+        normalized_response_tags.append({
+            'response_id': response_item.get('response_id'),
+            'original_tags': original_tags,
+            'normalized_tags': normalized_tags
+        })
+
+    return normalized_response_tags
@@ -0,0 +1,27 @@
+import os
+import sys
+import importlib
+
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def analyzer(tmp_path_factory):
+    """
+    Module app chargé avec le fournisseur de LLM factice et des bases locales
+    temporaires, pour ne pas toucher aux données de l'utilisateur.
+    """
+    directory = tmp_path_factory.mktemp('data')
+    os.environ.update({
+        'LLM_PROVIDER': 'mock',
+        'LLM_CACHE_ENABLED': '0',
+        'LLM_CACHE_PATH': str(directory / 'llm_cache.sqlite3'),
+        'EMBEDDING_CACHE_PATH': str(directory / 'embeddings.sqlite3'),
+        'RESULT_STORE_PATH': str(directory / 'results.sqlite3'),
+        'ANALYSIS_STATE_PATH': str(directory / 'analysis_state.sqlite3'),
+        'JOBS_DIR': str(directory / 'jobs'),
+    })
+    return importlib.import_module('app')
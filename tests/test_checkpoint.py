@@ -0,0 +1,46 @@
+"""
+Tests des points de reprise (checkpoint.py) : étapes terminées et appels au
+LLM relus à la reprise, effacés si le fichier analysé change.
+"""
+
+from checkpoint import PipelineCheckpoint, file_fingerprint
+
+
+def test_stages_and_calls_survive_reopening(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite3')
+    checkpoint = PipelineCheckpoint(path, 'empreinte')
+    checkpoint.save('extraction', {'tags': [['prix'], ['interface']]})
+    checkpoint.set_call('clé', '["prix"]')
+    checkpoint.close()
+
+    resumed = PipelineCheckpoint(path, 'empreinte')
+    assert resumed.stages() == ['extraction']
+    assert resumed.load('extraction') == {'tags': [['prix'], ['interface']]}
+    assert resumed.load('normalisation') is None
+    assert resumed.get_call('clé') == '["prix"]'
+    assert resumed.get_call('autre clé') is None
+    resumed.close()
+
+
+def test_changed_data_clears_checkpoint(tmp_path):
+    path = str(tmp_path / 'checkpoint.sqlite3')
+    checkpoint = PipelineCheckpoint(path, 'avant')
+    checkpoint.save('extraction', [])
+    checkpoint.set_call('clé', '[]')
+    checkpoint.close()
+
+    changed = PipelineCheckpoint(path, 'après')
+    assert changed.stages() == []
+    assert changed.get_call('clé') is None
+    changed.close()
+
+
+def test_file_fingerprint_follows_content(tmp_path):
+    first = tmp_path / 'a.csv'
+    second = tmp_path / 'b.csv'
+    first.write_text('response\nTrop cher\n', encoding='utf-8')
+    second.write_text('response\nTrop cher\n', encoding='utf-8')
+    assert file_fingerprint(str(first)) == file_fingerprint(str(second))
+
+    second.write_text('response\nTrop lent\n', encoding='utf-8')
+    assert file_fingerprint(str(first)) != file_fingerprint(str(second))
@@ -0,0 +1,53 @@
+"""
+Tests du regroupement des réponses identiques ou presque (dedup.py).
+"""
+
+from dedup import ResponseDeduplicator, normalize_response
+
+
+def test_normalize_response():
+    assert normalize_response("  Trop LENT !!  L'appli… ") == 'trop lent l appli'
+    assert normalize_response('Mises à jour trop fréquentes') == 'mises a jour trop frequentes'
+
+
+def test_exact_duplicates_after_folding():
+    deduplicator = ResponseDeduplicator(threshold=1)
+    assigned = deduplicator.add(['Trop lent', 'trop lent !', 'Interface claire', 'TROP LENT'])
+    assert assigned == [0, 0, 2, 0]
+    assert deduplicator.representatives == [0, 2]
+
+
+def test_near_duplicates_are_grouped():
+    deduplicator = ResponseDeduplicator(threshold=0.7)
+    complaint = "L'application est très lente au démarrage et plante souvent quand je synchronise mes fichiers"
+    assigned = deduplicator.add([
+        complaint,
+        "L'application est très lente au démarrage et plante souvent quand je synchronise mes fichier",
+        "Le support client a répondu rapidement et a résolu mon problème de facturation",
+    ])
+    assert assigned == [0, 0, 2]
+
+
+def test_threshold_one_keeps_near_duplicates_apart():
+    deduplicator = ResponseDeduplicator(threshold=1)
+    assigned = deduplicator.add([
+        "L'application est très lente au démarrage et plante souvent",
+        "L'application est très lente au démarrage et plante parfois",
+    ])
+    assert assigned == [0, 1]
+
+
+def test_batches_share_groups():
+    deduplicator = ResponseDeduplicator(threshold=0.7)
+    assert deduplicator.add(['Le prix de l’abonnement premium est beaucoup trop élevé', 'Très bonne interface']) == [0, 1]
+    assert deduplicator.add(['très bonne interface !', 'Le prix de l’abonnement premium est beaucoup trop élevé.']) == [1, 0]
+    assert deduplicator.size == 4
+
+
+def test_duplicates_of_a_member_join_its_representative():
+    deduplicator = ResponseDeduplicator(threshold=0.7)
+    base = 'Les notifications arrivent en retard et je rate mes rendez-vous importants'
+    # La variante presque identique et son doublon exact rejoignent le groupe de base
+    assigned = deduplicator.add([base, base + ' souvent', base.upper() + ' SOUVENT !'])
+    assert assigned == [0, 0, 0]
+    assert deduplicator.representatives == [0]
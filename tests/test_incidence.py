@@ -0,0 +1,49 @@
+"""
+Tests de l'export des tables d'incidence (incidence.py) avec des synthèses
+de forme inattendue.
+"""
+
+import pytest
+
+from incidence import TagIncidence, export_tables, summary_fields
+
+
+@pytest.mark.parametrize('summary, expected', [
+    (
+        {'synthèse': 'Le prix est jugé trop élevé.', 'nombre_utilisateurs': 3, 'verbatims': ['Trop cher']},
+        {'synthèse': 'Le prix est jugé trop élevé.', 'nombre_utilisateurs': 3, 'verbatims': ['Trop cher']}
+    ),
+    (None, {'synthèse': None, 'nombre_utilisateurs': None, 'verbatims': []}),
+    ('Texte seul', {'synthèse': 'Texte seul', 'nombre_utilisateurs': None, 'verbatims': []}),
+    (['pas', 'un', 'objet'], {'synthèse': None, 'nombre_utilisateurs': None, 'verbatims': []}),
+    (
+        {'synthèse': ['deux', 'phrases'], 'nombre_utilisateurs': '4', 'verbatims': 'Un seul verbatim'},
+        {'synthèse': '["deux", "phrases"]', 'nombre_utilisateurs': 4, 'verbatims': ['Un seul verbatim']}
+    ),
+    (
+        {'nombre_utilisateurs': 'beaucoup', 'verbatims': ['Lent', None, {'texte': 'Bug'}, 7]},
+        {'synthèse': None, 'nombre_utilisateurs': None, 'verbatims': ['Lent', '{"texte": "Bug"}', '7']}
+    ),
+    ({'verbatims': {'texte': 'Bug'}}, {'synthèse': None, 'nombre_utilisateurs': None, 'verbatims': []}),
+])
+def test_summary_fields(summary, expected):
+    assert summary_fields(summary) == expected
+
+
+def test_export_tables_with_malformed_summaries():
+    pytest.importorskip('pyarrow')
+    incidence = TagIncidence.from_response_tags([
+        {'response_id': 1, 'normalized_tags': ['Tarifs', 'Interface']},
+        {'response_id': 2, 'normalized_tags': ['Tarifs']},
+    ], 2)
+    tables = export_tables(
+        incidence, [1, 2], ['Trop cher et moche', 'Trop cher'], [['prix', 'design'], ['prix']],
+        {'Tarifs': ['prix'], 'Interface': ['design'], 'Support': []},
+        {'Tarifs': 'Texte seul', 'Interface': {'synthèse': 'Design daté', 'verbatims': 'moche', 'nombre_utilisateurs': 'x'}}
+    )
+    rows = {row['tag']: row for row in tables['tags'].to_pylist()}
+    assert rows['Tarifs']['synthèse'] == 'Texte seul'
+    assert rows['Tarifs']['count'] == 2
+    assert rows['Interface']['verbatims'] == ['moche']
+    assert rows['Interface']['nombre_utilisateurs'] is None
+    assert rows['Support']['synthèse'] is None
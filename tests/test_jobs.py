@@ -0,0 +1,100 @@
+"""
+Tests de la file de tâches persistante (jobs.py) : exécution après start(),
+réclamation exclusive entre processus et reprise des tâches interrompues.
+"""
+
+import os
+import time
+import socket
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from jobs import JobManager, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, STAGE_DONE
+
+STAGES = ['extraction', 'syntheses']
+
+
+def make_manager(tmp_path, runner=None):
+    return JobManager(
+        str(tmp_path / 'jobs.sqlite3'), str(tmp_path / 'jobs'),
+        runner=runner or (lambda job, progress: {'ok': True}), stages=STAGES, max_workers=1
+    )
+
+
+def wait_for(manager, job_id, statuses=(JOB_DONE, JOB_FAILED), timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.02)
+    pytest.fail(f"Tâche {job_id} toujours {job['status']}")
+
+
+def set_running(manager, job_id, owner):
+    with sqlite3.connect(manager.db_path) as conn:
+        conn.execute("UPDATE jobs SET status = ?, owner = ? WHERE id = ?", (JOB_RUNNING, owner, job_id))
+
+
+def test_jobs_run_once_started(tmp_path):
+    def runner(job, progress):
+        progress('extraction', 1, 2)
+        progress('extraction', 2, 2)
+        progress('syntheses', 0, 3)
+        return {'responses': job['params']['responses']}
+
+    manager = make_manager(tmp_path, runner)
+    job_id = manager.submit(params={'responses': 3})
+    time.sleep(0.1)
+    assert manager.get(job_id)['status'] == JOB_QUEUED
+
+    manager.start()
+    job = wait_for(manager, job_id)
+    assert job['status'] == JOB_DONE
+    assert job['result'] == {'responses': 3}
+    assert all(stage['status'] == STAGE_DONE for stage in job['stages'].values())
+    assert job['stages']['extraction']['done'] == 2
+
+
+def test_failed_job_keeps_error(tmp_path):
+    def runner(job, progress):
+        raise ValueError('colonne response absente')
+
+    manager = make_manager(tmp_path, runner)
+    job_id = manager.submit()
+    manager.start()
+    job = wait_for(manager, job_id)
+    assert job['status'] == JOB_FAILED
+    assert job['error'] == 'colonne response absente'
+    assert manager.get('inconnue') is None
+
+
+def test_each_job_is_claimed_once(tmp_path):
+    first = make_manager(tmp_path)
+    second = make_manager(tmp_path)
+    job_ids = [first.submit() for _ in range(3)]
+
+    claimed = [first._claim_next(), second._claim_next(), first._claim_next(), second._claim_next()]
+    assert [job['id'] for job in claimed[:3]] == job_ids
+    assert claimed[3] is None
+    assert all(first.get(job_id)['status'] == JOB_RUNNING for job_id in job_ids)
+
+
+def test_interrupted_jobs_are_requeued(tmp_path):
+    manager = make_manager(tmp_path)
+    orphan = manager.submit()
+    alive = manager.submit()
+
+    finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+    finished.wait()
+    hostname = socket.gethostname()
+    set_running(manager, orphan, f"{hostname}:{finished.pid}")
+    set_running(manager, alive, f"{hostname}:{os.getpid()}")
+
+    manager._recover_orphans()
+    assert manager.get(orphan)['status'] == JOB_QUEUED
+    # La tâche d'un processus encore vivant n'est pas reprise
+    assert manager.get(alive)['status'] == JOB_RUNNING
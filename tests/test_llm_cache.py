@@ -0,0 +1,105 @@
+"""
+Tests du cache des réponses du LLM (llm_cache.py) : clés, hits et misses,
+expiration, éviction des entrées les moins récemment utilisées, et réponses
+mal formées tenues hors du cache par call_mistral.
+"""
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, make_cache_key
+
+MESSAGES = [{'role': 'user', 'content': 'Extrais les tags de : « trop cher »'}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, 'time', clock)
+    return clock
+
+
+def test_cache_key_covers_request():
+    key = make_cache_key('mistral-small', 0.3, 512, MESSAGES, provider='mistral')
+    assert key == make_cache_key('mistral-small', 0.3, 512, [dict(MESSAGES[0])], provider='mistral')
+    assert key != make_cache_key('mistral-small', 0.3, 512, MESSAGES, provider='mock')
+    assert key != make_cache_key('mistral-large', 0.3, 512, MESSAGES, provider='mistral')
+    assert key != make_cache_key('mistral-small', 0.2, 512, MESSAGES, provider='mistral')
+    assert key != make_cache_key('mistral-small', 0.3, 256, MESSAGES, provider='mistral')
+
+
+def test_hits_and_misses(tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'))
+    assert cache.get('clé') is None
+    cache.set('clé', '["prix"]')
+    assert cache.get('clé') == '["prix"]'
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+
+
+def test_entries_persist(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    LLMCache(path).set('clé', '["prix"]')
+    assert LLMCache(path).get('clé') == '["prix"]'
+
+
+def test_expired_entries_are_misses(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'), ttl_seconds=60)
+    cache.set('clé', '["prix"]')
+    clock.now += 59
+    assert cache.get('clé') == '["prix"]'
+    clock.now += 2
+    assert cache.get('clé') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'), max_entries=2, ttl_seconds=0)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+        clock.now += 1
+    cache.get('a')
+    clock.now += 1
+    cache.evict()
+
+    assert cache.stats()['entries'] == 2
+    assert cache.get('a') == 'a'
+    assert cache.get('b') is None
+    assert cache.get('c') == 'c'
+
+
+def test_eviction_runs_during_writes(tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'), max_entries=10)
+    for index in range(100):
+        cache.set(f'clé {index}', 'valeur')
+    assert cache.stats()['entries'] == 10
+
+
+def test_only_well_formed_replies_are_cached(analyzer, monkeypatch, tmp_path):
+    cache = LLMCache(str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(analyzer, 'llm_cache', cache)
+    replies = ['[{"response_id": 1, "tags": ["pr', '[{"response_id": 1, "tags": ["prix"]}]']
+
+    class Result:
+        prompt_tokens = completion_tokens = 1
+
+        def __init__(self, content):
+            self.content = content
+
+    monkeypatch.setattr(analyzer.llm_provider, 'chat', lambda *args: Result(replies.pop(0)))
+    cacheable = analyzer._complete_json(list, element=dict)
+
+    # Réponse coupée : retournée mais pas mise en cache, la requête suivante est renvoyée
+    assert analyzer.call_mistral(MESSAGES, 0.3, 64, stage='extraction', cacheable=cacheable).endswith('["pr')
+    assert cache.stats()['entries'] == 0
+    complete = analyzer.call_mistral(MESSAGES, 0.3, 64, stage='extraction', cacheable=cacheable)
+    assert complete == '[{"response_id": 1, "tags": ["prix"]}]'
+    assert analyzer.call_mistral(MESSAGES, 0.3, 64, stage='extraction', cacheable=cacheable) == complete
+    assert replies == []
@@ -0,0 +1,75 @@
+"""
+Tests de l'interprétation des réponses JSON du LLM (llm_output.py) et du
+renvoi à l'extraction des réponses absentes d'une sortie coupée.
+"""
+
+from llm_output import (
+    parse_json_output, PARSE_JSON, PARSE_EXTRACTED, PARSE_PARTIAL, PARSE_FAILED
+)
+
+
+def test_valid_json():
+    parsed = parse_json_output('[{"response_id": 1, "tags": ["prix"]}]', list, dict)
+    assert parsed == ([{'response_id': 1, 'tags': ['prix']}], PARSE_JSON)
+    assert parsed.complete
+
+
+def test_json_surrounded_by_text_and_markdown():
+    content = 'Voici les tags :\n```json\n{"prix": ["tarif", "coût"]}\n```'
+    assert parse_json_output(content, dict) == ({'prix': ['tarif', 'coût']}, PARSE_EXTRACTED)
+
+
+def test_trailing_comma_is_complete():
+    assert parse_json_output('["prix", "interface",]', list) == (['prix', 'interface'], PARSE_EXTRACTED)
+
+
+def test_truncated_array_keeps_complete_elements():
+    content = '[{"response_id": 1, "tags": ["prix"]}, {"response_id": 2, "tags": ["interf'
+    parsed = parse_json_output(content, list, dict)
+    assert parsed == ([{'response_id': 1, 'tags': ['prix']}], PARSE_PARTIAL)
+    assert not parsed.complete
+
+
+def test_truncated_object_keeps_complete_entries():
+    content = '{"Prix": ["tarif", "coût"], "Interface": ["menu", "bout'
+    assert parse_json_output(content, dict) == ({'Prix': ['tarif', 'coût']}, PARSE_PARTIAL)
+
+
+def test_skips_candidates_with_unexpected_elements():
+    content = 'Voici les tags [1] : [{"response_id": 1, "tags": ["prix"]}]'
+    assert parse_json_output(content, list, dict) == ([{'response_id': 1, 'tags': ['prix']}], PARSE_EXTRACTED)
+
+
+def test_nothing_usable():
+    assert parse_json_output('Je ne peux pas répondre.', list) == (None, PARSE_FAILED)
+    assert parse_json_output('', dict) == (None, PARSE_FAILED)
+    assert parse_json_output(None, list) == (None, PARSE_FAILED)
+    assert parse_json_output('[{"response_id": 1, "tags": ["pr', list, dict).status == PARSE_FAILED
+
+
+def test_missing_responses_are_requeued(analyzer, monkeypatch):
+    calls = []
+
+    def extract(numbered):
+        calls.append([response_id for response_id, _ in numbered])
+        # Sortie coupée : seule la première réponse demandée est retournée
+        return [{'response_id': numbered[0][0], 'tags': [numbered[0][1]]}]
+
+    monkeypatch.setattr(analyzer, '_extract_numbered_responses', extract)
+    monkeypatch.setattr(analyzer, 'EXTRACTION_MAX_REQUEUE', 2)
+    result = analyzer._extract_tags_chunk(['prix', 'interface', 'support', 'menu'], offset=10)
+
+    assert calls == [[11, 12, 13, 14], [12, 13, 14], [13, 14]]
+    assert [item['response_id'] for item in result] == [11, 12, 13]
+
+
+def test_failed_call_stops_requeue(analyzer, monkeypatch):
+    calls = []
+
+    def extract(numbered):
+        calls.append(len(numbered))
+        return None if len(calls) > 1 else []
+
+    monkeypatch.setattr(analyzer, '_extract_numbered_responses', extract)
+    assert analyzer._extract_tags_chunk(['prix', 'interface']) == []
+    assert calls == [2, 2]
@@ -0,0 +1,43 @@
+"""
+Tests du fournisseur simulé (llm_providers.MockProvider) : réponses au format
+attendu par chaque étape, sans dépendre des modules du pipeline.
+"""
+
+import os
+import json
+import subprocess
+import sys
+
+import llm_providers
+from llm_providers import MockProvider
+
+
+def chat(provider, system, prompt):
+    return json.loads(provider.chat('mock', [{'role': 'system', 'content': system}, {'role': 'user', 'content': prompt}], 0.3, 512).content)
+
+
+def test_extraction():
+    prompt = "Réponses à analyser:\n1. Les mises à jour plantent souvent\n2. Trop cher\nPour chaque réponse..."
+    items = chat(MockProvider(), "Vous êtes un analyste expert qui extrait des tags pertinents", prompt)
+    assert [item['response_id'] for item in items] == [1, 2]
+    assert items[0]['tags'] == ['plantent', 'souvent', 'jour']
+    assert items[1]['tags'] == ['cher']
+
+
+def test_normalization_groups_tags_by_word():
+    prompt = "Tags à normaliser:\n- prix unique\n- Prix\n- interface\nRetourne..."
+    assert chat(MockProvider(), "Vous normalisez des tags", prompt) == {'prix': ['prix unique', 'Prix'], 'interface': ['interface']}
+
+
+def test_embeddings_are_deterministic():
+    provider = MockProvider()
+    first, second = provider.embed('mock', ['mise à jour', 'mises à jour'])
+    assert first == provider.embed('mock', ['mise à jour'])[0]
+    assert len(first) == len(second) and first != second
+
+
+def test_provider_layer_does_not_import_the_pipeline():
+    code = "import sys, llm_providers; print(sorted({'tag_clustering', 'tag_embeddings', 'app'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(llm_providers.__file__)))
+    assert result.stdout.strip() == '[]'
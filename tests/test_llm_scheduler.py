@@ -0,0 +1,177 @@
+"""
+Tests de l'ordonnanceur des appels au LLM (llm_scheduler.py) : seaux à jetons,
+nouvelles tentatives, réduction de la concurrence sur 429 et fusion des
+requêtes identiques.
+"""
+
+import time
+import threading
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import LLMScheduler, TokenBucket
+
+
+class TransientError(Exception):
+    retryable = True
+
+    def __init__(self, status=None, retry_after=None):
+        super().__init__(f"erreur {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def failing(errors, result='ok'):
+    # Lève les erreurs dans l'ordre, puis retourne result
+    calls = []
+
+    def func():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return func, calls
+
+
+def test_token_bucket():
+    bucket = TokenBucket(60, burst_seconds=10)
+    assert bucket.delay(1) == 0
+    bucket.take(10)
+    assert bucket.delay(1) == pytest.approx(1, abs=0.05)
+    # Une demande plus grande que la capacité attend que le seau soit plein
+    assert bucket.delay(100) == pytest.approx(10, abs=0.05)
+
+
+def test_token_bucket_without_limit():
+    bucket = TokenBucket(0)
+    bucket.take(1000)
+    assert bucket.delay(1000) == 0
+
+
+def test_retries_with_exponential_backoff(monkeypatch):
+    delays = []
+    monkeypatch.setattr(llm_scheduler.time, 'sleep', delays.append)
+    monkeypatch.setattr(llm_scheduler.random, 'uniform', lambda low, high: high)
+    scheduler = LLMScheduler(base_delay=1, max_delay=3)
+    func, calls = failing([TransientError(500), TransientError(502), TransientError(503)])
+
+    assert scheduler.run(None, func) == 'ok'
+    assert len(calls) == 4
+    assert delays == [1, 2, 3]
+
+
+def test_non_retryable_error_is_raised_at_once():
+    scheduler = LLMScheduler(base_delay=0)
+    func, calls = failing([ValueError('requête invalide')])
+    with pytest.raises(ValueError):
+        scheduler.run(None, func)
+    assert len(calls) == 1
+
+
+def test_retries_are_bounded(monkeypatch):
+    monkeypatch.setattr(llm_scheduler.time, 'sleep', lambda delay: None)
+    scheduler = LLMScheduler(max_retries=2, base_delay=0)
+    func, calls = failing([TransientError(500)] * 5)
+    with pytest.raises(TransientError):
+        scheduler.run(None, func)
+    assert len(calls) == 3
+    assert scheduler.stats()['in_flight'] == 0
+
+
+def test_throttling_halves_concurrency_and_respects_retry_after():
+    scheduler = LLMScheduler(max_in_flight=8, base_delay=0.001)
+    func, calls = failing([TransientError(429, retry_after=0.2), TransientError(429, retry_after=0.2)])
+
+    assert scheduler.run(None, func) == 'ok'
+    assert calls[1] - calls[0] >= 0.2
+    # 8 -> 4 -> 2, puis le succès remonte la limite de 1/2
+    assert scheduler.stats()['concurrency_limit'] == 2
+
+    for _ in range(40):
+        scheduler.run(None, lambda: None)
+    assert scheduler.stats()['concurrency_limit'] == 8
+
+
+def test_identical_requests_are_coalesced():
+    scheduler = LLMScheduler()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'réponse'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(scheduler.run('clé', func)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(scheduler.run('clé', func))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert results == ['réponse'] * 4
+    assert len(calls) == 1
+    # Une fois terminée, la même requête est de nouveau envoyée
+    assert scheduler.run('clé', lambda: 'nouvelle') == 'nouvelle'
+
+
+def test_coalesced_requests_share_the_error():
+    scheduler = LLMScheduler()
+    started = threading.Event()
+    release = threading.Event()
+
+    def func():
+        started.set()
+        release.wait(5)
+        raise ValueError('échec')
+
+    errors = []
+
+    def call():
+        try:
+            scheduler.run('clé', func)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert len(errors) == 2
+
+
+def test_interactive_calls_go_first():
+    scheduler = LLMScheduler(max_in_flight=1)
+    release = threading.Event()
+    order = []
+
+    blocker = threading.Thread(target=lambda: scheduler.run(None, lambda: release.wait(5)))
+    blocker.start()
+    while scheduler.stats()['in_flight'] == 0:
+        time.sleep(0.01)
+
+    threads = []
+    for name, priority in [('lot', llm_scheduler.PRIORITY_BATCH), ('interactif', llm_scheduler.PRIORITY_INTERACTIVE)]:
+        thread = threading.Thread(target=lambda name=name, priority=priority: scheduler.run(None, lambda: order.append(name), priority=priority))
+        thread.start()
+        threads.append(thread)
+        while scheduler.stats()['waiting'] < len(threads):
+            time.sleep(0.01)
+    release.set()
+    for thread in [blocker, *threads]:
+        thread.join(5)
+
+    assert order == ['interactif', 'lot']
@@ -0,0 +1,80 @@
+"""
+Tests des métriques (metrics.py) : format de Prometheus et somme des valeurs
+des workers d'un serveur à plusieurs processus.
+"""
+
+import os
+import subprocess
+import sys
+
+import metrics
+from metrics import MetricsRegistry
+
+# Worker simulé : enregistre des mesures puis s'arrête (les valeurs sont écrites à l'arrêt)
+WORKER = """
+import sys
+from metrics import MetricsRegistry
+registry = MetricsRegistry(multiprocess_dir=sys.argv[1], flush_seconds=3600)
+registry.counter('llm_calls_total', 'Appels', ['stage']).inc(int(sys.argv[2]), stage='extraction')
+registry.gauge('in_flight', 'En cours').set(5)
+registry.histogram('duration_seconds', 'Durée', buckets=(1,)).observe(float(sys.argv[3]))
+"""
+
+
+def declare(registry):
+    return (
+        registry.counter('llm_calls_total', 'Appels', ['stage']),
+        registry.gauge('in_flight', 'En cours'),
+        registry.histogram('duration_seconds', 'Durée', buckets=(1,))
+    )
+
+
+def run_worker(directory, calls, duration):
+    subprocess.run([sys.executable, '-c', WORKER, str(directory), str(calls), str(duration)], check=True,
+                   cwd=os.path.dirname(os.path.abspath(metrics.__file__)))
+
+
+def test_render_single_process():
+    registry = MetricsRegistry()
+    counter, gauge, histogram = declare(registry)
+    counter.inc(2, stage='extraction')
+    gauge.set(1)
+    histogram.observe(0.5)
+    assert registry.render().splitlines() == [
+        '# HELP llm_calls_total Appels', '# TYPE llm_calls_total counter',
+        'llm_calls_total{stage="extraction"} 2',
+        '# HELP in_flight En cours', '# TYPE in_flight gauge',
+        'in_flight 1',
+        '# HELP duration_seconds Durée', '# TYPE duration_seconds histogram',
+        'duration_seconds_bucket{le="1"} 1', 'duration_seconds_bucket{le="+Inf"} 1',
+        'duration_seconds_sum 0.5', 'duration_seconds_count 1',
+    ]
+
+
+def test_workers_are_summed(tmp_path):
+    run_worker(tmp_path, 3, 0.5)
+    run_worker(tmp_path, 4, 2)
+    registry = MetricsRegistry(multiprocess_dir=str(tmp_path), flush_seconds=3600)
+    counter, gauge, histogram = declare(registry)
+    counter.inc(1, stage='extraction')
+    gauge.set(2)
+
+    lines = registry.render().splitlines()
+    assert 'llm_calls_total{stage="extraction"} 8' in lines
+    # Les jauges des workers arrêtés ne comptent plus
+    assert 'in_flight 2' in lines
+    assert 'duration_seconds_bucket{le="1"} 1' in lines
+    assert 'duration_seconds_bucket{le="+Inf"} 2' in lines
+    assert 'duration_seconds_sum 2.5' in lines
+    assert 'duration_seconds_count 2' in lines
+
+
+def test_process_label_keeps_one_series_per_worker(tmp_path):
+    run_worker(tmp_path, 3, 0.5)
+    registry = MetricsRegistry(process_label=True, multiprocess_dir=str(tmp_path), flush_seconds=3600)
+    counter, _, _ = declare(registry)
+    counter.inc(1, stage='extraction')
+
+    series = [line for line in registry.render().splitlines() if line.startswith('llm_calls_total{')]
+    assert len(series) == 2
+    assert f'llm_calls_total{{stage="extraction",pid="{os.getpid()}"}} 1' in series
@@ -0,0 +1,85 @@
+"""
+Tests du regroupement local des tags (tag_clustering.py), sur des tags tirés
+des réponses de example_data.csv.
+"""
+
+import pytest
+
+from tag_clustering import canonical_tag_key, prenormalize_tags, expand_tag_mapping
+
+
+@pytest.mark.parametrize('first, second', [
+    ('Interface utilisateur', 'interface-utilisateur'),
+    ('Synchronisation', 'synchronisation'),
+    ('fonctionnalités avancées', 'Fonctionnalité avancée'),
+    ('couleurs', 'couleur'),
+    ('mises à jour', 'mise à jour'),
+    ('menus', 'menu'),
+    ("l'abonnement premium", 'abonnement premium'),
+    ('problèmes techniques', 'problème technique'),
+    ('appareils', 'appareil'),
+    ('travaux', 'travail'),
+    ('journaux', 'journal'),
+    ('réseaux sociaux', 'réseau social'),
+])
+def test_canonical_key_merges_variants(first, second):
+    assert canonical_tag_key(first) == canonical_tag_key(second)
+
+
+@pytest.mark.parametrize('word, key', [
+    ('choix', 'choix'),
+    ('cours', 'cours'),
+    ('temps', 'temps'),
+    ('prix', 'prix'),
+    ('Accès', 'acces'),
+    ('parcours', 'parcours'),
+    ('processus', 'processus'),
+])
+def test_canonical_key_keeps_invariable_words(word, key):
+    assert canonical_tag_key(word) == key
+
+
+@pytest.mark.parametrize('first, second', [
+    ('cours', 'cour'),
+    ('travaux', 'traval'),
+    ('choix', 'choi'),
+    ('temps', 'temp'),
+])
+def test_canonical_key_keeps_unrelated_words_apart(first, second):
+    assert canonical_tag_key(first) != canonical_tag_key(second)
+
+
+def test_prenormalize_tags_keeps_most_frequent_variant():
+    tags = ['Bugs', 'bug', 'bugs', 'Navigation', 'navigation', 'Prix', 'temps de chargement', 'Temps de chargement']
+    counts = {'Bugs': 1, 'bug': 3, 'bugs': 2, 'Navigation': 2, 'navigation': 1}
+
+    representatives, variants = prenormalize_tags(tags, counts)
+
+    # « bugs » est trop court pour être mis au singulier : seule la casse est repliée
+    assert representatives == ['Navigation', 'Prix', 'Temps de chargement', 'bug', 'bugs']
+    assert variants['bug'] == ['bug']
+    assert variants['bugs'] == ['bugs', 'Bugs']
+    assert variants['Navigation'] == ['Navigation', 'navigation']
+    assert variants['Prix'] == ['Prix']
+    # À fréquence égale, la variante la plus courte puis la première dans l'ordre alphabétique
+    assert variants['Temps de chargement'] == ['Temps de chargement', 'temps de chargement']
+
+
+def test_prenormalize_tags_does_not_merge_invariable_words():
+    representatives, variants = prenormalize_tags(['choix', 'cours', 'cour', 'travaux', 'travail'])
+
+    assert representatives == ['choix', 'cour', 'cours', 'travail']
+    assert variants['travail'] == ['travail', 'travaux']
+
+
+def test_expand_tag_mapping_restores_variants():
+    _, variants = prenormalize_tags(
+        ['mise à jour', 'mises à jour', 'Mises à jour', 'lenteur', 'Lenteur', 'stabilité'], {'mise à jour': 2}
+    )
+    mapping = {'Mises à jour': ['mise à jour'], 'Performance': ['Lenteur', 'inconnu'], 'Fiabilité': ['stabilité']}
+
+    expanded = expand_tag_mapping(mapping, variants)
+
+    assert sorted(expanded['Mises à jour']) == ['Mises à jour', 'mise à jour', 'mises à jour']
+    assert sorted(expanded['Performance']) == ['Lenteur', 'inconnu', 'lenteur']
+    assert expanded['Fiabilité'] == ['stabilité']
@@ -0,0 +1,63 @@
+"""
+Tests de l'index de correspondance des tags (tag_index.py) : l'index donne les
+mêmes correspondances, dans le même ordre, que le parcours linéaire du mapping.
+"""
+
+import random
+
+import pytest
+
+import tag_index
+from tag_index import TagMatchIndex, reassign_tags
+
+WORDS = ['prix', 'interface', 'support', 'client', 'lent', 'mise', 'à', 'jour', 'bug', 'menu',
+         'synchronisation', 'abonnement', 'premium', 'notification', 'tarif', 'appli', 'mobile']
+
+
+def linear_matches(mapping, tag):
+    tag = tag.lower()
+    return [normalized for original, normalized in mapping.items() if tag in original or original in tag]
+
+
+@pytest.fixture
+def large_mapping():
+    generator = random.Random(7)
+    mapping = {}
+    while len(mapping) < tag_index.INDEX_MIN_ORIGINALS + 100:
+        original = ' '.join(generator.sample(WORDS, generator.randint(1, 3)))
+        mapping.setdefault(original, f"Catégorie {len(mapping) % 40}")
+    return mapping
+
+
+def test_index_matches_linear_scan(large_mapping):
+    index = TagMatchIndex(large_mapping)
+    assert index._indexed
+    queries = ['prix', 'Interface', 'support client lent', 'mise à jour', 'ab', 'x', 'bug menu appli',
+               'synchronisation mobile trop lente', 'notification premium tarif prix']
+    queries += list(large_mapping)[:50]
+    for query in queries:
+        assert index.partial_matches(query) == linear_matches(large_mapping, query), query
+
+
+def test_small_mapping_uses_linear_scan():
+    mapping = {'interface utilisateur': 'Interface', 'prix': 'Tarifs', 'prix élevé': 'Tarifs élevés'}
+    index = TagMatchIndex(mapping)
+    assert not index._indexed
+    assert index.get('PRIX') == 'Tarifs'
+    assert index.get('interface') is None
+    assert index.partial_matches('interface') == ['Interface']
+    assert index.partial_matches('prix trop élevé') == ['Tarifs']
+
+
+def test_reassign_tags():
+    mapping = {'interface utilisateur': 'Interface', 'prix': 'Tarifs', 'support client': 'Support'}
+    result = reassign_tags(mapping, [
+        {'response_id': 1, 'tags': ['Prix', 'interface', 'prix']},
+        {'response_id': 2, 'tags': ['support client réactif', 'météo']},
+        {'response_id': 3, 'tags': []},
+    ])
+    assert result == [
+        {'response_id': 1, 'original_tags': ['Prix', 'interface', 'prix'], 'normalized_tags': ['Tarifs', 'Interface']},
+        {'response_id': 2, 'original_tags': ['support client réactif', 'météo'], 'normalized_tags': ['Support']},
+        {'response_id': 3, 'original_tags': [], 'normalized_tags': []},
+    ]